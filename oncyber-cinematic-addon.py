@@ -11,13 +11,73 @@ bl_info = {
 
 import bpy
 import re
+import numpy as np
+import os
+import sys
 import json
+import base64
+import mmap
+import time
+import hashlib
+import cProfile
+import pstats
+import functools
+import contextlib
+import argparse
+import tempfile
+import statistics
+import warnings
+import threading
+import subprocess
+import bpy.utils.previews
+from collections import deque
 from datetime import datetime
+from bpy.app.handlers import persistent
+from mathutils import Vector
+from mathutils.kdtree import KDTree
+from mathutils.bvhtree import BVHTree
+from concurrent.futures import ThreadPoolExecutor
 from bpy.props import StringProperty, IntProperty, CollectionProperty
 from bpy.types import PropertyGroup, UIList, Operator, Panel
 from enum import IntEnum
 
 # GLOBALS ---------------------------------------------------------------------------------
+#curve evaluation, see CatmullRomCurve: curve type as in three.js and arc length table resolution
+DEFAULT_CURVE_TYPE = "centripetal"
+ARC_LENGTH_DIVISIONS = 200
+ARC_LENGTH_SAMPLES_PER_SEGMENT = 16
+#Newton steps decimation takes towards the point of the curve through the kept nodes closest to a dropped node
+DECIMATION_NEWTON_STEPS = 3
+#nodes of a long span decimation measures first, the other nodes only when none of these is out of tolerance
+DECIMATION_PROBES = 16
+#polyline points drawn per segment by the path display
+PATH_SAMPLES_PER_SEGMENT = 8
+#moved nodes the spatial index checks besides its k-d tree before the tree is rebuilt
+SPATIAL_OVERLAY_LIMIT = 64
+#length cut from both ends of an occlusion ray, so geometry touching a node does not count as blocking
+OCCLUSION_MARGIN = 0.01
+#contact sheet thumbnails: Cycles samples per thumbnail, camera lens without a viewer camera (as Add Default Camera)
+#and the directory below the system's temporary directory used when no cache directory is set
+CONTACT_SHEET_SAMPLES = 8
+CONTACT_SHEET_LENS = 15.0
+CONTACT_SHEET_DIRECTORY = "oncyber-contact-sheet"
+
+#files of the thumbnail cache: the index of the thumbnails each contact sheet shows, and the names of the thumbnails
+#and saved copies of the file, the only files ever pruned from the directory
+CONTACT_SHEET_INDEX = "index.json"
+CONTACT_SHEET_FILE = re.compile( r"^(?:[0-9a-f]{40}\.png|scene\.[0-9a-f]{16}\.blend)$" )
+
+#binary cinematic file: header, one table entry per spline, then the position and lookat blocks of
+#each spline in Oncyber coordinates; uint16 blocks are quantized per axis as offset + value * scale
+BINARY_MAGIC = b"OCYB"
+BINARY_VERSION = 1
+BINARY_EXTENSION = ".ocyb"
+BINARY_HEADER = np.dtype( [ ( "magic", "S4" ), ( "version", "<u2" ), ( "valueType", "u1" ), ( "reserved", "u1" ), ( "splineCount", "<u4" ) ] )
+BINARY_SPLINE = np.dtype( [ ( "nodeCount", "<u4" ), ( "duration", "<f8" ),
+                            ( "positionOffset", "<f8", 3 ), ( "positionScale", "<f8", 3 ),
+                            ( "lookatOffset",   "<f8", 3 ), ( "lookatScale",   "<f8", 3 ) ] )
+BINARY_VALUE_TYPES = [ ( "FLOAT32", np.dtype( "<f4" ) ), ( "FLOAT64", np.dtype( "<f8" ) ), ( "UINT16", np.dtype( "<u2" ) ) ]
+
 PROPS = [
     ( "target_file", bpy.props.StringProperty(
         name="Target File", 
@@ -31,6 +91,12 @@ PROPS = [
         default="", 
         description="Source file to import"
     )),
+    ( "sync_watch", bpy.props.BoolProperty(
+        name="Watch",
+        description="Sync the splines whenever the source file changes on disk",
+        default=False,
+        update=lambda self, context: start_sync_watch() if self.sync_watch else None
+    )),
     ( "status_message", bpy.props.StringProperty(
         name="File export status message", 
         default=""
@@ -55,66 +121,689 @@ PROPS = [
             type=bpy.types.Object,
             name="Default Lookat Node",
             description="Default Lookat node, all other generated lookat objects copy from this"
+    )),
+    ( "export_compact", bpy.props.BoolProperty(
+        name="Compact",
+        default=False,
+        description="Write the export file without indentation"
+    )),
+    ( "export_precision", bpy.props.IntProperty(
+        name="Precision",
+        default=-1,
+        min=-1,
+        max=15,
+        description="Decimal places written for each coordinate, -1 keeps full precision"
+    )),
+    ( "import_bulk", bpy.props.BoolProperty(
+        name="Bulk Import",
+        default=True,
+        description="Create the nodes of each spline in one batch instead of one object at a time"
+    )),
+    ( "import_packed", bpy.props.BoolProperty(
+        name="Packed",
+        default=False,
+        description="Keep the imported splines as packed data, their nodes are only created once a spline is selected for editing"
+    )),
+    ( "import_point_mesh", bpy.props.BoolProperty(
+        name="Point Mesh",
+        default=False,
+        description="Create one mesh per DOLLY and LOOKAT collection whose vertices are the nodes, instead of one object per node"
+    )),
+    ( "export_binary", bpy.props.BoolProperty(
+        name="Binary",
+        default=False,
+        description="Also write a compact binary file ('" + BINARY_EXTENSION + "') next to the JSON target"
+    )),
+    ( "binary_value_type", bpy.props.EnumProperty(
+        name="Values",
+        default="FLOAT32",
+        description="Storage of the coordinates in binary files",
+        items=[
+            ( "FLOAT32", "Float32", "Single precision, exact for coordinates exported from Blender" ),
+            ( "FLOAT64", "Float64", "Double precision, exact for any JSON file" ),
+            ( "UINT16",  "Quantized", "16 bit per coordinate within the bounds of each path, smallest but lossy" )
+        ]
+    )),
+    ( "decimate_enabled", bpy.props.BoolProperty(
+        name="Decimate",
+        default=False,
+        description="Drop DOLLY and LOOKAT node pairs the path does not need, within the distance and angle tolerances"
+    )),
+    ( "decimate_distance", bpy.props.FloatProperty(
+        name="Distance",
+        default=0.01,
+        min=0.0,
+        subtype="DISTANCE",
+        description="Largest distance between a dropped node and the path through the kept nodes"
+    )),
+    ( "decimate_angle", bpy.props.FloatProperty(
+        name="Angle",
+        default=0.0174533,
+        min=0.0,
+        max=3.14159,
+        subtype="ANGLE",
+        description="Largest change of the view direction at a dropped node"
+    )),
+    ( "record_interval", bpy.props.FloatProperty(
+        name="Interval",
+        default=0.25,
+        min=0.01,
+        subtype="TIME_ABSOLUTE",
+        description="Seconds between two recorded samples of the view"
+    )),
+    ( "record_distance", bpy.props.FloatProperty(
+        name="Look Distance",
+        default=5.0,
+        min=0.01,
+        subtype="DISTANCE",
+        description="Distance in front of the view at which the LOOKAT node is placed"
+    )),
+    ( "record_capacity", bpy.props.IntProperty(
+        name="Capacity",
+        default=10000,
+        min=4,
+        description="Most samples kept while recording, older samples are dropped once it is reached"
+    )),
+    ( "occlusion_collection", bpy.props.PointerProperty(
+            type=bpy.types.Collection,
+            name="Venue",
+            description="Collection holding the venue meshes the sightlines are checked against, all visible meshes when empty"
+    )),
+    ( "occlusion_samples", bpy.props.IntProperty(
+        name="Samples",
+        default=8,
+        min=1,
+        max=256,
+        description="Camera positions checked per segment between two nodes"
+    )),
+    ( "contact_sheet_size", bpy.props.IntProperty(
+        name="Size",
+        default=160,
+        min=32,
+        max=1024,
+        description="Width of the contact sheet thumbnails in pixels, the height follows the render resolution"
+    )),
+    ( "contact_sheet_workers", bpy.props.IntProperty(
+        name="Workers",
+        default=2,
+        min=1,
+        max=64,
+        description="Background Blender processes rendering the thumbnails at the same time"
+    )),
+    ( "contact_sheet_columns", bpy.props.IntProperty(
+        name="Columns",
+        default=4,
+        min=1,
+        max=16,
+        description="Thumbnails per row of the contact sheet"
+    )),
+    ( "contact_sheet_scale", bpy.props.FloatProperty(
+        name="Zoom",
+        default=5.0,
+        min=1.0,
+        max=20.0,
+        description="Display size of the contact sheet thumbnails"
+    )),
+    ( "contact_sheet_dir", bpy.props.StringProperty(
+        name="Thumbnail Cache",
+        subtype="DIR_PATH",
+        default="",
+        description="Directory of the rendered thumbnails, a directory in the system's temporary directory when empty"
+    )),
+    ( "node_radius", bpy.props.FloatProperty(
+        name="Radius",
+        default=1.0,
+        min=0.0,
+        subtype="DISTANCE",
+        description="Distance from the 3D cursor within which Select in Radius selects nodes"
+    )),
+    ( "profile_enabled", bpy.props.BoolProperty(
+        name="Profiling",
+        default=False,
+        description="Record the timing spans and counters of every operator run"
+    )),
+    ( "profile_capture", bpy.props.BoolProperty(
+        name="cProfile",
+        default=False,
+        description="Also run every operator under cProfile and write its stats next to the target file"
+    )),
+    ( "axis_conversion", bpy.props.EnumProperty(
+        name="Axes",
+        items=(
+            ( "Y_UP", "Oncyber (Y Up)", "Convert between Blender's Z up and Oncyber's Y up coordinates" ),
+            ( "NONE", "None", "Use Blender coordinates unchanged" ),
+        ),
+        default="Y_UP",
+        description="Coordinate conversion applied on export, import and preview"
+    )),
+    ( "export_world_space", bpy.props.BoolProperty(
+        name="World Space",
+        default=False,
+        description="Use the final world position of each node, including parents and constraints, instead of its location"
+    )),
+    ( "curve_type", bpy.props.EnumProperty(
+        name="Curve",
+        items=(
+            ( "centripetal", "Centripetal", "Centripetal Catmull-Rom, the three.js default" ),
+            ( "chordal",     "Chordal",     "Chordal Catmull-Rom" ),
+            ( "catmullrom",  "Uniform",     "Uniform Catmull-Rom with a tension of 0.5" ),
+        ),
+        default=DEFAULT_CURVE_TYPE,
+        description="Curve used to evaluate the path between nodes",
+        update=lambda self, context: PATH_DISPLAY.rebuild_all( self ) if self.show_paths else None
+    )),
+    ( "show_paths", bpy.props.BoolProperty(
+        name="Show Paths",
+        default=False,
+        description="Draw the DOLLY and LOOKAT path of every spline, updated live while nodes are moved",
+        update=lambda self, context: PATH_DISPLAY.rebuild_all( self ) if self.show_paths else PATH_DISPLAY.remove_all( self )
     ))
     
 ]
 
 bpy.props.EnumProperty(items=(("UP", "Up", ""), ("DOWN", "Down", ""),) )
 
+#operator runs kept for the Profiling panel
+PROFILE_HISTORY = 20
+
+#umask of the process, applied to exported files that did not exist before. The only way to read it sets it,
+#which would race with other threads, so it is read once while the add-on loads on the main thread
+FILE_UMASK = os.umask( 0 )
+os.umask( FILE_UMASK )
+
+#time the modal import may spend building nodes per timer tick, and the node budget of its first tick
+IMPORT_TICK_SECONDS = 0.05
+IMPORT_FIRST_BUDGET = 256
+
+#seconds between two looks at the source file while Watch is on, a change is synced once it held for one interval
+SYNC_WATCH_INTERVAL = 1.0
+
+#events passed on to the viewport while the modal import runs, everything else waits for the import
+VIEW_NAVIGATION_EVENTS = { "MIDDLEMOUSE", "WHEELUPMOUSE", "WHEELDOWNMOUSE", "TRACKPADPAN", "TRACKPADZOOM", "MOUSEMOVE", "INBETWEEN_MOUSEMOVE" }
+
+#longest object name Blender keeps, and how many '.0' levels a name for an inserted node may go down
+MAX_NAME_LENGTH = 63
+NAME_BETWEEN_DEPTH = 3
+
+#custom property marking the mesh object of a node collection in point mesh mode
+POINTS_PROPERTY = "oncyber_points"
+#custom properties of the action a bake creates: its marker, and the action the camera had before the bake
+PREVIEW_ACTION_PROPERTY = "oncyber_preview"
+PREVIOUS_ACTION_PROPERTY = "oncyber_previous_action"
+NATURAL_SORT_PATTERN = re.compile( r"([0-9]+)" )
+
+#tokens of the streaming JSON reader, see CinematicJsonReader; a point list is an array of three value arrays
+JSON_WHITESPACE_PATTERN   = re.compile( rb"[ \t\n\r]*" )
+JSON_STRING_PATTERN       = re.compile( rb'"(?:[^"\\]|\\.)*"', re.DOTALL )
+JSON_SCALAR_PATTERN       = re.compile( rb"-?(?:[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|Infinity)|true|false|null|NaN" )
+JSON_BRACKET_PATTERN      = re.compile( rb'[\[\]{}"]' )
+JSON_POINTS_START_PATTERN = re.compile( rb"\[\s*\[" )
+JSON_POINTS_END_PATTERN   = re.compile( rb"\]\s*\]" )
+#deleting everything but brackets and commas leaves '[[,,],[,,]]' for a valid point list
+JSON_POINTS_NON_STRUCTURE = bytes( range( 256 ) ).translate( None, b"[]," )
+
+#Blender to Oncyber axis swizzle ( source axis per output axis, sign per output axis ), e.g. Y_UP gives ( x, z, -y )
+AXIS_CONVERSIONS = {
+    "Y_UP": ( ( 0, 2, 1 ), ( 1.0, 1.0, -1.0 ) ),
+    "NONE": ( ( 0, 1, 2 ), ( 1.0, 1.0,  1.0 ) )
+}
+
 # FUNCTIONS -------------------------------------------------------------------------------
-def generate_output(context, operator, params):
-    (output_file) = params
+#converts (n, 3) point arrays between Blender and Oncyber coordinates with one array operation
+class AxisConversion:
+    def __init__( self, axes, signs ):
+        self.axes  = np.array( axes )
+        self.signs = np.array( signs, dtype=np.float64 )
+        self.inverseAxes  = np.argsort( self.axes )
+        self.inverseSigns = self.signs[ self.inverseAxes ]
 
-    outputData = {
-        "export" : []
-    }
+    def to_oncyber( self, points ):
+        return np.asarray( points, dtype=np.float64 ).reshape( -1, 3 )[ :, self.axes ] * self.signs
 
-    if len( context.scene.splineList ) < 1:
-            operator.report({"ERROR"}, "Nothing to export")
-            return;
-        
-    for index in range( 0, len( context.scene.splineList ), 1 ):
-        splineTree = context.scene.splineList[ index ].splineTree
-        if splineTree is None:
-            operator.report({"ERROR"}, "Collection error: SPLINE " + context.scene.splineList[ index ].name + " missing Target")
-            return;
-        splineName = splineTree.name
-        dollys = None 
-        lookats= None 
+    def to_blender( self, points ):
+        return np.asarray( points, dtype=np.float64 ).reshape( -1, 3 )[ :, self.inverseAxes ] * self.inverseSigns
+
+def get_axis_conversion( scene ):
+    return AxisConversion( *AXIS_CONVERSIONS[ scene.axis_conversion ] )
+
+#sort key that compares runs of digits as numbers, so 'dolly.200' comes before 'dolly.1000'
+def natural_sort_key( name ):
+    return ( [ int( part ) if index % 2 else part for ( index, part ) in enumerate( NATURAL_SORT_PATTERN.split( name ) ) ], name )
+
+#indices that put the objects of a node collection in export order
+def get_node_order( nodeCollection, validate=False ):
+    return NODE_ORDER_INDEX.get( nodeCollection, validate ).order
+
+#Blender locations of all objects in a node collection as an (n, 3) array in the given order,
+#read with a single foreach_get instead of one attribute access per coordinate
+def read_node_locations( nodeCollection, order=None, worldSpace=False ):
+    nodeObjects = nodeCollection.objects
+    count = len( nodeObjects )
+    if worldSpace:
+        matrices = np.empty( count * 16, dtype=np.float32 )
+        nodeObjects.foreach_get( "matrix_world", matrices )
+        locations = matrices.reshape( count, 4, 4 )[ :, 3, :3 ]
+    else:
+        locations = np.empty( count * 3, dtype=np.float32 )
+        nodeObjects.foreach_get( "location", locations )
+        locations = locations.reshape( count, 3 )
+    if order is not None:
+        locations = locations[ order ]
+    return locations.astype( np.float64 )
+
+#a node collection in point mesh mode holds a single mesh object whose vertices are its nodes, in order
+def get_point_mesh( nodeCollection ):
+    if len( nodeCollection.objects ) == 1:
+        pointMesh = nodeCollection.objects[0]
+        if pointMesh.type == "MESH" and pointMesh.get( POINTS_PROPERTY ):
+            return pointMesh
+    return None
+
+def node_count( nodeCollection ):
+    pointMesh = get_point_mesh( nodeCollection )
+    return len( nodeCollection.objects ) if pointMesh is None else len( pointMesh.data.vertices )
+
+#vertex locations of a point mesh with one foreach_get, transformed by the object's own transform
+#(matching the location property of node objects) or by its world matrix
+def read_point_mesh_locations( pointMesh, worldSpace=False ):
+    vertices = pointMesh.data.vertices
+    coordinates = np.empty( len( vertices ) * 3, dtype=np.float32 )
+    vertices.foreach_get( "co", coordinates )
+    matrix = np.array( pointMesh.matrix_world if worldSpace else pointMesh.matrix_basis, dtype=np.float64 )
+    return coordinates.reshape( -1, 3 ).astype( np.float64 ) @ matrix[ :3, :3 ].T + matrix[ :3, 3 ]
+
+#node locations of a collection in either layout, in export order
+def read_collection_locations( nodeCollection, worldSpace=False ):
+    PROFILER.count( "nodes read", node_count( nodeCollection ) )
+    pointMesh = get_point_mesh( nodeCollection )
+    if pointMesh is not None:
+        return read_point_mesh_locations( pointMesh, worldSpace )
+    return read_node_locations( nodeCollection, get_node_order( nodeCollection, True ), worldSpace )
+
+#raised while collecting the export, aborts it and leaves the target file untouched
+class ExportError( Exception ):
+    pass
+
+#whole seconds are written as integers, as the Oncyber editor does
+def export_duration( duration ):
+    return int( duration ) if float( duration ).is_integer() else round( duration, 6 )
+
+#ordered Blender space DOLLY and LOOKAT locations of a spline list item as two (n, 3) arrays
+def read_spline_points( splineItem, worldSpace=False, minimumNodes=4 ):
+    if splineItem.packed:
+        splineName = splineItem.name
+        positions  = unpack_points( splineItem.packedPositions )
+        lookats    = unpack_points( splineItem.packedLookats )
+        if len( positions ) != len( lookats ):
+            raise ExportError( "Count mismatch in " + splineName )
+        elif len( positions ) < minimumNodes:
+            raise ExportError( "Spline " + splineName + " must have at least 4 DOLLY and LOOKAT nodes" )
+        return ( positions, lookats )
+    
+    splineTree = splineItem.splineTree
+    if splineTree is None:
+        raise ExportError( "Collection error: SPLINE " + splineItem.name + " missing Target" )
+    splineName = splineTree.name
+    
+    dollys  = get_child_of_splinetree( splineTree, "DOLLY"  )
+    lookats = get_child_of_splinetree( splineTree, "LOOKAT" )            
         
-        dollys  = get_child_of_splinetree( splineTree, "DOLLY"  )
-        lookats = get_child_of_splinetree( splineTree, "LOOKAT" )            
-            
-        if dollys is None or lookats is None:
-            operator.report({"ERROR"}, "Missing DOLLY or LOOKAT collection in " + splineName )
-            return;
-        elif len( dollys.objects ) != len( lookats.objects ):
-            operator.report({"ERROR"}, "Count mismatch in " + splineName )
-            return;
-        elif len( dollys.objects ) < 4:
-            operator.report({"ERROR"}, "Spline " + splineName + " must have at least 4 DOLLY and LOOKAT nodes")
-            return;
+    if dollys is None or lookats is None:
+        raise ExportError( "Missing DOLLY or LOOKAT collection in " + splineName )
+    elif node_count( dollys ) != node_count( lookats ):
+        raise ExportError( "Count mismatch in " + splineName )
+    elif node_count( dollys ) < minimumNodes:
+        raise ExportError( "Spline " + splineName + " must have at least 4 DOLLY and LOOKAT nodes" )
+    
+    return ( read_collection_locations( dollys,  worldSpace ),
+             read_collection_locations( lookats, worldSpace ) )
+
+#key of a spline in the export and bake caches; packed splines have no collection, their cached
+#entries are checked against the packed data instead
+def spline_cache_name( splineItem ):
+    if splineItem.packed:
+        return "packed:" + splineItem.name
+    return splineItem.splineTree.name
+
+#settings which change the serialized form of a spline, a cached fragment is only reused when they match
+def spline_export_settings( scene, splineItem ):
+    decimation = export_decimation( scene )
+    if splineItem.packed:
+        return ( scene.export_compact, scene.export_precision, scene.axis_conversion, splineItem.duration, decimation,
+                 hashlib.sha1( ( splineItem.packedPositions + splineItem.packedLookats ).encode( "ascii" ) ).digest() )
+    dollys  = get_child_of_splinetree( splineItem.splineTree, "DOLLY"  )
+    lookats = get_child_of_splinetree( splineItem.splineTree, "LOOKAT" )
+    return ( scene.export_compact, scene.export_precision, scene.axis_conversion, scene.export_world_space, splineItem.duration, decimation,
+             None if dollys  is None else ( dollys.name,  node_count( dollys ) ),
+             None if lookats is None else ( lookats.name, node_count( lookats ) ) )
+
+#decimation tolerances of the export, None when decimation is off
+def export_decimation( scene ):
+    return ( scene.decimate_distance, scene.decimate_angle ) if scene.decimate_enabled else None
+
+#export data of one spline in Oncyber coordinates from its Blender space node locations, with the node counts
+#before and after decimation; runs on the export worker thread, so it must not touch bpy data
+def prepare_export_spline( positions, lookats, duration, conversion, decimation=None ):
+    counts = None
+    if decimation is not None:
+        kept = decimate_spline( positions, lookats, decimation[0], decimation[1] )
+        counts = ( len( positions ), len( kept ) )
+        positions = positions[ kept ]
+        lookats   = lookats[ kept ]
+    return ( {
+        "duration": export_duration( duration ),
+        "position": conversion.to_oncyber( positions ),
+        "lookat":   conversion.to_oncyber( lookats )
+    }, counts )
+
+#raised on the export worker thread when its job was cancelled or superseded
+class ExportCancelled( Exception ):
+    pass
+
+#one spline of an export job: its cached fragment, or the node locations to build it from
+class ExportJobSpline:
+    def __init__( self, splineName, settings, version, fragment, duration ):
+        self.splineName = splineName
+        self.settings = settings
+        self.version = version
+        self.fragment = fragment
+        self.duration = duration
+        self.points = None
+        self.spline = None
+        self.decimationCounts = None
+        self.rebuilt = False
+
+#an export in three steps: snapshot() reads everything the export needs from bpy data on the main thread,
+#run() converts, serializes and writes the files and may run on a worker thread, and finish() stores the
+#rebuilt fragments back in the cache on the main thread
+class ExportJob:
+    def __init__( self, scene, output_file ):
+        self.outputFile = output_file
+        self.compact = scene.export_compact
+        self.precision = scene.export_precision
+        self.binaryType = scene.binary_value_type if scene.export_binary else None
+        self.decimation = export_decimation( scene )
+        self.conversion = get_axis_conversion( scene )
+        self.splines = []
+        self.cancelEvent = threading.Event()
+        self.stepsDone = 0
+        #the worker records into the profiler run of the operator that started the export
+        self.profileRun = PROFILER.current
+
+    def snapshot( self, scene ):
+        for index in range( 0, len( scene.splineList ), 1 ):
+            splineItem = scene.splineList[ index ]
+            if splineItem.splineTree is None and not splineItem.packed:
+                raise ExportError( "Collection error: SPLINE " + splineItem.name + " missing Target" )
+            splineName = spline_cache_name( splineItem )
+            settings   = spline_export_settings( scene, splineItem )
+            jobSpline  = ExportJobSpline( splineName, settings, EXPORT_CACHE.version( splineName ), EXPORT_CACHE.get( splineName, settings ), splineItem.duration )
+            #the binary file is always written from the node locations
+            if jobSpline.fragment is None or self.binaryType is not None:
+                with PROFILER.span( "read nodes" ):
+                    jobSpline.points = read_spline_points( splineItem, scene.export_world_space )
+            self.splines.append( jobSpline )
+
+    def progress( self ):
+        return self.stepsDone / max( 1, len( self.splines ) * ( 1 if self.binaryType is None else 2 ) )
+
+    def export_spline( self, jobSpline ):
+        if self.cancelEvent.is_set():
+            raise ExportCancelled()
+        if jobSpline.spline is None:
+            ( jobSpline.spline, jobSpline.decimationCounts ) = prepare_export_spline( jobSpline.points[0], jobSpline.points[1], jobSpline.duration, self.conversion, self.decimation )
+        return jobSpline.spline
+
+    def fragment( self, jobSpline ):
+        if jobSpline.fragment is None:
+            spline = self.export_spline( jobSpline )
+            with PROFILER.span( "serialize" ):
+                jobSpline.fragment = format_spline_json( spline, self.compact, self.precision )
+            jobSpline.rebuilt = True
+        elif self.cancelEvent.is_set():
+            raise ExportCancelled()
+        self.stepsDone += 1
+        return jobSpline.fragment
+
+    def binary_spline( self, jobSpline ):
+        spline = self.export_spline( jobSpline )
+        self.stepsDone += 1
+        return spline
+
+    def run( self ):
+        with PROFILER.resume( self.profileRun ):
+            write_file_atomic( self.outputFile, lambda outputFile: write_cinematic_json( outputFile, map( self.fragment, self.splines ), self.compact ) )
+            if self.binaryType is not None:
+                write_file_atomic( binary_file_name( self.outputFile ), lambda outputFile: write_cinematic_binary( outputFile, map( self.binary_spline, self.splines ), self.binaryType ), binary=True )
+
+    def finish( self ):
+        for jobSpline in self.splines:
+            if jobSpline.rebuilt:
+                EXPORT_CACHE.put( jobSpline.splineName, jobSpline.settings, jobSpline.fragment, jobSpline.version )
+            if jobSpline.decimationCounts is not None:
+                DECIMATION_COUNTS[ jobSpline.splineName ] = jobSpline.decimationCounts
+
+#serialize one spline, indented as the entries of the export list; the layout is identical to json.dumps( indent=4 )
+def format_spline_json( spline, compact=False, precision=-1 ):
+    if precision < 0:
+        formatValue = repr
+    else:
+        formatValue = lambda value: repr( round( value, precision ) )
+    newline, indent, colon = ( "", "", ":" ) if compact else ( "\n", "    ", ": " )
+    lines = [ newline + indent * depth for depth in range( 0, 6, 1 ) ]
+    valueSeparator = "," + lines[5]
+    
+    PROFILER.count( "nodes serialized", len( spline[ "position" ] ) )
+    parts = [ "{" + lines[3] + '"duration"' + colon + json.dumps( spline[ "duration" ] ) ]
+    for key in ( "position", "lookat" ):
+        points = spline[ key ]
+        if isinstance( points, np.ndarray ):
+            points = points.tolist()
+        parts.append( "," + lines[3] + '"' + key + '"' + colon + "[" )
+        parts.append( ",".join( lines[4] + "[" + lines[5] + valueSeparator.join( map( formatValue, point ) ) + lines[4] + "]" for point in points ) )
+        parts.append( lines[3] + "]" )
+    parts.append( lines[2] + "}" )
+    return "".join( parts )
+
+#stream the serialized splines as the cinematic JSON file
+def write_cinematic_json( outputFile, fragments, compact=False ):
+    newline, indent, colon = ( "", "", ":" ) if compact else ( "\n", "    ", ": " )
+    
+    outputFile.write( "{" + newline + indent + '"export"' + colon + "[" )
+    for ( splineIndex, fragment ) in enumerate( fragments ):
+        outputFile.write( ( "," if splineIndex > 0 else "" ) + newline + indent * 2 + fragment )
+    outputFile.write( newline + indent + "]" + newline + "}" )
+
+#write through a temporary file in the target directory and rename it into place,
+#so a failed write never leaves a truncated target behind
+def write_file_atomic( output_file, writer, binary=False ):
+    targetPath = os.path.abspath( output_file )
+    ( tempHandle, tempPath ) = tempfile.mkstemp( prefix="." + os.path.basename( targetPath ) + ".", suffix=".tmp", dir=os.path.dirname( targetPath ) )
+    try:
+        with ( os.fdopen( tempHandle, "wb" ) if binary else os.fdopen( tempHandle, "w", encoding="utf-8", newline="\n" ) ) as tempFile:
+            writer( tempFile )
+            with PROFILER.span( "disk sync" ):
+                tempFile.flush()
+                os.fsync( tempFile.fileno() )
+        if os.path.exists( targetPath ):
+            os.chmod( tempPath, os.stat( targetPath ).st_mode & 0o777 )
         else:
-            outputData[ "export" ].append( {"duration": 10, "position": [], "lookat": [] } )
-            
-            dollysSorted  = sorted( dollys.objects,  key=lambda obj: obj.name )
-            lookatsSorted = sorted( lookats.objects, key=lambda obj: obj.name )        
-            
-            for i in range( 0, len( dollysSorted ), 1 ):
-                dolly = dollysSorted[ i ]
-                lookat = lookatsSorted[ i ]
-                outputData[ "export" ][ index ][ "position" ].append( [  dolly.location.x,  dolly.location.z,  dolly.location.y * -1  ] )
-                outputData[ "export" ][ index ][ "lookat"   ].append( [ lookat.location.x, lookat.location.z, lookat.location.y * -1  ] )
+            os.chmod( tempPath, 0o666 & ~FILE_UMASK )
+        os.replace( tempPath, targetPath )
+    except BaseException:
+        if os.path.exists( tempPath ):
+            os.remove( tempPath )
+        raise
+    fileSize = os.path.getsize( targetPath )
+    PROFILER.count( "bytes written", fileSize )
+    return fileSize
+
+#quantize points to uint16 per axis, returns ( values, offset, scale )
+def quantize_points( points ):
+    if len( points ) == 0:
+        return ( np.empty( ( 0, 3 ), dtype="<u2" ), np.zeros( 3 ), np.ones( 3 ) )
+    offset = points.min( axis=0 )
+    scale  = ( points.max( axis=0 ) - offset ) / 65535.0
+    scale[ scale == 0.0 ] = 1.0
+    return ( np.rint( ( points - offset ) / scale ).astype( "<u2" ), offset, scale )
+
+#write the splines as a binary cinematic file: header, spline table, then the blocks of every spline
+def write_cinematic_binary( outputFile, splines, valueType="FLOAT32" ):
+    typeCode   = [ name for ( name, dtype ) in BINARY_VALUE_TYPES ].index( valueType )
+    valueDtype = BINARY_VALUE_TYPES[ typeCode ][1]
+    splines = list( splines )
+    header = np.zeros( 1, dtype=BINARY_HEADER )
+    header[ "magic" ] = BINARY_MAGIC
+    header[ "version" ] = BINARY_VERSION
+    header[ "valueType" ] = typeCode
+    header[ "splineCount" ] = len( splines )
+    table = np.zeros( len( splines ), dtype=BINARY_SPLINE )
+    blocks = []
+    for ( splineIndex, spline ) in enumerate( splines ):
+        entry = table[ splineIndex ]
+        for key in ( "position", "lookat" ):
+            points = np.asarray( spline[ key ], dtype=np.float64 ).reshape( -1, 3 )
+            if valueType == "UINT16":
+                ( points, entry[ key + "Offset" ], entry[ key + "Scale" ] ) = quantize_points( points )
+            blocks.append( points.astype( valueDtype ) )
+        if len( blocks[ -2 ] ) != len( blocks[ -1 ] ):
+            raise ExportError( "Count mismatch in spline " + str( splineIndex + 1 ) )
+        entry[ "nodeCount" ] = len( blocks[ -1 ] )
+        PROFILER.count( "nodes serialized", len( blocks[ -1 ] ) )
+        entry[ "duration" ] = spline.get( "duration", 10 )
+    outputFile.write( header.tobytes() )
+    outputFile.write( table.tobytes() )
+    for block in blocks:
+        outputFile.write( block.tobytes() )
+
+#yield the splines of a binary cinematic file; float blocks are read only views of the memory mapped file
+def iter_cinematic_binary( input_file, progress=None ):
+    with open( input_file, "rb" ) as binaryFile:
+        if os.fstat( binaryFile.fileno() ).st_size == 0:
+            raise ImportFileError( "Empty file" )
+        #the map stays open for as long as the returned arrays use it
+        buffer = mmap.mmap( binaryFile.fileno(), 0, access=mmap.ACCESS_READ )
+    if len( buffer ) < BINARY_HEADER.itemsize:
+        raise ImportFileError( "Truncated header" )
+    header = np.frombuffer( buffer, dtype=BINARY_HEADER, count=1 )[0]
+    if header[ "magic" ] != BINARY_MAGIC:
+        raise ImportFileError( "Not a binary cinematic file" )
+    if header[ "version" ] != BINARY_VERSION or header[ "valueType" ] >= len( BINARY_VALUE_TYPES ):
+        raise ImportFileError( "Unsupported binary version " + str( header[ "version" ] ) )
+    ( valueType, valueDtype ) = BINARY_VALUE_TYPES[ header[ "valueType" ] ]
+    splineCount = int( header[ "splineCount" ] )
+    offset = BINARY_HEADER.itemsize + splineCount * BINARY_SPLINE.itemsize
+    if len( buffer ) < offset:
+        raise ImportFileError( "Truncated spline table" )
+    table = np.frombuffer( buffer, dtype=BINARY_SPLINE, count=splineCount, offset=BINARY_HEADER.itemsize )
+    for entry in table:
+        spline = { "duration": export_duration( float( entry[ "duration" ] ) ) }
+        count = int( entry[ "nodeCount" ] ) * 3
+        for key in ( "position", "lookat" ):
+            if len( buffer ) < offset + count * valueDtype.itemsize:
+                raise ImportFileError( "Truncated point block at byte " + str( offset ) )
+            points = np.frombuffer( buffer, dtype=valueDtype, count=count, offset=offset ).reshape( -1, 3 )
+            if valueType == "UINT16":
+                points = entry[ key + "Offset" ] + points * entry[ key + "Scale" ]
+            spline[ key ] = points
+            offset += count * valueDtype.itemsize
+        if progress is not None:
+            progress( offset / len( buffer ) )
+        yield spline
+
+#binary files are recognized by their magic, everything else is read as JSON
+def is_binary_cinematic_file( input_file ):
+    with open( input_file, "rb" ) as inputFile:
+        return inputFile.read( len( BINARY_MAGIC ) ) == BINARY_MAGIC
+
+def iter_cinematic_file( input_file, progress=None ):
+    if is_binary_cinematic_file( input_file ):
+        return iter_cinematic_binary( input_file, progress )
+    return iter_cinematic_splines( input_file, progress )
+
+#the binary file written next to a JSON target
+def binary_file_name( output_file ):
+    return os.path.splitext( output_file )[0] + BINARY_EXTENSION
+
+#convert a cinematic file to the other format, written next to it
+def convert_cinematic_file( context, operator, params ):
+    (input_file) = params
+    scene = context.scene
+    
+    try:
+        if is_binary_cinematic_file( input_file ):
+            output_file = os.path.splitext( input_file )[0] + ".json"
+            write_file_atomic( output_file, lambda outputFile: write_cinematic_json( outputFile,
+                ( format_spline_json( spline, scene.export_compact, scene.export_precision ) for spline in iter_cinematic_binary( input_file ) ), scene.export_compact ) )
+        else:
+            output_file = binary_file_name( input_file )
+            splines = list( iter_cinematic_splines( input_file ) )
+            write_file_atomic( output_file, lambda outputFile: write_cinematic_binary( outputFile, splines, scene.binary_value_type ), binary=True )
+            if scene.binary_value_type == "FLOAT32":
+                roundedCount = sum( int( np.count_nonzero( spline[ key ].astype( np.float32 ) != spline[ key ] ) ) for spline in splines for key in ( "position", "lookat" ) )
+                if roundedCount > 0:
+                    operator.report( {"WARNING"}, str( roundedCount ) + " values were rounded to float32, use Float64 for an exact copy" )
+    except FileNotFoundError:
+        operator.report( {"ERROR"}, "Could not find file " + input_file )
+        return;
+    except ( ImportFileError, ExportError ) as error:
+        operator.report( {"ERROR"}, "Could not convert the file " + input_file + ": " + str( error ) )
+        return;
+    except OSError:
+        operator.report( {"ERROR"}, "Could not convert the file " + input_file )
+        return;
+    setattr( bpy.types.Scene, "status_message", "Converted to: " + os.path.basename( output_file ) )
+    operator.report( {"INFO"}, "Converted to " + output_file )
+
+#status line and report of a completed export
+def report_export( operator ):
+    setattr( bpy.types.Scene, "status_message", "File generated at: " + datetime.now().strftime("%Y-%m-%d %H:%M:%S") + " (" + str( EXPORT_CACHE.rebuilt ) + " rebuilt, " + str( EXPORT_CACHE.reused ) + " reused)" )
+    operator.report( {"INFO"}, "File generated" )
+
+#snapshot the splines for an export, None when there is nothing to export or a spline is invalid
+def start_export( context, operator, params ):
+    (output_file) = params
+
+    if len( context.scene.splineList ) < 1:
+            operator.report({"ERROR"}, "Nothing to export")
+            return None;
+    
+    EXPORT_CACHE.reset_counts()
+    job = ExportJob( context.scene, output_file )
+    try:
+        job.snapshot( context.scene )
+    except ExportError as error:
+        operator.report( {"ERROR"}, str( error ) )
+        return None;
+    return job
 
+#wait for the written files of a job run on the worker thread, or write them here when no future is given
+def complete_export( job, operator, future=None ):
     try:
-        outputFile = open( output_file, "w" )
-        outputFile.write( json.dumps(outputData, indent=4) )
-        outputFile.close()
-        now = datetime.now()
-        setattr( bpy.types.Scene, "status_message", "File generated at: " + datetime.now().strftime("%Y-%m-%d %H:%M:%S") )
-        operator.report( {"INFO"}, "File generated" )
-    except:
-        operator.report( {"ERROR"}, "Could not write the file " + output_file )        
+        if future is None:
+            job.run()
+        else:
+            future.result()
+        job.finish()
+        report_export( operator )
+    except ExportCancelled:
+        pass
+    except ExportError as error:
+        operator.report( {"ERROR"}, str( error ) )
+    except OSError:
+        operator.report( {"ERROR"}, "Could not write the file " + job.outputFile )        
+
+#the status line is a class attribute, the sidebar only shows a new one when it is redrawn
+def tag_view3d_redraw( context ):
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == "VIEW_3D":
+                area.tag_redraw()
+
+def generate_output(context, operator, params):
+    job = start_export( context, operator, params )
+    if job is not None:
+        complete_export( job, operator )
         
 def create_new_spline_structure( parentCollection ):
     collectionSpline = bpy.data.collections.new( "spline" )
@@ -131,9 +820,9 @@ def create_new_spline_structure( parentCollection ):
     
     return collectionSpline, dollyCollection, lookatCollection
 
-def add_spline_node( targetLocation, defaultNode, targetCollection, translateLocation=True ):
+def add_spline_node( targetLocation, defaultNode, targetCollection, translateLocation=True, conversion=None ):
     if translateLocation:
-        location = (targetLocation[0], targetLocation[2]*-1, targetLocation[1] )
+        location = ( conversion or get_axis_conversion( bpy.context.scene ) ).to_blender( targetLocation )[0].tolist()
     else:
         location = targetLocation
     
@@ -150,42 +839,571 @@ def add_spline_node( targetLocation, defaultNode, targetCollection, translateLoc
         for collection in newNode.users_collection:
             collection.objects.unlink( newNode )
         targetCollection.objects.link( newNode )
+        PROFILER.count( "objects created" )
+
+
+#base name of the nodes copied from a default node, e.g. 'dolly' for 'dolly(reference)'
+def node_name_prefix( defaultNode ):
+    if   defaultNode.name == "dolly(reference)" : return "dolly"
+    elif defaultNode.name == "lookat(reference)": return "lookat"
+    return defaultNode.name
+
+#first free number for '<prefix>.<number>' node names, found with a single pass over the object names
+def next_node_number( prefix ):
+    namePattern = re.compile( re.escape( prefix ) + r"\.(\d+)$" )
+    nextNumber = 0
+    for name in bpy.data.objects.keys():
+        match = namePattern.match( name )
+        if match is not None:
+            nextNumber = max( nextNumber, int( match.group(1) ) + 1 )
+    return nextNumber
+
+#bulk version of add_spline_node: copies defaultNode once per location, links all copies in a single
+#pass and assigns locations and visibility with one foreach_set each instead of per object attributes
+def add_spline_nodes( targetLocations, defaultNode, targetCollection, startNumber, translateLocation=True, conversion=None ):
+    count = len( targetLocations )
+    if defaultNode is None or count < 1:
+        return startNumber
+    
+    if translateLocation:
+        locations = ( conversion or get_axis_conversion( bpy.context.scene ) ).to_blender( targetLocations )
+    else:
+        locations = np.asarray( targetLocations, dtype=np.float64 )
+    locations = locations.astype( np.float32 ).reshape( -1 )
+    
+    PROFILER.count( "objects created", count )
+    #fixed width numbering keeps the batch in order when sorted by name
+    prefix = node_name_prefix( defaultNode )
+    nameFormat = prefix + ".%0" + str( max( 3, len( str( startNumber + count - 1 ) ) ) ) + "d"
+    linkObject = targetCollection.objects.link
+    for number in range( startNumber, startNumber + count, 1 ):
+        newNode = defaultNode.copy()
+        newNode.name = nameFormat % number
+        linkObject( newNode )
+    
+    #foreach_set covers the whole collection, so keep the locations of nodes it already held
+    nodeObjects = targetCollection.objects
+    existingCount = len( nodeObjects ) - count
+    if existingCount > 0:
+        existingLocations = np.empty( len( nodeObjects ) * 3, dtype=np.float32 )
+        nodeObjects.foreach_get( "location", existingLocations )
+        locations = np.concatenate( ( existingLocations[ :existingCount * 3 ], locations ) )
+    nodeObjects.foreach_set( "location", locations )
+    #the copies of the hidden default node are made visible, nodes the collection already held keep their flags
+    for flagName in ( "hide_render", "hide_viewport", "hide_select" ):
+        flags = np.zeros( len( nodeObjects ), dtype=bool )
+        if existingCount > 0:
+            nodeObjects.foreach_get( flagName, flags )
+            flags[ existingCount: ] = False
+        nodeObjects.foreach_set( flagName, flags )
+    return startNumber + count
+
+class ImportFileError(Exception):
+    pass
+
+#reads the 'export' list of a cinematic JSON file one spline at a time from a memory mapped file,
+#position and lookat lists are parsed straight into (n, 3) arrays and all other values with json
+class CinematicJsonReader:
+    def __init__( self, buffer ):
+        self.buffer = buffer
+        self.position = 3 if buffer[ :3 ] == b"\xef\xbb\xbf" else 0
+
+    def error( self, message ):
+        return ImportFileError( message + " at byte " + str( self.position ) )
+
+    def peek( self ):
+        self.position = JSON_WHITESPACE_PATTERN.match( self.buffer, self.position ).end()
+        return self.buffer[ self.position:self.position + 1 ]
+
+    def expect( self, token ):
+        if self.peek() == b"":
+            raise self.error( "Unexpected end of file" )
+        if self.peek() != token:
+            raise self.error( "Expected '" + token.decode() + "'" )
+        self.position += 1
+
+    #true while the object or array has more entries, consumes the separators and closing bracket
+    def has_next( self, closing, first ):
+        token = self.peek()
+        if token == closing:
+            self.position += 1
+            return False
+        if not first:
+            if token != b",":
+                raise self.error( "Expected ',' or '" + closing.decode() + "'" )
+            self.position += 1
+        return True
+
+    def read_key( self ):
+        self.peek()
+        match = JSON_STRING_PATTERN.match( self.buffer, self.position )
+        if match is None:
+            raise self.error( "Expected a key" )
+        self.position = match.end()
+        self.expect( b":" )
+        return json.loads( match.group() )
+
+    #end of the value at the current position, nested values are skipped bracket by bracket
+    def value_end( self ):
+        token = self.peek()
+        if token not in ( b"[", b"{" ):
+            match = ( JSON_STRING_PATTERN if token == b'"' else JSON_SCALAR_PATTERN ).match( self.buffer, self.position )
+            if match is None:
+                raise self.error( "Invalid value" )
+            return match.end()
+        depth = 0
+        end = self.position
+        while True:
+            match = JSON_BRACKET_PATTERN.search( self.buffer, end )
+            if match is None:
+                raise self.error( "Unterminated value" )
+            token = match.group()
+            if token == b'"':
+                match = JSON_STRING_PATTERN.match( self.buffer, match.start() )
+                if match is None:
+                    raise self.error( "Unterminated string" )
+            elif token in ( b"[", b"{" ):
+                depth += 1
+            else:
+                depth -= 1
+            end = match.end()
+            if depth == 0:
+                return end
+
+    def read_value( self ):
+        end = self.value_end()
+        try:
+            value = json.loads( self.buffer[ self.position:end ] )
+        except ValueError:
+            raise self.error( "Invalid value" )
+        self.position = end
+        return value
+
+    #a plain list of numeric points is located with two searches, checked by its bracket and comma
+    #layout and converted by numpy without creating a Python float per value
+    def read_points( self ):
+        self.peek()
+        if JSON_POINTS_START_PATTERN.match( self.buffer, self.position ) is not None:
+            match = JSON_POINTS_END_PATTERN.search( self.buffer, self.position )
+            text = b"" if match is None else self.buffer[ self.position:match.end() ]
+            pointCount = text.count( b"[" ) - 1
+            if pointCount > 0 and text.translate( None, JSON_POINTS_NON_STRUCTURE ) == b"[" + b"[,,]," * ( pointCount - 1 ) + b"[,,]]":
+                try:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter( "ignore", DeprecationWarning )
+                        values = np.fromstring( text.translate( None, b"[]" ), dtype=np.float64, sep="," )
+                except ValueError:
+                    values = None
+                if values is not None and len( values ) == pointCount * 3:
+                    self.position = match.end()
+                    return values.reshape( -1, 3 )
+        #anything unusual, e.g. numbers written as strings, goes through json
+        start = self.position
+        try:
+            return np.asarray( self.read_value(), dtype=np.float64 ).reshape( -1, 3 )
+        except ( TypeError, ValueError ):
+            self.position = start
+            raise self.error( "Invalid point list" )
+
+    def read_spline( self ):
+        spline = {}
+        self.expect( b"{" )
+        first = True
+        while self.has_next( b"}", first ):
+            first = False
+            key = self.read_key()
+            if key in ( "position", "lookat" ):
+                spline[ key ] = self.read_points()
+            else:
+                spline[ key ] = self.read_value()
+        for key in ( "position", "lookat" ):
+            if key not in spline:
+                raise self.error( "Spline without " + key )
+        return spline
+
+    def iter_splines( self ):
+        self.expect( b"{" )
+        first = True
+        while self.has_next( b"}", first ):
+            first = False
+            if self.read_key() != "export":
+                self.position = self.value_end()
+                continue
+            self.expect( b"[" )
+            firstSpline = True
+            while self.has_next( b"]", firstSpline ):
+                firstSpline = False
+                yield self.read_spline()
+            return
+        raise self.error( "No export list" )
+
+#yield the splines of a cinematic JSON file as dicts holding (n, 3) position and lookat arrays,
+#only the spline being parsed is held in memory; progress is called with the fraction of the file read
+def iter_cinematic_splines( input_file, progress=None ):
+    with open( input_file, "rb" ) as jsonFile:
+        if os.fstat( jsonFile.fileno() ).st_size == 0:
+            raise ImportFileError( "Empty file" )
+        with mmap.mmap( jsonFile.fileno(), 0, access=mmap.ACCESS_READ ) as buffer:
+            reader = CinematicJsonReader( buffer )
+            for spline in reader.iter_splines():
+                if progress is not None:
+                    progress( reader.position / len( buffer ) )
+                yield spline
+
+#one spline of an import: its item data, and the node batches still to be built into its collections
+class ImportJobSpline:
+    def __init__( self, duration, nodeCount ):
+        self.duration = duration
+        self.nodeCount = nodeCount
+        self.nodesBuilt = 0
+        self.name = None
+        self.splineTree = None
+        self.packedPositions = None
+        self.packedLookats = None
+        self.pending = []
 
+#an import split into steps which build a bounded number of nodes each, so the modal import can spread it
+#over timer ticks. The splines are parsed as they are needed; the spline list is only replaced once the
+#file was read, and rollback() removes everything created by a cancelled import
+class ImportJob:
+    def __init__( self, context, input_file ):
+        self.inputFile = input_file
+        self.scene = context.scene
+        self.fileStart = 0.0
+        self.fileProgress = 0.0
+        self.splines = iter_cinematic_file( input_file, self.set_file_progress )
+        self.collection = None
+        self.createdDefaults = []
+        self.built = []
+        self.nodeCount = 0
+        self.done = False
+        self.startTime = time.perf_counter()
+
+    def set_file_progress( self, fraction ):
+        self.fileStart = self.fileProgress
+        self.fileProgress = fraction
+
+    def current( self ):
+        return self.built[ -1 ] if self.built else None
+
+    #fraction of the current spline built, and of the whole import
+    def progress( self ):
+        current = self.current()
+        if self.done or current is None:
+            return ( 1.0 if self.done else 0.0, 1.0 if self.done else 0.0 )
+        splineProgress = current.nodesBuilt / max( 1, current.nodeCount )
+        return ( splineProgress, self.fileStart + ( self.fileProgress - self.fileStart ) * splineProgress )
+
+    #build up to budget nodes, returns the number built; parse errors are raised, the splines before stay built
+    def step( self, budget ):
+        built = 0
+        while built < budget and not self.done:
+            current = self.current()
+            if current is None or len( current.pending ) == 0:
+                built += self.start_spline( next( self.splines, None ) )
+            else:
+                built += self.build_nodes( current, budget - built )
+        return built
+
+    #the scene is only touched once the first spline arrived; packed splines and point meshes are built
+    #right away, returns the number of nodes built
+    def start_spline( self, splineData ):
+        if splineData is None:
+            self.done = True
+            return 0
+        scene = self.scene
+        if self.collection is None:
+            self.collection = bpy.data.collections.new( "import." + datetime.now().strftime("%Y-%m-%d %H:%M:%S") )
+            self.createdDefaults = [ propName for propName in ( "defaultDollyNode", "defaultLookatNode" ) if getattr( scene, propName ) is None ]
+            create_default_nodes( bpy.context, self.collection )
+            scene.collection.children.link( self.collection )
+            self.conversion = get_axis_conversion( scene )
+            if scene.import_bulk:
+                self.nextNumbers = [ next_node_number( node_name_prefix( scene.defaultDollyNode ) ),
+                                     next_node_number( node_name_prefix( scene.defaultLookatNode ) ) ]
+        positions = self.conversion.to_blender( splineData[ "position" ] )
+        lookats   = self.conversion.to_blender( splineData[ "lookat" ] )
+        importSpline = ImportJobSpline( splineData.get( "duration", 10 ), len( positions ) + len( lookats ) )
+        self.nodeCount += importSpline.nodeCount
+        self.built.append( importSpline )
+        with PROFILER.span( "build nodes" ):
+            if scene.import_packed:
+                importSpline.name = "spline.%03d" % len( self.built )
+                importSpline.packedPositions = pack_points( positions )
+                importSpline.packedLookats   = pack_points( lookats )
+                importSpline.nodesBuilt = importSpline.nodeCount
+            else:
+                newSplineTree = create_new_spline_structure( self.collection )
+                importSpline.splineTree = newSplineTree[ SPLINETREE.SPLINE ]
+                importSpline.name = newSplineTree[ SPLINETREE.SPLINE ].name
+                if scene.import_point_mesh:
+                    add_point_mesh( positions, newSplineTree[ SPLINETREE.DOLLY ] )
+                    add_point_mesh( lookats,   newSplineTree[ SPLINETREE.LOOKAT ] )
+                    importSpline.nodesBuilt = importSpline.nodeCount
+                else:
+                    #[ Blender locations, first one not built yet, default node, node collection ]
+                    importSpline.pending = [ [ positions, 0, scene.defaultDollyNode,  newSplineTree[ SPLINETREE.DOLLY ] ],
+                                             [ lookats,   0, scene.defaultLookatNode, newSplineTree[ SPLINETREE.LOOKAT ] ] ]
+        return importSpline.nodesBuilt
+
+    def build_nodes( self, importSpline, budget ):
+        batch = importSpline.pending[0]
+        ( locations, start, defaultNode, nodeCollection ) = batch
+        count = min( budget, len( locations ) - start )
+        with PROFILER.span( "build nodes" ):
+            if self.scene.import_bulk:
+                kind = 0 if len( importSpline.pending ) == 2 else 1
+                self.nextNumbers[ kind ] = add_spline_nodes( locations[ start:start + count ], defaultNode, nodeCollection, self.nextNumbers[ kind ], translateLocation=False )
+            else:
+                for location in locations[ start:start + count ]:
+                    add_spline_node( location.tolist(), defaultNode, nodeCollection, translateLocation=False )
+        batch[1] += count
+        importSpline.nodesBuilt += count
+        if batch[1] == len( locations ):
+            importSpline.pending.pop( 0 )
+        return max( count, 1 )
+
+    #replace the spline list with the imported splines, returns False when nothing was imported
+    def commit( self, context ):
+        if self.collection is None:
+            return False
+        clear_spline_list( context )
+        for importSpline in self.built:
+            newItem = context.scene.splineList.add()
+            newItem.duration = importSpline.duration
+            newItem.name = importSpline.name
+            if importSpline.splineTree is None:
+                newItem.packedPositions = importSpline.packedPositions
+                newItem.packedLookats   = importSpline.packedLookats
+                newItem.packed = True
+            else:
+                newItem.splineTree = importSpline.splineTree
+        context.scene.rootCollection = self.collection
+        #dependency updates were only tagged while building, evaluate once for the whole import
+        context.view_layer.update()
+        return True
+
+    def rollback( self, context ):
+        for propName in self.createdDefaults:
+            defaultNode = getattr( self.scene, propName )
+            if defaultNode is not None:
+                meshData = defaultNode.data
+                bpy.data.objects.remove( defaultNode )
+                if meshData is not None and meshData.users == 0:
+                    bpy.data.meshes.remove( meshData )
+                setattr( self.scene, propName, None )
+        if self.collection is not None:
+            remove_import_collection( self.collection )
+            self.collection = None
+        self.built = []
+
+    def message( self ):
+        return "Imported " + str( len( self.built ) ) + " splines, " + str( self.nodeCount ) + " nodes in " + "%.2f" % ( time.perf_counter() - self.startTime ) + " s"
+
+#remove a collection of a cancelled import with all nodes and collections created in it
+def remove_import_collection( collection ):
+    for childCollection in list( collection.children ):
+        remove_import_collection( childCollection )
+    remove_node_objects( collection )
+    bpy.data.collections.remove( collection )
+
+#report a file error of an import job
+def report_import_error( operator, input_file, error ):
+    if isinstance( error, FileNotFoundError ):
+        operator.report( {"ERROR"}, "Could not find file " + input_file )        
+    elif isinstance( error, ImportFileError ):
+        operator.report( {"ERROR"}, "Could not read the file " + input_file + ": " + str( error ) )
+    else:
+        operator.report( {"ERROR"}, "Could not read the file " + input_file )        
+
+#the import job of a file, None when the file cannot be opened
+def start_import( context, operator, params ):
+    (input_file) = params
+    
+    try:
+        return ImportJob( context, input_file )
+    except OSError as error:
+        report_import_error( operator, input_file, error )
+        return None
+
+#keep the splines built when the file turned out to be broken part way, as an import in one call does
+def complete_import( context, operator, job ):
+    if job.commit( context ):
+        importMessage = job.message()
+        setattr( bpy.types.Scene, "status_message", importMessage )
+        operator.report( {"INFO"}, importMessage )
 
 def import_file(context, operator, params):
+    job = start_import( context, operator, params )
+    if job is None:
+        return;
+    try:
+        job.step( float( "inf" ) )
+    except ( ImportFileError, OSError ) as error:
+        report_import_error( operator, job.inputFile, error )
+    complete_import( context, operator, job )
+
+#which of the nodes read from a file differ from the current ones: ( moved, added, removed )
+def node_changes( current, locations ):
+    common = min( len( current ), len( locations ) )
+    moved = np.any( np.asarray( current[ :common ], dtype=np.float32 ) != np.asarray( locations[ :common ], dtype=np.float32 ), axis=1 )
+    return ( int( np.count_nonzero( moved ) ), max( 0, len( locations ) - len( current ) ), max( 0, len( current ) - len( locations ) ) )
+
+#set the nodes of one DOLLY or LOOKAT collection to the Blender space locations: the nodes both have in common
+#are moved with one bulk write, the nodes beyond the new count removed and missing ones added after the last
+def sync_collection_nodes( nodeCollection, defaultNode, locations ):
+    pointMesh = get_point_mesh( nodeCollection )
+    if pointMesh is not None:
+        changes = node_changes( read_point_mesh_locations( pointMesh ), locations )
+        if changes != ( 0, 0, 0 ):
+            #vertices are stored before the object's own transform, see read_point_mesh_locations
+            matrix = np.array( pointMesh.matrix_basis, dtype=np.float64 )
+            coordinates = ( locations - matrix[ :3, 3 ] ) @ np.linalg.inv( matrix[ :3, :3 ] ).T
+            if changes[1] == 0 and changes[2] == 0:
+                pointMesh.data.vertices.foreach_set( "co", coordinates.astype( np.float32 ).reshape( -1 ) )
+                pointMesh.data.update()
+            else:
+                set_point_mesh_data( pointMesh.data, coordinates )
+        return changes
+
+    nodeOrder = NODE_ORDER_INDEX.get( nodeCollection, True )
+    nodeObjects = nodeCollection.objects
+    count = len( nodeObjects )
+    current = np.empty( count * 3, dtype=np.float32 )
+    nodeObjects.foreach_get( "location", current )
+    current = current.reshape( count, 3 )
+    changes = node_changes( current[ nodeOrder.order ], locations )
+    common = min( count, len( locations ) )
+    if changes[0] > 0:
+        commonOrder = nodeOrder.order[ :common ]
+        target = np.asarray( locations[ :common ], dtype=np.float32 )
+        movedIndices = commonOrder[ np.any( current[ commonOrder ] != target, axis=1 ) ]
+        current[ commonOrder ] = target
+        nodeObjects.foreach_set( "location", current.reshape( -1 ) )
+        #bulk writes do not tag the depsgraph, the moved nodes are tagged one by one
+        for index in movedIndices.tolist():
+            nodeObjects[ index ].update_tag( refresh={ "OBJECT" } )
+    if changes[2] > 0:
+        for nodeObject in [ nodeObjects[ index ] for index in nodeOrder.order[ common: ].tolist() ]:
+            if len( nodeObject.users_collection ) > 1:
+                nodeCollection.objects.unlink( nodeObject )
+            else:
+                bpy.data.objects.remove( nodeObject )
+    if changes[1] > 0:
+        prefix = node_name_prefix( defaultNode )
+        if count > 0 and not sorts_before_fresh_names( nodeOrder.names[ -1 ], prefix ):
+            renumber_nodes( [ nodeObjects[ index ] for index in nodeOrder.order.tolist() ], prefix )
+        add_spline_nodes( locations[ count: ], defaultNode, nodeCollection, next_node_number( prefix ), translateLocation=False )
+    if changes[1] > 0 or changes[2] > 0:
+        NODE_ORDER_INDEX.invalidate( nodeCollection.name )
+    return changes
+
+#bring a listed spline in line with a spline read from a file, returns the summed ( moved, added, removed )
+#node counts of both collections, or None when nothing differed
+def sync_spline( context, splineItem, positions, lookats, duration ):
+    durationChanged = export_duration( splineItem.duration ) != export_duration( duration )
+    if durationChanged:
+        splineItem.duration = duration
+    if splineItem.packed:
+        ( currentPositions, currentLookats ) = read_spline_points( splineItem, minimumNodes=0 )
+        changes = np.add( node_changes( currentPositions, positions ), node_changes( currentLookats, lookats ) )
+        if changes.any():
+            splineItem.packedPositions = pack_points( positions )
+            splineItem.packedLookats   = pack_points( lookats )
+    else:
+        scene = context.scene
+        splineTree = splineItem.splineTree
+        if splineTree is None:
+            raise ExportError( "Collection error: SPLINE " + splineItem.name + " missing Target" )
+        nodeCollections = ( get_child_of_splinetree( splineTree, "DOLLY" ), get_child_of_splinetree( splineTree, "LOOKAT" ) )
+        if nodeCollections[0] is None or nodeCollections[1] is None:
+            raise ExportError( "Missing DOLLY or LOOKAT collection in " + splineTree.name )
+        create_default_nodes( context, scene.rootCollection )
+        changes = np.add( sync_collection_nodes( nodeCollections[0], scene.defaultDollyNode,  positions ),
+                          sync_collection_nodes( nodeCollections[1], scene.defaultLookatNode, lookats ) )
+        if changes.any():
+            EXPORT_CACHE.mark_dirty( splineTree.name )
+            if scene.show_paths:
+                PATH_DISPLAY.node_set_changed( splineTree.name )
+    if not changes.any() and not durationChanged:
+        return None
+    return changes
+
+#a spline of the file beyond the end of the list, added under the root collection as the import settings say
+def add_synced_spline( context, positions, lookats, duration ):
+    scene = context.scene
+    if scene.import_packed:
+        newItem = scene.splineList.add()
+        newItem.name = "spline.%03d" % len( scene.splineList )
+        newItem.packedPositions = pack_points( positions )
+        newItem.packedLookats   = pack_points( lookats )
+        newItem.packed = True
+    else:
+        newSplineTree = add_spline( context, None )
+        newItem = scene.splineList[ len( scene.splineList ) - 1 ]
+        for ( points, defaultNode, nodeCollection ) in ( ( positions, scene.defaultDollyNode,  newSplineTree[ SPLINETREE.DOLLY ] ),
+                                                         ( lookats,   scene.defaultLookatNode, newSplineTree[ SPLINETREE.LOOKAT ] ) ):
+            if scene.import_point_mesh:
+                add_point_mesh( points, nodeCollection )
+            else:
+                add_spline_nodes( points, defaultNode, nodeCollection, next_node_number( node_name_prefix( defaultNode ) ), translateLocation=False )
+    newItem.duration = duration
+
+#update the listed splines from the file in place instead of importing it again: spline i of the file
+#updates item i of the list, unchanged splines are left alone, and only the nodes whose count changed
+#are created or removed. Splines beyond the end of the file are taken off the list, their collections kept
+def sync_from_file( context, operator, params ):
     (input_file) = params
-    jsonFile = None
-    jsonData = None
+    scene = context.scene
+    if len( scene.splineList ) < 1:
+        import_file( context, operator, params )
+        return;
     
+    if context.object is not None and context.object.mode != "OBJECT":
+        bpy.ops.object.mode_set( mode="OBJECT" )
+    startTime = time.perf_counter()
+    conversion = get_axis_conversion( scene )
+    ( updated, unchanged, added ) = ( 0, 0, 0 )
+    nodeChanges = np.zeros( 3, dtype=np.int64 )
+    splineCount = 0
     try:
-        jsonFile = open(input_file, "r")
-        jsonString = jsonFile.read()
-        jsonData = json.loads( jsonString )
-    except FileNotFoundError:
-        operator.report( {"ERROR"}, "Could not find file " + input_file )        
-    except IOError:
-        operator.report( {"ERROR"}, "Could not read the file " + input_file )        
-    except:
-        operator.report( {"ERROR"}, "Could not read the file " + input_file )        
-    if jsonData is not None:
-        clear_spline_list( context )
-        now = datetime.now()
-        collectionMainImport = bpy.data.collections.new( "import." + datetime.now().strftime("%Y-%m-%d %H:%M:%S") )
-        create_default_nodes( context, collectionMainImport )
-        bpy.context.scene.collection.children.link( collectionMainImport )
-        for splineIndex in range( 0, len( jsonData["export"]), 1 ):
-            newSplineTree = create_new_spline_structure( collectionMainImport )
-            newItem = context.scene.splineList.add()
-            newItem.splineTree = newSplineTree[ SPLINETREE.SPLINE ]
-            newItem.name = newSplineTree[ SPLINETREE.SPLINE ].name
-            splineItem = jsonData[ "export" ][ splineIndex ]
-            for dollyIndex in range( 0, len( jsonData[ "export" ][ splineIndex ][ "position" ] ), 1 ):
-                add_spline_node( splineItem["position"][dollyIndex], context.scene.defaultDollyNode, newSplineTree[ SPLINETREE.DOLLY ] )
-            for lookatIndex in range( 0, len( jsonData[ "export" ][ splineIndex ][ "lookat" ] ), 1 ):
-                add_spline_node( splineItem["lookat"][lookatIndex], context.scene.defaultLookatNode, newSplineTree[ SPLINETREE.LOOKAT ] )
-        jsonFile.close()
-        
-        context.scene.rootCollection = collectionMainImport
+        for splineData in iter_cinematic_file( input_file ):
+            positions = conversion.to_blender( splineData[ "position" ] )
+            lookats   = conversion.to_blender( splineData[ "lookat" ] )
+            duration  = splineData.get( "duration", 10 )
+            with PROFILER.span( "sync nodes" ):
+                if splineCount < len( scene.splineList ):
+                    changes = sync_spline( context, scene.splineList[ splineCount ], positions, lookats, duration )
+                    if changes is None:
+                        unchanged += 1
+                    else:
+                        updated += 1
+                        nodeChanges += changes
+                else:
+                    add_synced_spline( context, positions, lookats, duration )
+                    added += 1
+            splineCount += 1
+    except ( ImportFileError, OSError ) as error:
+        report_import_error( operator, input_file, error )
+        return;
+    except ExportError as error:
+        operator.report( {"ERROR"}, str( error ) )
+        return;
+    
+    removed = max( 0, len( scene.splineList ) - splineCount )
+    for index in reversed( range( splineCount, len( scene.splineList ) ) ):
+        PATH_DISPLAY.remove( scene.splineList[ index ] )
+        scene.splineList.remove( index )
+    if scene.list_index >= len( scene.splineList ):
+        set_list_index( scene, max( 0, len( scene.splineList ) - 1 ) )
+    if updated > 0 or added > 0 or removed > 0:
+        NODE_SPATIAL_INDEX.invalidate()
+        context.view_layer.update()
+    ( moved, addedNodes, removedNodes ) = nodeChanges.tolist()
+    syncMessage = ( "Synced " + str( updated ) + " splines (" + str( moved ) + " nodes moved, " + str( addedNodes ) + " added, " + str( removedNodes ) + " removed), "
+                    + str( unchanged ) + " unchanged, " + str( added ) + " added, " + str( removed ) + " removed in " + "%.2f" % ( time.perf_counter() - startTime ) + " s" )
+    setattr( bpy.types.Scene, "status_message", syncMessage )
+    operator.report( {"INFO"}, syncMessage )
         
 def add_spline( context, operator, addNodes=False ):
     newSplineTree = create_new_spline_structure( context.scene.rootCollection )
@@ -197,12 +1415,433 @@ def add_spline( context, operator, addNodes=False ):
     splineList = context.scene.splineList
     index = len( splineList )
 
-    context.scene.list_index = index-1
+    set_list_index( context.scene, index-1 )
     create_default_nodes( context, context.scene.rootCollection )
     if addNodes:
         add_spline_node( bpy.context.scene.cursor.location, context.scene.defaultDollyNode,  newSplineTree[SPLINETREE.DOLLY],  translateLocation=False )
         add_spline_node( bpy.context.scene.cursor.location, context.scene.defaultLookatNode, newSplineTree[SPLINETREE.LOOKAT], translateLocation=False )
+    return newSplineTree
+
+#add a new spline holding recorded DOLLY and LOOKAT locations, created in one batch per collection
+def add_recorded_spline( context, operator, params ):
+    (positions, lookats) = params
+    if len( positions ) < 4:
+        operator.report( {"ERROR"}, "Recorded only " + str( len( positions ) ) + " samples, a spline needs at least 4" )
+        return;
+    
+    newSplineTree = add_spline( context, operator )
+    for ( points, defaultNode, nodeCollection ) in ( ( positions, context.scene.defaultDollyNode,  newSplineTree[ SPLINETREE.DOLLY ] ),
+                                                     ( lookats,   context.scene.defaultLookatNode, newSplineTree[ SPLINETREE.LOOKAT ] ) ):
+        add_spline_nodes( points, defaultNode, nodeCollection, next_node_number( node_name_prefix( defaultNode ) ), translateLocation=False )
+    operator.report( {"INFO"}, "Recorded " + str( len( positions ) ) + " nodes into " + newSplineTree[ SPLINETREE.SPLINE ].name )
+
+#packed splines keep their Blender space points on the SplineListItem as base64 float64 buffers
+def pack_points( points ):
+    return base64.b64encode( np.ascontiguousarray( points, dtype="<f8" ).tobytes() ).decode( "ascii" )
+
+def unpack_points( packedPoints ):
+    return np.frombuffer( base64.b64decode( packedPoints ), dtype="<f8" ).reshape( -1, 3 )
+
+#create the collections and nodes of a packed spline so it can be edited
+def unpack_spline( context, splineItem ):
+    positions = unpack_points( splineItem.packedPositions )
+    lookats   = unpack_points( splineItem.packedLookats )
+    create_default_nodes( context, context.scene.rootCollection )
+    newSplineTree = create_new_spline_structure( context.scene.rootCollection )
+    for ( points, defaultNode, nodeCollection ) in ( ( positions, context.scene.defaultDollyNode,  newSplineTree[ SPLINETREE.DOLLY ] ),
+                                                     ( lookats,   context.scene.defaultLookatNode, newSplineTree[ SPLINETREE.LOOKAT ] ) ):
+        add_spline_nodes( points, defaultNode, nodeCollection, next_node_number( node_name_prefix( defaultNode ) ), translateLocation=False )
+    splineItem.splineTree = newSplineTree[ SPLINETREE.SPLINE ]
+    splineItem.packed = False
+    splineItem.packedPositions = ""
+    splineItem.packedLookats = ""
+    if context.scene.show_paths:
+        PATH_DISPLAY.rebuild( context.scene, splineItem )
+
+#store the node locations of a spline on its list item and delete its nodes and collections,
+#objects also linked to other collections and collections holding anything else are kept
+def pack_spline( context, splineItem ):
+    ( positions, lookats ) = read_spline_points( splineItem, minimumNodes=0 )
+    PATH_DISPLAY.remove( splineItem )
+    splineTree = splineItem.splineTree
+    for nodeCollection in ( get_child_of_splinetree( splineTree, "DOLLY" ), get_child_of_splinetree( splineTree, "LOOKAT" ) ):
+        remove_node_objects( nodeCollection )
+        if len( nodeCollection.children ) == 0:
+            bpy.data.collections.remove( nodeCollection )
+    splineItem.packedPositions = pack_points( positions )
+    splineItem.packedLookats   = pack_points( lookats )
+    splineItem.packed = True
+    splineItem.splineTree = None
+    if len( splineTree.objects ) == 0 and len( splineTree.children ) == 0:
+        bpy.data.collections.remove( splineTree )
+
+def pack_splines( context, operator, params ):
+    (allSplines) = params
+    scene = context.scene
+    if len( scene.splineList ) < 1:
+        operator.report( {"ERROR"}, "Nothing to pack" )
+        return;
+    
+    if context.object is not None and context.object.mode != "OBJECT":
+        bpy.ops.object.mode_set( mode="OBJECT" )
+    splineItems = list( scene.splineList ) if allSplines else [ scene.splineList[ scene.list_index ] ]
+    packedCount = 0
+    for splineItem in splineItems:
+        if not splineItem.packed:
+            try:
+                pack_spline( context, splineItem )
+            except ExportError as error:
+                operator.report( {"ERROR"}, str( error ) )
+                return;
+            packedCount += 1
+    operator.report( {"INFO"}, "Packed " + str( packedCount ) + " splines" )
+
+#replace the vertices of point mesh data with the points, joined by edges in order
+def set_point_mesh_data( pointData, points ):
+    count = len( points )
+    pointData.clear_geometry()
+    pointData.vertices.add( count )
+    pointData.vertices.foreach_set( "co", np.asarray( points, dtype=np.float32 ).reshape( -1 ) )
+    if count > 1:
+        pointData.edges.add( count - 1 )
+        pointData.edges.foreach_set( "vertices", np.repeat( np.arange( count, dtype=np.int32 ), 2 )[ 1:-1 ] )
+    pointData.update()
+
+def add_point_mesh( points, nodeCollection ):
+    pointData = bpy.data.meshes.new( nodeCollection.name + ".points" )
+    set_point_mesh_data( pointData, points )
+    pointMesh = bpy.data.objects.new( nodeCollection.name + ".points", pointData )
+    pointMesh[ POINTS_PROPERTY ] = True
+    PROFILER.count( "objects created" )
+    pointMesh.show_in_front = True
+    nodeCollection.objects.link( pointMesh )
+    return pointMesh
+
+#objects also linked to other collections are only unlinked
+def remove_node_objects( nodeCollection ):
+    for nodeObject in list( nodeCollection.objects ):
+        if len( nodeObject.users_collection ) > 1:
+            nodeCollection.objects.unlink( nodeObject )
+        else:
+            pointData = nodeObject.data if nodeObject.get( POINTS_PROPERTY ) else None
+            bpy.data.objects.remove( nodeObject )
+            if pointData is not None and pointData.users == 0:
+                bpy.data.meshes.remove( pointData )
+
+#switch both node collections of a spline between one object per node and a single point mesh
+def convert_spline_nodes( context, splineItem, toPointMesh ):
+    scene = context.scene
+    for childType in ( "DOLLY", "LOOKAT" ):
+        nodeCollection = get_child_of_splinetree( splineItem.splineTree, childType )
+        if nodeCollection is None:
+            raise ExportError( "Missing DOLLY or LOOKAT collection in " + splineItem.splineTree.name )
+        pointMesh = get_point_mesh( nodeCollection )
+        if toPointMesh and pointMesh is None and len( nodeCollection.objects ) > 0:
+            points = read_collection_locations( nodeCollection )
+            remove_node_objects( nodeCollection )
+            add_point_mesh( points, nodeCollection )
+        elif not toPointMesh and pointMesh is not None:
+            points = read_point_mesh_locations( pointMesh )
+            remove_node_objects( nodeCollection )
+            create_default_nodes( context, scene.rootCollection )
+            defaultNode = scene.defaultDollyNode if childType == "DOLLY" else scene.defaultLookatNode
+            add_spline_nodes( points, defaultNode, nodeCollection, next_node_number( node_name_prefix( defaultNode ) ), translateLocation=False )
+
+def convert_splines( context, operator, params ):
+    (toPointMesh, allSplines) = params
+    scene = context.scene
+    if len( scene.splineList ) < 1:
+        operator.report( {"ERROR"}, "Nothing to convert" )
+        return;
+    
+    if context.object is not None and context.object.mode != "OBJECT":
+        bpy.ops.object.mode_set( mode="OBJECT" )
+    splineItems = list( scene.splineList ) if allSplines else [ scene.splineList[ scene.list_index ] ]
+    for splineItem in splineItems:
+        if splineItem.splineTree is not None:
+            try:
+                convert_spline_nodes( context, splineItem, toPointMesh )
+            except ExportError as error:
+                operator.report( {"ERROR"}, str( error ) )
+                return;
+    if scene.show_paths:
+        PATH_DISPLAY.rebuild_all( scene )
+    operator.report( {"INFO"}, "Converted " + str( len( splineItems ) ) + " splines to " + ( "point meshes" if toPointMesh else "node objects" ) )
+
+#edits made in edit mode only reach the mesh data once written back
+def sync_edit_mode( context ):
+    if context.object is not None and context.object.mode == "EDIT":
+        context.object.update_from_editmode()
+
+#make the spline of a node the selected item of the spline list
+def select_spline_item( scene, splineName ):
+    for index in range( 0, len( scene.splineList ), 1 ):
+        splineTree = scene.splineList[ index ].splineTree
+        if splineTree is not None and splineTree.name == splineName:
+            set_list_index( scene, index )
+            return scene.splineList[ index ]
+    return None
+
+#select the nodes and make the first one active; nodes of a point mesh select its vertices, which only
+#stick in object mode
+def select_spatial_nodes( context, spatialNodes ):
+    if context.object is not None and context.object.mode != "OBJECT":
+        bpy.ops.object.mode_set( mode="OBJECT" )
+    for selectedObject in context.selected_objects:
+        selectedObject.select_set( False )
+    activeObject = None
+    vertexSelections = {}
+    for spatialNode in spatialNodes:
+        nodeObject = bpy.data.objects.get( spatialNode.objectName )
+        nodeObject.select_set( True )
+        if spatialNode.isPoint:
+            vertexSelections.setdefault( nodeObject.name, [] ).append( spatialNode.sequence )
+        if activeObject is None:
+            activeObject = nodeObject
+    for ( pointMeshName, sequences ) in vertexSelections.items():
+        vertices = bpy.data.objects[ pointMeshName ].data.vertices
+        selected = np.zeros( len( vertices ), dtype=bool )
+        selected[ sequences ] = True
+        vertices.foreach_set( "select", selected )
+    if activeObject is not None:
+        context.view_layer.objects.active = activeObject
+
+def spatial_node_label( spatialNode ):
+    if spatialNode.isPoint:
+        return spatialNode.objectName + " vertex " + str( spatialNode.sequence )
+    return spatialNode.objectName
+
+def select_nearest_node( context, operator, params ):
+    (location) = params
+    
+    found = NODE_SPATIAL_INDEX.find( context.scene, location )
+    if len( found ) == 0:
+        operator.report( {"ERROR"}, "No spline nodes to search" )
+        return;
+    ( nodeLocation, index, distance ) = found[0]
+    spatialNode = NODE_SPATIAL_INDEX.nodes[ index ]
+    select_spatial_nodes( context, [ spatialNode ] )
+    select_spline_item( context.scene, spatialNode.splineName )
+    #no 3D view region when run from a script or in the background
+    if context.region_data is not None:
+        context.region_data.view_location = nodeLocation
+    message = "Nearest node: " + spatial_node_label( spatialNode ) + " of " + spatialNode.splineName + ", %.3f away" % distance
+    setattr( bpy.types.Scene, "status_message", message )
+    operator.report( {"INFO"}, message )
+
+def select_nodes_in_radius( context, operator, params ):
+    (location, radius) = params
+    
+    found = sorted( NODE_SPATIAL_INDEX.find( context.scene, location, radius ), key=lambda entry: entry[2] )
+    select_spatial_nodes( context, [ NODE_SPATIAL_INDEX.nodes[ index ] for ( nodeLocation, index, distance ) in found ] )
+    operator.report( {"INFO"}, "Selected " + str( len( found ) ) + " nodes" )
+
+#slot of a new node at location next to node sequence of a curve: between that node and the neighbour whose
+#segment passes closer, or before the first or after the last node; with its parameter along that segment
+def insertion_slot( points, sequence, location ):
+    ( slot, t, closest ) = ( sequence + 1, 1.0, np.inf )
+    for first in ( sequence - 1, sequence ):
+        if first >= 0 and first + 1 < len( points ):
+            segment = points[ first + 1 ] - points[ first ]
+            lengthSquared = float( segment @ segment )
+            along = 0.0 if lengthSquared == 0.0 else min( 1.0, max( 0.0, float( ( location - points[ first ] ) @ segment ) / lengthSquared ) )
+            distance = float( np.linalg.norm( location - ( points[ first ] + along * segment ) ) )
+            if distance < closest:
+                ( slot, t, closest ) = ( first + 1, along, distance )
+    if slot == 1 and t == 0.0:
+        return ( 0, 0.0 )
+    elif slot == len( points ) - 1 and t == 1.0:
+        return ( len( points ), 1.0 )
+    return ( slot, t )
+
+#location of the node inserted into the other curve of the spline at the same slot
+def paired_location( points, otherPoints, slot, t, location ):
+    if slot == 0:
+        return otherPoints[0] + ( location - points[0] )
+    elif slot == len( points ):
+        return otherPoints[ -1 ] + ( location - points[ -1 ] )
+    return otherPoints[ slot - 1 ] + t * ( otherPoints[ slot ] - otherPoints[ slot - 1 ] )
+
+#whether a node name sorts before the names renumber_nodes would hand out next
+def sorts_before_fresh_names( name, prefix ):
+    return natural_sort_key( name ) < natural_sort_key( prefix + ".%03d" % next_node_number( prefix ) )
+
+#a free name that sorts between the node names lowName and highName, None at either end of the collection, so
+#only the inserted node is named: 'dolly.005.1' between 'dolly.005' and 'dolly.006', 'dolly.005.0.1' between
+#'dolly.005' and 'dolly.005.1', 'dolly.011' before a first node 'dolly.012'. None when there is no such name
+def name_between( lowName, highName, prefix ):
+    if highName is None and ( lowName is None or sorts_before_fresh_names( lowName, prefix ) ):
+        return prefix + ".%03d" % next_node_number( prefix )
+    lowKey = natural_sort_key( lowName ) if lowName is not None else None
+    highKey = natural_sort_key( highName ) if highName is not None else None
+    if lowName is None:
+        match = re.match( re.escape( prefix ) + r"\.(\d+)", highName )
+        if match is None or int( match.group(1) ) == 0:
+            return None
+        lowName = prefix + "." + str( int( match.group(1) ) - 1 ).zfill( len( match.group(1) ) )
+        candidates = [ lowName ]
+    else:
+        candidates = []
+    base = lowName
+    for depth in range( NAME_BETWEEN_DEPTH ):
+        candidates += [ base + "." + str( number ) for number in range( 1, 10 ) ]
+        base += ".0"
+    for candidate in candidates:
+        candidateKey = natural_sort_key( candidate )
+        if ( len( candidate ) <= MAX_NAME_LENGTH and bpy.data.objects.get( candidate ) is None
+             and ( lowKey is None or lowKey < candidateKey ) and ( highKey is None or candidateKey < highKey ) ):
+            return candidate
+    return None
+
+#give the nodes fresh consecutive '<prefix>.<number>' names beyond every existing one, in the given order
+def renumber_nodes( nodes, prefix ):
+    startNumber = next_node_number( prefix )
+    nameFormat = prefix + ".%0" + str( max( 3, len( str( startNumber + len( nodes ) - 1 ) ) ) ) + "d"
+    for ( offset, node ) in enumerate( nodes ):
+        node.name = nameFormat % ( startNumber + offset )
+
+#insert a node at a world space location as sequence number slot of a DOLLY or LOOKAT collection. The node
+#and the nodes after it get fresh '<prefix>.<number>' names beyond every existing one, so they sort behind the
+#nodes before the slot; when those do not sort before the fresh names, the whole collection is renumbered
+def insert_collection_node( nodeCollection, defaultNode, slot, location ):
+    pointMesh = get_point_mesh( nodeCollection )
+    if pointMesh is not None:
+        vertices = pointMesh.data.vertices
+        coordinates = np.empty( len( vertices ) * 3, dtype=np.float32 )
+        vertices.foreach_get( "co", coordinates )
+        localLocation = ( np.linalg.inv( np.array( pointMesh.matrix_world, dtype=np.float64 ) ) @ np.append( location, 1.0 ) )[ :3 ]
+        set_point_mesh_data( pointMesh.data, np.insert( coordinates.reshape( -1, 3 ), slot, localLocation, axis=0 ) )
+        return
+    
+    nodeObjects = nodeCollection.objects
+    orderedNodes = [ nodeObjects[ index ] for index in get_node_order( nodeCollection, True ).tolist() ]
+    newNode = defaultNode.copy()
+    newNode.hide_render = False
+    newNode.hide_viewport = False
+    newNode.hide_select = False
+    #the new node follows the parent of its neighbour, the world space location is taken into that parent's space
+    worldLocation = location
+    if len( orderedNodes ) > 0:
+        neighbour = orderedNodes[ max( 0, slot - 1 ) ]
+        newNode.parent = neighbour.parent
+        newNode.matrix_parent_inverse = neighbour.matrix_parent_inverse.copy()
+    if newNode.parent is not None:
+        parentMatrix = np.array( newNode.parent.matrix_world, dtype=np.float64 ) @ np.array( newNode.matrix_parent_inverse, dtype=np.float64 )
+        location = ( np.linalg.inv( parentMatrix ) @ np.append( location, 1.0 ) )[ :3 ]
+    newNode.location = location.tolist()
+    for collection in newNode.users_collection:
+        collection.objects.unlink( newNode )
+    nodeObjects.link( newNode )
+    PROFILER.count( "objects created" )
+    #constraints copied from the default node can move it further, one evaluation measures by how much
+    if len( newNode.constraints ) > 0:
+        bpy.context.view_layer.update()
+        worldMatrix = np.array( newNode.matrix_world, dtype=np.float64 )
+        basisMatrix = np.array( newNode.matrix_basis, dtype=np.float64 )
+        #the change of the world location per unit of the location property
+        toWorld = ( worldMatrix @ np.linalg.inv( basisMatrix ) )[ :3, :3 ]
+        target = np.array( worldLocation, dtype=np.float64 )
+        newNode.location = ( location + np.linalg.solve( toWorld, target - worldMatrix[ :3, 3 ] ) ).tolist()
+    
+    prefix = node_name_prefix( defaultNode )
+    newName = name_between( orderedNodes[ slot - 1 ].name if slot > 0 else None, orderedNodes[ slot ].name if slot < len( orderedNodes ) else None, prefix )
+    if newName is not None:
+        newNode.name = newName
+    else:
+        #no free name fits between the neighbours, the nodes from the new one on are renumbered instead
+        renamedNodes = [ newNode ] + orderedNodes[ slot: ]
+        if slot > 0 and not sorts_before_fresh_names( orderedNodes[ slot - 1 ].name, prefix ):
+            renamedNodes = orderedNodes[ :slot ] + renamedNodes
+        renumber_nodes( renamedNodes, prefix )
+    NODE_ORDER_INDEX.invalidate( nodeCollection.name )
+
+#insert a node pair into the spline of the node nearest to the location: the node of that curve at the
+#location, the node of the other curve at the same slot along its path
+def insert_node_at_cursor( context, operator, params ):
+    (location) = params
+    scene = context.scene
+    
+    found = NODE_SPATIAL_INDEX.find( scene, location )
+    if len( found ) == 0:
+        operator.report( {"ERROR"}, "No spline nodes to insert between" )
+        return;
+    spatialNode = NODE_SPATIAL_INDEX.nodes[ found[0][1] ]
+    splineItem = select_spline_item( scene, spatialNode.splineName )
+    nodeCollections = [ get_child_of_splinetree( splineItem.splineTree, childType ) for childType in ( "DOLLY", "LOOKAT" ) ]
+    if nodeCollections[0] is None or nodeCollections[1] is None:
+        operator.report( {"ERROR"}, "Missing DOLLY or LOOKAT collection in " + spatialNode.splineName )
+        return;
+    sync_edit_mode( context )
+    curves = [ read_collection_locations( nodeCollection, True ) for nodeCollection in nodeCollections ]
+    if len( curves[0] ) != len( curves[1] ):
+        operator.report( {"ERROR"}, "Count mismatch in " + spatialNode.splineName )
+        return;
+    
+    curveIndex = spatialNode.curveIndex
+    location = np.array( location, dtype=np.float64 )
+    ( slot, t ) = insertion_slot( curves[ curveIndex ], spatialNode.sequence, location )
+    locations = [ location, location ]
+    locations[ 1 - curveIndex ] = paired_location( curves[ curveIndex ], curves[ 1 - curveIndex ], slot, t, location )
+    if context.object is not None and context.object.mode != "OBJECT":
+        bpy.ops.object.mode_set( mode="OBJECT" )
+    create_default_nodes( context, scene.rootCollection )
+    insert_collection_node( nodeCollections[0], scene.defaultDollyNode,  slot, locations[0] )
+    insert_collection_node( nodeCollections[1], scene.defaultLookatNode, slot, locations[1] )
+    NODE_SPATIAL_INDEX.invalidate()
+    EXPORT_CACHE.mark_dirty( spatialNode.splineName )
+    PATH_DISPLAY.node_set_changed( spatialNode.splineName )
+    operator.report( {"INFO"}, "Inserted node " + str( slot ) + " into " + spatialNode.splineName )
+
+#whether code is setting the selected row, and the spline the last pick in the list unpacked with its packed points
+SPLINE_SELECTION = { "internal": False, "splineName": None, "packedPositions": None, "packedLookats": None }
+
+#select a row of the spline list from code; only rows the user picks open packed splines
+def set_list_index( scene, index ):
+    SPLINE_SELECTION[ "internal" ] = True
+    try:
+        scene.list_index = index
+    finally:
+        SPLINE_SELECTION[ "internal" ] = False
+
+#update of list_index: picking a row in the list opens a packed spline for editing
+def unpack_selected_spline( scene, context ):
+    if not SPLINE_SELECTION[ "internal" ]:
+        open_selected_spline( context )
 
+#unpack the selected spline if it is packed, and pack the spline the previous pick unpacked again when its
+#nodes were left as they were
+def open_selected_spline( context ):
+    scene = context.scene
+    selectedItem = scene.splineList[ scene.list_index ] if 0 <= scene.list_index < len( scene.splineList ) else None
+    repack_unchanged_spline( context, selectedItem )
+    if selectedItem is not None and selectedItem.packed:
+        packedPoints = { "packedPositions": selectedItem.packedPositions, "packedLookats": selectedItem.packedLookats }
+        unpack_spline( context, selectedItem )
+        SPLINE_SELECTION.update( splineName=selectedItem.splineTree.name, **packedPoints )
+
+def repack_unchanged_spline( context, selectedItem ):
+    splineName = SPLINE_SELECTION[ "splineName" ]
+    if splineName is None or ( selectedItem is not None and selectedItem.splineTree is not None and selectedItem.splineTree.name == splineName ):
+        return
+    packedPositions = SPLINE_SELECTION[ "packedPositions" ]
+    packedLookats = SPLINE_SELECTION[ "packedLookats" ]
+    SPLINE_SELECTION.update( splineName=None, packedPositions=None, packedLookats=None )
+    #nodes being edited in edit mode have not been written back yet
+    if context.object is not None and context.object.mode != "OBJECT":
+        return
+    for splineItem in context.scene.splineList:
+        if splineItem.splineTree is not None and splineItem.splineTree.name == splineName:
+            try:
+                ( positions, lookats ) = read_spline_points( splineItem, minimumNodes=0 )
+            except ExportError:
+                return
+            #the nodes hold the packed points in single precision
+            ( oldPositions, oldLookats ) = ( unpack_points( packedPositions ), unpack_points( packedLookats ) )
+            if positions.shape == oldPositions.shape and lookats.shape == oldLookats.shape and np.allclose( positions, oldPositions, rtol=1e-6, atol=1e-6 ) and np.allclose( lookats, oldLookats, rtol=1e-6, atol=1e-6 ):
+                pack_spline( context, splineItem )
+                splineItem.packedPositions = packedPositions
+                splineItem.packedLookats = packedLookats
+            return
 
 def create_default_node( context, parentCollection, objName, matName, matColor ):
     bpy.ops.mesh.primitive_cube_add( size=1, location=(0,0,0) )
@@ -231,9 +1870,11 @@ def create_default_nodes( context, parentCollection ):
         context.scene.defaultLookatNode = create_default_node( context, parentCollection, "lookat(reference)", "spline.lookat", ( 0, 0, 1, 1 ) )
     return
 
+#the path curves drawn for the splines go with them, nothing would update or remove them later
 def clear_spline_list(context):
+     PATH_DISPLAY.remove_all( context.scene )
      context.scene.splineList.clear()
-     context.scene.list_index = 0
+     set_list_index( context.scene, 0 )
 
 def add_camera( context, operator, params ):
     cinematicCamera = bpy.data.objects.get( "OncyberCinematic" )
@@ -254,48 +1895,37 @@ def get_camera( ):
 
 #find a splineTree collection within the view layer
 def get_spline_collection_viewlayer( splineTreeName ):
-    view_layer = bpy.context.view_layer
-    layer_collection = view_layer.layer_collection
-    search_queue = layer_collection.children[:]
-    while search_queue:
-        current_collection = search_queue.pop(0)
-        if current_collection.name == splineTreeName:
-            return current_collection
-            break
-        search_queue.extend(current_collection.children)
-    else:
-        return None
+    return LAYER_COLLECTION_INDEX.get( bpy.context.view_layer, splineTreeName )
 
 #find the parent splineTree collection given a child dolly or lookat collection
 def get_parent_splinetree( nodeCollection ):
-    visited_collections = set()
-    collections_to_check = list( bpy.data.collections )
-    while collections_to_check:
-        current_collection = collections_to_check.pop()
-        if nodeCollection.name in current_collection.children.keys():
-            return current_collection
-        visited_collections.add( current_collection )
-        for child_collection in current_collection.children.values():
-            if child_collection not in visited_collections:
-                collections_to_check.append( child_collection )
-    return None
+    return SPLINE_TREE_INDEX.get_parent( nodeCollection )
     
 #find the child dolly or lookat collection given a splineTree
 def get_child_of_splinetree( splineTree, childType ):
-    for c in splineTree.children:
-        if c.name.startswith( childType.lower() ):
-            return c
-    return None
+    return SPLINE_TREE_INDEX.get_child( splineTree, childType )
     
 def preview_node( context, operator, params ):
     cancel_preview( context, operator, params )
     
-    if bpy.context.active_object is None or bpy.context.active_object.name.startswith( "dolly." ) == False :
+    activeObject = bpy.context.active_object
+    pointMesh = activeObject if activeObject is not None and activeObject.get( POINTS_PROPERTY ) else None
+    if activeObject is None or ( pointMesh is None and activeObject.name.startswith( "dolly." ) == False ):
         operator.report( {"ERROR"}, "Please select a DOLLY object first" )
         return;
                 
     cinematicCamera = get_camera()
-    if cinematicCamera is not None:
+    if cinematicCamera is not None and pointMesh is not None:
+        bpy.context.scene.camera = cinematicCamera
+        if not preview_point_node( context, operator, cinematicCamera, pointMesh ):
+            return None
+        
+        #no 3D view region when run from a script or in the background
+        if context.region_data is not None:
+            context.region_data.view_perspective = "CAMERA"
+        show_hide_splines( context, True )
+        operator.report( {"INFO"}, "Preview active" )
+    elif cinematicCamera is not None:
         bpy.context.scene.camera = cinematicCamera
         dollyObject = bpy.context.active_object;
         if len( dollyObject.users_collection ) != 1:
@@ -309,47 +1939,1567 @@ def preview_node( context, operator, params ):
         if len(dollyCollection.objects) != len(lookatCollection.objects):
             operator.report({"ERROR"}, "Count mismatch in " + splineTreeSpline.name )
             return None
-                
-        dollysSorted  = sorted( dollyCollection.objects,  key=lambda obj: obj.name )
-        lookatsSorted = sorted( lookatCollection.objects, key=lambda obj: obj.name )        
-        
-        dollyIndex = None
-        for tempIndex in range( 0, len( dollysSorted ), 1 ):
-            if dollysSorted[ tempIndex ].name == dollyObject.name:
-                dollyIndex = tempIndex
-                break
-        
-        lookatObject = lookatsSorted[ dollyIndex ]
-        if dollyObject is not None:
-            cinematicCamera.location = dollyObject.location
-            cinematicCamera.rotation_euler = dollyObject.rotation_euler
+                
+        dollyIndex = NODE_ORDER_INDEX.get_sequence( dollyCollection, dollyObject )
+        
+        lookatObject = lookatCollection.objects[ int( get_node_order( lookatCollection )[ dollyIndex ] ) ]
+        if dollyObject is not None:
+            if context.scene.export_world_space:
+                cinematicCamera.location = dollyObject.matrix_world.translation
+            else:
+                cinematicCamera.location = dollyObject.location
+            cinematicCamera.rotation_euler = dollyObject.rotation_euler
+
+        if lookatObject is not None:
+            cinematicCamera.constraints.new( "TRACK_TO" )
+            cinematicCamera.constraints[ "Track To" ].target = lookatObject
+            cinematicCamera.constraints[ "Track To" ].track_axis = "TRACK_NEGATIVE_Z"
+
+        if context.region_data is not None:
+            context.region_data.view_perspective = "CAMERA"
+        
+        show_hide_splines( context, True )
+        
+        if cinematicCamera.animation_data is not None and is_preview_action( cinematicCamera.animation_data.action ):
+            operator.report( {"WARNING"}, "The camera has a baked preview which overrides its position, clear it to preview single nodes" )
+            return
+        
+        operator.report( {"INFO"}, "Preview active" )
+    else:
+        operator.report( {"ERROR"}, "Please select a camera" )
+
+#preview the selected vertex of a DOLLY point mesh, the camera is aimed directly since there is no
+#LOOKAT object to track
+def preview_point_node( context, operator, cinematicCamera, pointMesh ):
+    dollyCollection = pointMesh.users_collection[0]
+    if not dollyCollection.name.startswith( "dolly" ):
+        operator.report( {"ERROR"}, "Please select a DOLLY object first" )
+        return False
+    splineTreeSpline = get_parent_splinetree( dollyCollection )
+    lookatCollection = None if splineTreeSpline is None else get_child_of_splinetree( splineTreeSpline, "lookat" )
+    if lookatCollection is None or node_count( dollyCollection ) != node_count( lookatCollection ):
+        operator.report( {"ERROR"}, "Count mismatch in " + dollyCollection.name )
+        return False
+    
+    selected = np.zeros( len( pointMesh.data.vertices ), dtype=bool )
+    pointMesh.data.vertices.foreach_get( "select", selected )
+    selectedIndices = np.flatnonzero( selected )
+    if len( selectedIndices ) != 1:
+        operator.report( {"ERROR"}, "Please select a single DOLLY vertex in edit mode" )
+        return False
+    
+    worldSpace = context.scene.export_world_space
+    position = read_point_mesh_locations( pointMesh, worldSpace )[ selectedIndices[0] ]
+    lookat   = read_collection_locations( lookatCollection, worldSpace )[ selectedIndices[0] ]
+    cinematicCamera.location = position.tolist()
+    cinematicCamera.rotation_mode = "XYZ"
+    cinematicCamera.rotation_euler = look_at_rotations( position[ np.newaxis ], lookat[ np.newaxis ] )[0].tolist()
+    return True
+
+def show_hide_splines( context, hideInViewport ):
+    for index in range( 0, len( context.scene.splineList ), 1 ):
+        splineTree = context.scene.splineList[ index ].splineTree
+        if splineTree is not None:
+            splineTree.hide_viewport = hideInViewport
+
+def cancel_preview( context, operator, params ):
+    if context.region_data is not None:
+        context.region_data.view_perspective = "PERSP"
+    show_hide_splines( context, False )
+    cinematicCamera = get_camera()
+    if cinematicCamera is not None:
+        for cns in cinematicCamera.constraints:
+            cinematicCamera.constraints.remove( cns )
+
+#Euler XYZ rotations that point a camera's -Z axis from each position towards its lookat, with no roll
+#(the same orientation a Track To constraint with the default up axis gives)
+def look_at_rotations( positions, lookats ):
+    direction = lookats - positions
+    rotations = np.empty_like( direction )
+    rotations[ :, 0 ] = np.arctan2( np.hypot( direction[ :, 0 ], direction[ :, 1 ] ), -direction[ :, 2 ] )
+    rotations[ :, 1 ] = 0.0
+    rotations[ :, 2 ] = np.unwrap( np.arctan2( -direction[ :, 0 ], direction[ :, 1 ] ) )
+    return rotations
+
+#replace all keys of one F-curve channel, written through the keyframe point arrays in one go
+def write_fcurve( action, dataPath, index, frames, values ):
+    fcurve = action.fcurves.find( dataPath, index=index )
+    if fcurve is not None:
+        action.fcurves.remove( fcurve )
+    fcurve = action.fcurves.new( dataPath, index=index, action_group="Oncyber Preview" )
+    fcurve.keyframe_points.add( len( frames ) )
+    coordinates = np.empty( len( frames ) * 2, dtype=np.float32 )
+    coordinates[ 0::2 ] = frames
+    coordinates[ 1::2 ] = values
+    fcurve.keyframe_points.foreach_set( "co", coordinates )
+    fcurve.update()
+
+#camera locations and rotations of one spline at every frame of its duration
+def bake_spline_samples( positions, lookats, duration, fps, curveType ):
+    frameCount = max( 2, int( round( duration * fps ) ) )
+    ( cameraLocations, cameraLookats ) = CinematicPath( positions, lookats, duration, curveType ).sample( frameCount )
+    return ( cameraLocations, look_at_rotations( cameraLocations, cameraLookats ) )
+
+def bake_preview( context, operator, params ):
+    (selectedOnly) = params
+    scene = context.scene
+    cinematicCamera = get_camera()
+    if cinematicCamera is None:
+        operator.report( {"ERROR"}, "Please select a camera" )
+        return;
+    if len( scene.splineList ) < 1:
+        operator.report( {"ERROR"}, "Nothing to bake" )
+        return;
+    
+    startTime = time.perf_counter()
+    fps = scene.render.fps / scene.render.fps_base
+    splineItems = [ scene.splineList[ scene.list_index ] ] if selectedOnly else list( scene.splineList )
+    locations = []
+    rotations = []
+    rebuilt = 0
+    for splineItem in splineItems:
+        try:
+            ( positions, lookats ) = read_spline_points( splineItem, scene.export_world_space )
+        except ExportError as error:
+            operator.report( {"ERROR"}, str( error ) )
+            return;
+        #only re-evaluate splines whose nodes or timing changed since the last bake
+        digest = hashlib.sha1( positions.tobytes() + lookats.tobytes() + repr( ( splineItem.duration, fps, scene.curve_type ) ).encode() ).digest()
+        cached = BAKE_CACHE.get( spline_cache_name( splineItem ) )
+        if cached is None or cached[0] != digest:
+            cached = ( digest, ) + bake_spline_samples( positions, lookats, splineItem.duration, fps, scene.curve_type )
+            BAKE_CACHE[ spline_cache_name( splineItem ) ] = cached
+            rebuilt += 1
+        locations.append( cached[1] )
+        rotations.append( cached[2] )
+    locations = np.concatenate( locations )
+    rotations = np.concatenate( rotations )
+    rotations[ :, 2 ] = np.unwrap( rotations[ :, 2 ] )
+    frames = np.arange( len( locations ), dtype=np.float64 ) + scene.frame_start
+    
+    for cns in cinematicCamera.constraints:
+        cinematicCamera.constraints.remove( cns )
+    cinematicCamera.rotation_mode = "XYZ"
+    animationData = cinematicCamera.animation_data or cinematicCamera.animation_data_create()
+    #the keys go into an action of their own, the camera's own action is kept aside until the bake is cleared
+    previewAction = animationData.action
+    if not is_preview_action( previewAction ):
+        previewAction = bpy.data.actions.new( cinematicCamera.name + ".preview" )
+        previewAction[ PREVIEW_ACTION_PROPERTY ] = True
+        if animationData.action is not None:
+            previewAction[ PREVIOUS_ACTION_PROPERTY ] = animationData.action
+        animationData.action = previewAction
+    for axis in range( 0, 3, 1 ):
+        write_fcurve( previewAction, "location",       axis, frames, locations[ :, axis ] )
+        write_fcurve( previewAction, "rotation_euler", axis, frames, rotations[ :, axis ] )
+    scene.frame_end = int( frames[ -1 ] )
+    scene.camera = cinematicCamera
+    
+    operator.report( {"INFO"}, "Baked " + str( len( frames ) ) + " frames, " + str( rebuilt ) + " of " + str( len( splineItems ) ) + " splines re-evaluated in " + "%.3f" % ( time.perf_counter() - startTime ) + " s" )
+
+#True for an action created by bake_preview
+def is_preview_action( action ):
+    return action is not None and bool( action.get( PREVIEW_ACTION_PROPERTY ) )
+
+def clear_bake_preview( context, operator, params ):
+    cinematicCamera = get_camera()
+    if cinematicCamera is None or cinematicCamera.animation_data is None or not is_preview_action( cinematicCamera.animation_data.action ):
+        operator.report( {"ERROR"}, "No baked preview to clear" )
+        return;
+    previewAction = cinematicCamera.animation_data.action
+    cinematicCamera.animation_data.action = previewAction.get( PREVIOUS_ACTION_PROPERTY )
+    if previewAction.users == 0:
+        bpy.data.actions.remove( previewAction )
+    BAKE_CACHE.clear()
+    operator.report( {"INFO"}, "Baked preview cleared" )
+
+#visible meshes of the venue collection, or of the view layer when none is set, without the spline nodes
+def occlusion_objects( context ):
+    venueCollection = context.scene.occlusion_collection
+    candidates = context.view_layer.objects if venueCollection is None else venueCollection.all_objects
+    splineNames = listed_spline_names( context.scene )
+    return [ candidate for candidate in candidates
+             if candidate.type == "MESH" and candidate.visible_get() and not is_spline_object( context.scene, candidate, splineNames ) ]
+
+def listed_spline_names( scene ):
+    return { splineItem.splineTree.name for splineItem in scene.splineList if splineItem.splineTree is not None }
+
+#True for the objects that make up the splines rather than the venue: the reference nodes, point meshes, and
+#anything in a dolly or lookat collection or in a collection of a listed spline
+def is_spline_object( scene, candidate, splineNames ):
+    if candidate.get( POINTS_PROPERTY ) or candidate in ( scene.defaultDollyNode, scene.defaultLookatNode ):
+        return True
+    if not SPLINE_TREE_INDEX.valid:
+        SPLINE_TREE_INDEX.rebuild()
+    for collection in candidate.users_collection:
+        collectionName = collection.name
+        if collectionName.startswith( ( "dolly", "lookat" ) ) or collectionName in splineNames or SPLINE_TREE_INDEX.parents.get( collectionName ) in splineNames:
+            return True
+    return False
+
+#True for each segment from starts to ends that hits the BVH tree; the rays are prepared with array operations
+#and only the casts themselves run per segment
+def blocked_segments( tree, starts, ends ):
+    directions = ends - starts
+    lengths = np.linalg.norm( directions, axis=1 )
+    blocked = np.zeros( len( starts ), dtype=bool )
+    cast = np.flatnonzero( lengths > 2.0 * OCCLUSION_MARGIN )
+    directions = directions[ cast ] / lengths[ cast, np.newaxis ]
+    origins = starts[ cast ] + directions * OCCLUSION_MARGIN
+    rayCast = tree.ray_cast
+    for ( index, origin, direction, distance ) in zip( cast.tolist(), origins.tolist(), directions.tolist(), ( lengths[ cast ] - 2.0 * OCCLUSION_MARGIN ).tolist() ):
+        blocked[ index ] = rayCast( origin, direction, distance )[0] is not None
+    return blocked
+
+#check the camera of one spline against the tree: the sightline of every node, and the sightline of every
+#camera position sampled along the path as the player flies it plus the step to the next position
+def spline_occlusion( tree, positions, lookats, curveType, samplesPerSegment ):
+    segmentCount = len( positions ) - 1
+    path = CinematicPath( positions, lookats, curveType=curveType )
+    u = np.linspace( 0.0, 1.0, segmentCount * samplesPerSegment + 1 )
+    ( cameraLocations, cameraLookats ) = path.evaluate_at( u )
+    segments = np.minimum( ( path.positionCurve.parameters_at( u ) * segmentCount ).astype( np.int64 ), segmentCount - 1 )
+    blockedNodes = np.flatnonzero( blocked_segments( tree, positions, lookats ) )
+    blockedSightlines = blocked_segments( tree, cameraLocations, cameraLookats )
+    blockedSteps = blocked_segments( tree, cameraLocations[ :-1 ], cameraLocations[ 1: ] )
+    blocked = np.union1d( np.union1d( segments[ blockedSightlines ], segments[ :-1 ][ blockedSteps ] ), np.minimum( blockedNodes, segmentCount - 1 ) )
+    return ( blocked.tolist(), blockedNodes.tolist(), int( np.count_nonzero( blockedSightlines ) ), int( np.count_nonzero( blockedSteps ) ), segmentCount )
+
+#DOLLY nodes of the given sequence numbers as spatial index nodes, for selection
+def dolly_spatial_nodes( splineItem, sequences ):
+    dollys = get_child_of_splinetree( splineItem.splineTree, "DOLLY" )
+    pointMesh = get_point_mesh( dollys )
+    if pointMesh is not None:
+        return [ SpatialNode( splineItem.splineTree.name, 0, sequence, pointMesh.name, True ) for sequence in sequences ]
+    names = NODE_ORDER_INDEX.get( dollys, True ).names
+    return [ SpatialNode( splineItem.splineTree.name, 0, sequence, names[ sequence ], False ) for sequence in sequences ]
+
+#check every spline for blocked views and camera paths and select the DOLLY node starting each blocked segment
+def check_occlusion( context, operator, params ):
+    (samplesPerSegment) = params
+    scene = context.scene
+    if len( scene.splineList ) < 1:
+        operator.report( {"ERROR"}, "Nothing to check" )
+        return;
+    venueObjects = occlusion_objects( context )
+    if len( venueObjects ) == 0:
+        operator.report( {"ERROR"}, "No visible venue meshes to check against" )
+        return;
+    
+    startTime = time.perf_counter()
+    sync_edit_mode( context )
+    tree = OCCLUSION_TREE.get( context.evaluated_depsgraph_get(), venueObjects )
+    OCCLUSION_RESULTS.clear()
+    blockedNodes = []
+    for splineItem in scene.splineList:
+        try:
+            ( positions, lookats ) = read_spline_points( splineItem, True, minimumNodes=2 )
+        except ExportError as error:
+            operator.report( {"WARNING"}, "Skipped: " + str( error ) )
+        else:
+            result = spline_occlusion( tree, positions, lookats, scene.curve_type, samplesPerSegment )
+            OCCLUSION_RESULTS[ spline_cache_name( splineItem ) ] = result
+            if splineItem.splineTree is not None and len( result[0] ) > 0:
+                blockedNodes.extend( dolly_spatial_nodes( splineItem, sorted( set( result[0] ) | set( result[1] ) ) ) )
+    if len( blockedNodes ) > 0:
+        select_spatial_nodes( context, blockedNodes )
+    
+    blockedSplines = sum( 1 for result in OCCLUSION_RESULTS.values() if len( result[0] ) > 0 )
+    message = str( blockedSplines ) + " of " + str( len( OCCLUSION_RESULTS ) ) + " splines blocked, checked against " + str( OCCLUSION_TREE.triangleCount ) + " triangles in " + "%.2f" % ( time.perf_counter() - startTime ) + " s"
+    setattr( bpy.types.Scene, "status_message", message )
+    operator.report( {"WARNING"} if blockedSplines > 0 else {"INFO"}, message )
+
+def contact_sheet_directory( scene ):
+    if scene.contact_sheet_dir:
+        return bpy.path.abspath( scene.contact_sheet_dir )
+    return os.path.join( tempfile.gettempdir(), CONTACT_SHEET_DIRECTORY )
+
+#the parts of a material or world a render sees: its color, or the nodes, input values, images and links of its node tree
+def node_tree_state( idBlock ):
+    state = [ idBlock.name, idBlock.use_nodes ]
+    nodeTree = getattr( idBlock, "node_tree", None )
+    if nodeTree is None or not idBlock.use_nodes:
+        state.append( list( idBlock.diffuse_color if hasattr( idBlock, "diffuse_color" ) else idBlock.color ) )
+        return state
+    for node in nodeTree.nodes:
+        image = getattr( node, "image", None )
+        state.append( [ node.name, node.bl_idname, image.name if image is not None else None ] )
+        for socket in node.inputs:
+            if not socket.is_linked and hasattr( socket, "default_value" ):
+                value = socket.default_value
+                state.append( value if isinstance( value, ( str, int, float ) ) else list( value ) )
+    for link in nodeTree.links:
+        state.append( [ link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier ] )
+    return state
+
+#sha1 of the venue as the thumbnails see it: transform, data name, modifiers and materials of every object besides
+#the splines and cameras, the vertices and faces of meshes, the settings of lights, the materials and the world.
+#Computed from the scene alone, so it is the same in every session; kept until the depsgraph handler sees an edit
+def venue_key( scene ):
+    if VENUE_STATE[ "key" ] is not None:
+        return VENUE_STATE[ "key" ]
+    splineNames = listed_spline_names( scene )
+    digest = hashlib.sha1()
+    state = []
+    materials = {}
+    for venueObject in sorted( scene.objects, key=lambda candidate: candidate.name ):
+        if venueObject.type == "CAMERA" or is_spline_object( scene, venueObject, splineNames ):
+            continue
+        objectData = venueObject.data
+        state.append( [ venueObject.name, venueObject.type, venueObject.hide_render, objectData.name if objectData is not None else None,
+                        [ modifier.name for modifier in venueObject.modifiers ], [ slot.name for slot in venueObject.material_slots ] ] )
+        digest.update( np.array( venueObject.matrix_world, dtype="<f8" ).tobytes() )
+        for slot in venueObject.material_slots:
+            if slot.material is not None:
+                materials[ slot.material.name ] = slot.material
+        if venueObject.type == "MESH":
+            vertices = np.empty( len( objectData.vertices ) * 3, dtype="<f4" )
+            objectData.vertices.foreach_get( "co", vertices )
+            loops = np.empty( len( objectData.loops ), dtype="<i4" )
+            objectData.loops.foreach_get( "vertex_index", loops )
+            digest.update( vertices.tobytes() )
+            digest.update( loops.tobytes() )
+            state.append( len( objectData.polygons ) )
+        elif venueObject.type == "LIGHT":
+            state.append( [ objectData.type, list( objectData.color ), objectData.energy, objectData.shadow_soft_size ] )
+    for materialName in sorted( materials ):
+        state.append( node_tree_state( materials[ materialName ] ) )
+    if scene.world is not None:
+        state.append( node_tree_state( scene.world ) )
+    digest.update( json.dumps( state ).encode( "utf-8" ) )
+    VENUE_STATE[ "key" ] = digest.hexdigest()
+    return VENUE_STATE[ "key" ]
+
+#everything besides the node pair that changes a thumbnail: the file and scene rendered, the state of the venue,
+#the render size and the settings of the viewer camera
+def contact_sheet_settings( scene ):
+    render = scene.render
+    width = scene.contact_sheet_size
+    height = max( 1, round( width * ( render.resolution_y * render.pixel_aspect_y ) / ( render.resolution_x * render.pixel_aspect_x ) ) )
+    cameraData = scene.viewerCamera.data if scene.viewerCamera is not None else None
+    return {
+        "file": bpy.data.filepath,
+        "scene": scene.name,
+        "venue": venue_key( scene ),
+        "width": width,
+        "height": height,
+        "samples": CONTACT_SHEET_SAMPLES,
+        "lens": cameraData.lens if cameraData is not None else CONTACT_SHEET_LENS,
+        "sensorWidth": cameraData.sensor_width if cameraData is not None else 36.0,
+        "sensorHeight": cameraData.sensor_height if cameraData is not None else 24.0,
+        "sensorFit": cameraData.sensor_fit if cameraData is not None else "AUTO",
+        "clipStart": cameraData.clip_start if cameraData is not None else 0.1,
+        "clipEnd": cameraData.clip_end if cameraData is not None else 1000.0
+    }
+
+#cache key of every node pair: sha1 of the settings and the world space DOLLY and LOOKAT locations,
+#so a thumbnail is only rendered again once its own pair, the camera or the venue changed
+def contact_sheet_keys( settings, positions, lookats ):
+    settingsDigest = hashlib.sha1( json.dumps( settings, sort_keys=True ).encode( "utf-8" ) ).digest()
+    pairs = np.ascontiguousarray( np.hstack( ( positions, lookats ) ), dtype="<f8" )
+    return [ hashlib.sha1( settingsDigest + pair.tobytes() ).hexdigest() for pair in pairs ]
+
+#the thumbnails of one spline: the node pairs without a cached thumbnail are rendered by background Blender
+#processes from a saved copy of the file, each process rendering its share of them one after the other
+class ContactSheetJob:
+    def __init__( self, scene, splineItem ):
+        self.splineName = spline_cache_name( splineItem )
+        self.label = splineItem.name
+        self.directory = contact_sheet_directory( scene )
+        self.settings = contact_sheet_settings( scene )
+        #one copy per file, scene and venue state, the splines in it are hidden by the workers
+        copyState = [ self.settings[ "file" ], self.settings[ "scene" ], self.settings[ "venue" ] ]
+        self.sceneFile = os.path.join( self.directory, "scene." + hashlib.sha1( json.dumps( copyState ).encode( "utf-8" ) ).hexdigest()[:16] + ".blend" )
+        self.sheetName = self.settings[ "file" ] + "|" + self.settings[ "scene" ] + "|" + self.splineName
+        self.workers = scene.contact_sheet_workers
+        ( positions, lookats ) = read_spline_points( splineItem, True, minimumNodes=1 )
+        self.keys = contact_sheet_keys( self.settings, positions, lookats )
+        rotations = look_at_rotations( positions, lookats )
+        self.tasks = []
+        queued = set()
+        for ( sequence, key ) in enumerate( self.keys ):
+            thumbnailFile = self.thumbnail_file( key )
+            if key not in queued and not os.path.exists( thumbnailFile ):
+                queued.add( key )
+                self.tasks.append( { "file": thumbnailFile, "location": positions[ sequence ].tolist(), "rotation": rotations[ sequence ].tolist() } )
+        self.workDir = None
+        self.cancelEvent = threading.Event()
+        self.errors = []
+        self.startTime = time.perf_counter()
+
+    def thumbnail_file( self, key ):
+        return os.path.join( self.directory, key + ".png" )
+
+    def progress( self ):
+        return sum( 1 for task in self.tasks if os.path.exists( task[ "file" ] ) ) / max( 1, len( self.tasks ) )
+
+    #the workers read the scene from disk, a copy holds it with every unsaved change; it is only saved again once
+    #the venue changed, the task files go to a directory of this job
+    def save_copy( self ):
+        os.makedirs( self.directory, exist_ok=True )
+        if not os.path.exists( self.sceneFile ):
+            bpy.ops.wm.save_as_mainfile( filepath=self.sceneFile, copy=True, check_existing=False )
+        self.workDir = tempfile.mkdtemp( prefix="oncyber.", dir=self.directory )
+
+    #render one share of the tasks in a background Blender process, killed when the job is cancelled
+    def render_share( self, index, tasks, threads ):
+        taskFile = os.path.join( self.workDir, "tasks.%d.json" % index )
+        with open( taskFile, "w" ) as jsonFile:
+            json.dump( { "settings": self.settings, "threads": threads, "tasks": tasks }, jsonFile )
+        command = [ bpy.app.binary_path, "--background", "--factory-startup", self.sceneFile, "--python", ADDON_FILE, "--", "render-worker", "--tasks", taskFile ]
+        try:
+            process = subprocess.Popen( command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True )
+            while True:
+                try:
+                    output = process.communicate( timeout=0.2 )[0]
+                    break
+                except subprocess.TimeoutExpired:
+                    if self.cancelEvent.is_set():
+                        process.kill()
+                        process.communicate()
+                        return
+            if process.returncode != 0:
+                self.errors.append( "Render worker exited with code " + str( process.returncode ) + ": " + " | ".join( output.strip().splitlines()[-3:] ) )
+        finally:
+            os.remove( taskFile )
+
+    #runs on the contact sheet thread; Cycles gets an equal share of the CPU cores in every process
+    def run( self ):
+        workers = max( 1, min( self.workers, len( self.tasks ) ) )
+        threads = max( 1, ( os.cpu_count() or 1 ) // workers )
+        try:
+            with ThreadPoolExecutor( max_workers=workers ) as pool:
+                list( pool.map( lambda index: self.render_share( index, self.tasks[ index::workers ], threads ), range( 0, workers, 1 ) ) )
+        finally:
+            #a killed worker may have left the thumbnail it was writing
+            for task in self.tasks:
+                if os.path.exists( task[ "file" ] + ".part" ):
+                    os.remove( task[ "file" ] + ".part" )
+            for fileName in os.listdir( self.workDir ):
+                os.remove( os.path.join( self.workDir, fileName ) )
+            os.rmdir( self.workDir )
+
+    #record the thumbnails of this sheet in the index and remove the thumbnails and copies no sheet shows any more;
+    #sheets of files that no longer exist are dropped from it
+    def prune( self ):
+        indexFile = os.path.join( self.directory, CONTACT_SHEET_INDEX )
+        try:
+            with open( indexFile, "r" ) as jsonFile:
+                index = json.load( jsonFile )
+        except ( OSError, ValueError ):
+            index = {}
+        index[ self.sheetName ] = { "file": self.settings[ "file" ], "scene": os.path.basename( self.sceneFile ), "keys": sorted( set( self.keys ) ) }
+        index = { sheetName: sheet for ( sheetName, sheet ) in index.items() if os.path.exists( sheet[ "file" ] ) }
+        referenced = set()
+        for sheet in index.values():
+            referenced.add( sheet[ "scene" ] )
+            referenced.update( key + ".png" for key in sheet[ "keys" ] )
+        os.makedirs( self.directory, exist_ok=True )
+        write_file_atomic( indexFile, lambda jsonFile: json.dump( index, jsonFile, sort_keys=True ) )
+        for fileName in os.listdir( self.directory ):
+            if CONTACT_SHEET_FILE.match( fileName ) and fileName not in referenced:
+                os.remove( os.path.join( self.directory, fileName ) )
+
+    def message( self ):
+        rendered = sum( 1 for task in self.tasks if os.path.exists( task[ "file" ] ) )
+        return ( "Contact sheet of " + self.label + ": " + str( rendered ) + " rendered, " + str( len( self.keys ) - len( self.tasks ) ) + " cached in "
+                 + "%.2f" % ( time.perf_counter() - self.startTime ) + " s" )
+
+#the job of the selected spline, None when there is nothing to render
+def start_contact_sheet( context, operator, params ):
+    scene = context.scene
+    if len( scene.splineList ) < 1:
+        operator.report( {"ERROR"}, "Nothing to render" )
+        return None
+    if not bpy.data.is_saved:
+        operator.report( {"ERROR"}, "Save the file first, the thumbnails are rendered from it" )
+        return None
+    
+    sync_edit_mode( context )
+    try:
+        job = ContactSheetJob( scene, scene.splineList[ scene.list_index ] )
+    except ExportError as error:
+        operator.report( {"ERROR"}, str( error ) )
+        return None
+    if len( job.tasks ) > 0:
+        job.save_copy()
+    return job
+
+#show the thumbnails of a finished job, or render them here when no future is given
+def complete_contact_sheet( job, operator, future=None ):
+    try:
+        if len( job.tasks ) > 0:
+            if future is None:
+                job.run()
+            else:
+                future.result()
+    except OSError as error:
+        operator.report( {"ERROR"}, "Could not start the render workers: " + str( error ) )
+        return;
+    if job.cancelEvent.is_set():
+        return;
+    CONTACT_SHEET_PREVIEWS.clear()
+    for key in dict.fromkeys( job.keys ):
+        thumbnailFile = job.thumbnail_file( key )
+        if os.path.exists( thumbnailFile ):
+            CONTACT_SHEET_PREVIEWS.load( key, thumbnailFile, "IMAGE" )
+    CONTACT_SHEET.update( spline=job.splineName, label=job.label, keys=job.keys )
+    try:
+        job.prune()
+    except OSError as error:
+        operator.report( {"WARNING"}, "Could not prune the thumbnail cache: " + str( error ) )
+    for error in job.errors:
+        operator.report( {"ERROR"}, error )
+    message = job.message()
+    setattr( bpy.types.Scene, "status_message", message )
+    operator.report( {"INFO"}, message )
+
+#select the DOLLY node of a contact sheet thumbnail, a packed spline is unpacked as if picked in the list
+def select_contact_node( context, operator, params ):
+    (sequence) = params
+    scene = context.scene
+    for index in range( 0, len( scene.splineList ), 1 ):
+        splineItem = scene.splineList[ index ]
+        if spline_cache_name( splineItem ) == CONTACT_SHEET.get( "spline" ):
+            set_list_index( scene, index )
+            open_selected_spline( context )
+            if splineItem.splineTree is None or sequence >= node_count( get_child_of_splinetree( splineItem.splineTree, "DOLLY" ) ):
+                break
+            select_spatial_nodes( context, dolly_spatial_nodes( splineItem, [ sequence ] ) )
+            return;
+    operator.report( {"ERROR"}, "The node of this thumbnail no longer exists" )
+
+# SPLINE EVALUATION -----------------------------------------------------------------------
+#cubic coefficients ( segments, 4, 3 ) of the Catmull-Rom segments first to last-1 through the points, or of
+#the segments listed in segments; a segment only depends on the two points around it and their neighbours
+def catmull_rom_coefficients( points, curveType=DEFAULT_CURVE_TYPE, tension=0.5, first=0, last=None, segments=None ):
+    segmentCount = len( points ) - 1
+    last = segmentCount if last is None else last
+    #open curves extrapolate a ghost point beyond each end
+    extended = np.concatenate( ( 2.0 * points[ :1 ] - points[ 1:2 ], points, 2.0 * points[ -1: ] - points[ -2:-1 ] ) )
+    if segments is None:
+        p0 = extended[ first:last ]
+        p1 = extended[ first + 1:last + 1 ]
+        p2 = extended[ first + 2:last + 2 ]
+        p3 = extended[ first + 3:last + 3 ]
+    else:
+        ( p0, p1, p2, p3 ) = ( extended[ segments + offset ] for offset in range( 4 ) )
+    if curveType == "catmullrom":
+        t1 = tension * ( p2 - p0 )
+        t2 = tension * ( p3 - p1 )
+    else:
+        power = 0.5 if curveType == "chordal" else 0.25
+        dt0 = np.sum( ( p1 - p0 ) ** 2, axis=1 ) ** power
+        dt1 = np.sum( ( p2 - p1 ) ** 2, axis=1 ) ** power
+        dt2 = np.sum( ( p3 - p2 ) ** 2, axis=1 ) ** power
+        #safety checks for repeated points
+        dt1 = np.where( dt1 < 1e-4, 1.0, dt1 )
+        dt0 = np.where( dt0 < 1e-4, dt1, dt0 )
+        dt2 = np.where( dt2 < 1e-4, dt1, dt2 )
+        ( dt0, dt1, dt2 ) = ( dt0[ :, None ], dt1[ :, None ], dt2[ :, None ] )
+        t1 = ( ( p1 - p0 ) / dt0 - ( p2 - p0 ) / ( dt0 + dt1 ) + ( p2 - p1 ) / dt1 ) * dt1
+        t2 = ( ( p2 - p1 ) / dt1 - ( p3 - p1 ) / ( dt1 + dt2 ) + ( p3 - p2 ) / dt2 ) * dt1
+    return np.stack( ( p1, t1, -3.0 * p1 + 3.0 * p2 - 2.0 * t1 - t2, 2.0 * p1 - 2.0 * p2 + t1 + t2 ), axis=1 )
+
+#samplesPerSegment evenly spaced points on each of the segments first to last-1, plus the end point of the
+#curve when last is the final segment; sample k of segment j lands at index j * samplesPerSegment + k
+def sample_segments( points, samplesPerSegment, curveType=DEFAULT_CURVE_TYPE, first=0, last=None ):
+    segmentCount = len( points ) - 1
+    last = segmentCount if last is None else last
+    coefficients = catmull_rom_coefficients( points, curveType, first=first, last=last )
+    weight = ( np.arange( samplesPerSegment, dtype=np.float64 ) / samplesPerSegment )[ None, :, None ]
+    c = coefficients[ :, None, :, : ]
+    samples = ( c[ :, :, 0 ] + weight * ( c[ :, :, 1 ] + weight * ( c[ :, :, 2 ] + weight * c[ :, :, 3 ] ) ) ).reshape( -1, 3 )
+    if last == segmentCount:
+        samples = np.concatenate( ( samples, points[ -1: ] ) )
+    return samples
+
+#open Catmull-Rom curve through a point sequence, evaluated the same way as three.js CatmullRomCurve3
+#which the Oncyber player is built on. Every segment's cubic coefficients are computed up front so any
+#number of parameter values is evaluated with a handful of array operations and no Python loop
+class CatmullRomCurve:
+    def __init__( self, points, curveType=DEFAULT_CURVE_TYPE, tension=0.5, arcLengthDivisions=None ):
+        points = np.asarray( points, dtype=np.float64 ).reshape( -1, 3 )
+        if len( points ) < 2:
+            raise ValueError( "A curve needs at least 2 points" )
+        self.points = points
+        self.segmentCount = len( points ) - 1
+        self.coefficients = catmull_rom_coefficients( points, curveType, tension )
+        
+        #arc length table: cumulative length at evenly spaced curve parameters
+        divisions = arcLengthDivisions or max( ARC_LENGTH_DIVISIONS, ARC_LENGTH_SAMPLES_PER_SEGMENT * self.segmentCount )
+        self.arcParameters = np.linspace( 0.0, 1.0, divisions + 1 )
+        steps = np.linalg.norm( np.diff( self.evaluate( self.arcParameters ), axis=0 ), axis=1 )
+        self.arcLengths = np.concatenate( ( [ 0.0 ], np.cumsum( steps ) ) )
+
+    @property
+    def length( self ):
+        return self.arcLengths[ -1 ]
+
+    #points at curve parameters t in [0, 1], t spreads evenly over the segments, not over the length
+    def evaluate( self, t ):
+        position = np.clip( np.asarray( t, dtype=np.float64 ), 0.0, 1.0 ) * self.segmentCount
+        segment  = np.minimum( position.astype( np.int64 ), self.segmentCount - 1 )
+        weight   = ( position - segment )[ ..., None ]
+        c = self.coefficients[ segment ]
+        return c[ ..., 0, : ] + weight * ( c[ ..., 1, : ] + weight * ( c[ ..., 2, : ] + weight * c[ ..., 3, : ] ) )
+
+    #curve parameters for fractions u in [0, 1] of the total length
+    def parameters_at( self, u ):
+        return np.interp( np.clip( np.asarray( u, dtype=np.float64 ), 0.0, 1.0 ) * self.length, self.arcLengths, self.arcParameters )
+
+    def evaluate_at( self, u ):
+        return self.evaluate( self.parameters_at( u ) )
+
+#the path of one spline: the camera flies along the DOLLY curve while looking at the matching point
+#of the LOOKAT curve, both curves are traversed at constant speed over the spline's duration
+class CinematicPath:
+    def __init__( self, positions, lookats, duration=10.0, curveType=DEFAULT_CURVE_TYPE ):
+        self.duration = float( duration )
+        self.positionCurve = CatmullRomCurve( positions, curveType )
+        self.lookatCurve   = CatmullRomCurve( lookats,   curveType )
+
+    @property
+    def length( self ):
+        return self.positionCurve.length
+
+    #by curve parameter
+    def evaluate( self, t ):
+        return ( self.positionCurve.evaluate( t ), self.lookatCurve.evaluate( t ) )
+
+    #by fraction of the path length
+    def evaluate_at( self, u ):
+        return ( self.positionCurve.evaluate_at( u ), self.lookatCurve.evaluate_at( u ) )
+
+    #by distance travelled along the DOLLY curve
+    def evaluate_at_distance( self, distance ):
+        return self.evaluate_at( np.asarray( distance, dtype=np.float64 ) / max( self.length, 1e-12 ) )
+
+    #by time in seconds since the start of the spline
+    def evaluate_at_time( self, seconds ):
+        return self.evaluate_at( np.asarray( seconds, dtype=np.float64 ) / max( self.duration, 1e-12 ) )
+
+    #count samples evenly spaced in distance, or in curve parameter when uniformDistance is False
+    def sample( self, count, uniformDistance=True ):
+        u = np.linspace( 0.0, 1.0, max( 2, int( count ) ) )
+        return self.evaluate_at( u ) if uniformDistance else self.evaluate( u )
+
+#errors, relative to the tolerances, of the dropped nodes when the path runs through the kept nodes only: the
+#distance of each DOLLY and LOOKAT node to the Catmull-Rom segment of its span, and the angle between its view
+#direction and the direction from the DOLLY to the LOOKAT segment where the camera passes the node. The point
+#on a segment starts at the node's share of the span's length and moves closer by a few Newton steps; it is a
+#point of the segment, so the distance never comes out below the true one
+def decimation_errors( positions, lookats, directions, lengths, keptIndices, nodes, distanceTolerance, angleTolerance, curveType ):
+    spans = np.minimum( np.searchsorted( keptIndices, nodes, side="right" ) - 1, len( keptIndices ) - 2 )
+    ( firsts, lasts ) = ( keptIndices[ spans ], keptIndices[ spans + 1 ] )
+    #nodes come in order, so do their spans
+    newSpan = np.concatenate( ( [ True ], spans[ 1: ] != spans[ :-1 ] ) )
+    ( usedSpans, spanOfNode ) = ( spans[ newSpan ], np.cumsum( newSpan ) - 1 )
+    errors = np.zeros( len( nodes ) )
+    segments = []
+    for ( points, pathLengths ) in zip( ( positions, lookats ), lengths ):
+        coefficients = catmull_rom_coefficients( points[ keptIndices ], curveType, segments=usedSpans )
+        ( c0, c1, c2, c3 ) = ( coefficients[ :, power ][ spanOfNode ] for power in range( 4 ) )
+        spanLengths = pathLengths[ lasts ] - pathLengths[ firsts ]
+        u = np.where( spanLengths > 1e-12, ( pathLengths[ nodes ] - pathLengths[ firsts ] ) / np.maximum( spanLengths, 1e-12 ), ( nodes - firsts ) / ( lasts - firsts ) )[ :, None ]
+        target = points[ nodes ]
+        for step in range( DECIMATION_NEWTON_STEPS ):
+            offsets = c0 + u * ( c1 + u * ( c2 + u * c3 ) ) - target
+            tangents = c1 + u * ( 2.0 * c2 + 3.0 * u * c3 )
+            gradient = np.einsum( "ij,ij->i", tangents, offsets )
+            curvature = np.einsum( "ij,ij->i", 2.0 * c2 + 6.0 * u * c3, offsets ) + np.einsum( "ij,ij->i", tangents, tangents )
+            u = np.clip( u - np.where( curvature > 1e-12, gradient / np.maximum( curvature, 1e-12 ), 0.0 )[ :, None ], 0.0, 1.0 )
+        errors = np.maximum( errors, np.linalg.norm( c0 + u * ( c1 + u * ( c2 + u * c3 ) ) - target, axis=1 ) / distanceTolerance )
+        segments.append( ( c0, c1, c2, c3 ) )
+        if points is positions:
+            fractions = u
+    ( cameraLocations, cameraLookats ) = ( c0 + fractions * ( c1 + fractions * ( c2 + fractions * c3 ) ) for ( c0, c1, c2, c3 ) in segments )
+    views = cameraLookats - cameraLocations
+    views /= np.maximum( np.linalg.norm( views, axis=1 ), 1e-12 )[ :, None ]
+    angles = np.arccos( np.clip( np.einsum( "ij,ij->i", directions[ nodes ], views ), -1.0, 1.0 ) )
+    return np.maximum( errors, angles / angleTolerance )
+
+#indices of the nodes kept when simplifying a spline within the tolerances; DOLLY and LOOKAT nodes are
+#kept or dropped together. Top down: each round measures the dropped nodes against the curve through the kept
+#ones and keeps the worst node of every span that is out of tolerance, all spans at once. Only nodes of spans
+#whose segment changed are measured again, a segment depends on the kept nodes either side of it
+def decimate_spline( positions, lookats, distanceTolerance, angleTolerance, minimumNodes=4, curveType=DEFAULT_CURVE_TYPE ):
+    count = len( positions )
+    if count <= 2:
+        return np.arange( count )
+    distanceTolerance = max( distanceTolerance, 1e-12 )
+    angleTolerance    = max( angleTolerance, 1e-12 )
+    directions = lookats - positions
+    directions /= np.maximum( np.linalg.norm( directions, axis=1 ), 1e-12 )[ :, np.newaxis ]
+    #length along the nodes up to each node, of the DOLLY and of the LOOKAT nodes
+    lengths = [ np.concatenate( ( [ 0.0 ], np.cumsum( np.linalg.norm( np.diff( points, axis=0 ), axis=1 ) ) ) ) for points in ( positions, lookats ) ]
+    
+    kept = np.zeros( count, dtype=bool )
+    kept[ [ 0, count - 1 ] ] = True
+    #nodes out of tolerance even when only every other node is dropped are kept from the start, noisy stretches
+    #would otherwise be halved round after round down to single nodes
+    for parity in ( 0, 1 ):
+        keptIndices = np.union1d( np.arange( parity, count, 2 ), [ 0, count - 1 ] )
+        nodes = np.setdiff1d( np.arange( count ), keptIndices )
+        if len( nodes ) > 0:
+            kept[ nodes ] |= decimation_errors( positions, lookats, directions, lengths, keptIndices, nodes, distanceTolerance, angleTolerance, curveType ) > 1.0
+    errors = np.zeros( count )
+    measure = np.ones( count, dtype=bool )
+    while True:
+        keptIndices = np.flatnonzero( kept )
+        spans = np.minimum( np.searchsorted( keptIndices, np.arange( count ), side="right" ) - 1, len( keptIndices ) - 2 )
+        nodes = np.flatnonzero( measure & ~kept )
+        if len( nodes ) > 0:
+            #long spans are probed at a few nodes first: one node out of tolerance splits the span, and all of its
+            #nodes are measured again in the next round anyway
+            errors[ nodes ] = 0.0
+            strides = np.maximum( np.diff( keptIndices )[ spans[ nodes ] ] // DECIMATION_PROBES, 1 )
+            probed = ( nodes - keptIndices[ spans[ nodes ] ] ) % strides == 0
+            probes = nodes[ probed ]
+            errors[ probes ] = decimation_errors( positions, lookats, directions, lengths, keptIndices, probes, distanceTolerance, angleTolerance, curveType )
+            failed = np.zeros( len( keptIndices ) - 1, dtype=bool )
+            failed[ spans[ probes[ errors[ probes ] > 1.0 ] ] ] = True
+            rest = nodes[ ~probed & ~failed[ spans[ nodes ] ] ]
+            if len( rest ) > 0:
+                errors[ rest ] = decimation_errors( positions, lookats, directions, lengths, keptIndices, rest, distanceTolerance, angleTolerance, curveType )
+        errors[ kept ] = -1.0
+        candidates = np.flatnonzero( errors > 1.0 )
+        if len( candidates ) > 0:
+            #the worst node of each span out of tolerance
+            candidates = candidates[ np.lexsort( ( -errors[ candidates ], spans[ candidates ] ) ) ]
+            splits = candidates[ np.concatenate( ( [ True ], spans[ candidates[ 1: ] ] != spans[ candidates[ :-1 ] ] ) ) ]
+        elif len( keptIndices ) < min( minimumNodes, count ):
+            worst = int( np.argmax( errors ) )
+            if errors[ worst ] <= 0.0:
+                #every dropped node is on the curve, halve the longest span
+                longest = int( np.argmax( np.diff( keptIndices ) ) )
+                worst = ( keptIndices[ longest ] + keptIndices[ longest + 1 ] ) // 2
+            splits = np.array( [ worst ] )
+        else:
+            return keptIndices
+        kept[ splits ] = True
+        splitSpans = spans[ splits ]
+        changes = np.zeros( count + 1, dtype=np.int64 )
+        np.add.at( changes, keptIndices[ np.maximum( splitSpans - 1, 0 ) ], 1 )
+        np.add.at( changes, keptIndices[ np.minimum( splitSpans + 2, len( keptIndices ) - 1 ) ] + 1, -1 )
+        measure = np.cumsum( changes[ :count ] ) > 0
+
+
+# CACHES ----------------------------------------------------------------------------------
+#parent and child names of every collection, built with a single pass over bpy.data.collections.
+#Names are stored instead of collections so undo can never leave dangling references behind; each
+#lookup is checked against the live data and a stale entry falls back to re-indexing
+class SplineTreeIndex:
+    def __init__( self ):
+        self.parents  = {}
+        self.children = {}
+        self.valid    = False
+        self.rebuilds = 0
+
+    def invalidate( self ):
+        self.valid = False
+
+    def rebuild( self ):
+        self.parents  = {}
+        self.children = {}
+        for collection in bpy.data.collections:
+            self.index_collection( collection )
+        self.valid = True
+        self.rebuilds += 1
+
+    #re-index the children of one collection, used for incremental updates
+    def index_collection( self, collection ):
+        PROFILER.count( "collections scanned" )
+        collectionName = collection.name
+        for childName in self.children.get( collectionName, () ):
+            if self.parents.get( childName ) == collectionName:
+                del self.parents[ childName ]
+        childNames = tuple( collection.children.keys() )
+        self.children[ collectionName ] = childNames
+        for childName in childNames:
+            self.parents[ childName ] = collectionName
+
+    def update_collection( self, collection ):
+        if self.valid:
+            self.index_collection( collection )
+
+    def lookup_parent( self, nodeCollection ):
+        parent = bpy.data.collections.get( self.parents.get( nodeCollection.name, "" ) )
+        if parent is not None and parent.children.get( nodeCollection.name ) is None:
+            return None
+        return parent
+
+    def get_parent( self, nodeCollection ):
+        if not self.valid:
+            self.rebuild()
+        parent = self.lookup_parent( nodeCollection )
+        if parent is None:
+            self.rebuild()
+            parent = self.lookup_parent( nodeCollection )
+        return parent
+
+    def lookup_child( self, splineTree, childType ):
+        for childName in self.children.get( splineTree.name, () ):
+            if childName.startswith( childType.lower() ):
+                return splineTree.children.get( childName )
+        return None
+
+    def get_child( self, splineTree, childType ):
+        if not self.valid:
+            self.rebuild()
+        child = self.lookup_child( splineTree, childType )
+        if child is None:
+            self.index_collection( splineTree )
+            child = self.lookup_child( splineTree, childType )
+        return child
+
+SPLINE_TREE_INDEX = SplineTreeIndex()
+
+#name -> path of child names from the root layer collection, one map per view layer, so finding a
+#LayerCollection only walks its own depth instead of searching the whole layer tree
+class LayerCollectionIndex:
+    def __init__( self ):
+        self.paths    = {}
+        self.rebuilds = 0
+
+    def invalidate( self ):
+        self.paths.clear()
+
+    def rebuild( self, viewLayer ):
+        paths = {}
+        searchQueue = deque( ( child, ( child.name, ) ) for child in viewLayer.layer_collection.children )
+        while searchQueue:
+            ( layerCollection, path ) = searchQueue.popleft()
+            paths.setdefault( layerCollection.name, path )
+            searchQueue.extend( ( child, path + ( child.name, ) ) for child in layerCollection.children )
+        self.paths[ ( viewLayer.id_data.name, viewLayer.name ) ] = ( len( bpy.data.collections ), paths )
+        PROFILER.count( "collections scanned", len( paths ) )
+        self.rebuilds += 1
+        return paths
+
+    def resolve( self, viewLayer, path ):
+        layerCollection = viewLayer.layer_collection
+        for name in path:
+            layerCollection = layerCollection.children.get( name )
+            if layerCollection is None:
+                return None
+        return layerCollection
+
+    def get( self, viewLayer, collectionName ):
+        ( collectionCount, paths ) = self.paths.get( ( viewLayer.id_data.name, viewLayer.name ), ( None, None ) )
+        if paths is None or collectionCount != len( bpy.data.collections ):
+            paths = self.rebuild( viewLayer )
+        path = paths.get( collectionName )
+        if path is None:
+            return None
+        layerCollection = self.resolve( viewLayer, path )
+        if layerCollection is None:
+            path = self.rebuild( viewLayer ).get( collectionName )
+            layerCollection = None if path is None else self.resolve( viewLayer, path )
+        return layerCollection
+
+LAYER_COLLECTION_INDEX = LayerCollectionIndex()
+
+#spline collection name -> ( export settings, serialized JSON ) of the last export; the depsgraph handler drops
+#the fragment of a spline when one of its nodes moves, is renamed or the membership of its collections changes.
+#every drop bumps a version, so a fragment built from an older snapshot by the export worker is not stored
+class ExportFragmentCache:
+    def __init__( self ):
+        self.fragments = {}
+        self.versions = {}
+        self.clearCount = 0
+        self.rebuilt = 0
+        self.reused = 0
+
+    def invalidate( self, splineName=None ):
+        if splineName is None:
+            self.fragments.clear()
+            self.clearCount += 1
+        else:
+            self.fragments.pop( splineName, None )
+            self.versions[ splineName ] = self.versions.get( splineName, 0 ) + 1
+
+    #a spline name of None is an update outside of any spline
+    def mark_dirty( self, splineName ):
+        if splineName is not None:
+            self.invalidate( splineName )
+
+    def reset_counts( self ):
+        self.rebuilt = 0
+        self.reused = 0
+
+    def version( self, splineName ):
+        return ( self.clearCount, self.versions.get( splineName, 0 ) )
+
+    def get( self, splineName, settings ):
+        entry = self.fragments.get( splineName )
+        if entry is None or entry[0] != settings:
+            return None
+        self.reused += 1
+        PROFILER.count( "fragments reused" )
+        return entry[1]
+
+    def put( self, splineName, settings, fragment, version=None ):
+        if version is None or version == self.version( splineName ):
+            self.fragments[ splineName ] = ( settings, fragment )
+        self.rebuilt += 1
+        PROFILER.count( "fragments rebuilt" )
+
+EXPORT_CACHE = ExportFragmentCache()
+
+#runs the export jobs of the Export to File button one after the other, so a superseded export never
+#replaces the file of the export after it
+EXPORT_WORKER = ThreadPoolExecutor( max_workers=1, thread_name_prefix="oncyber-export" )
+
+#spline cache name -> ( node count, kept node count ) of the last decimated export, shown in the Output panel
+DECIMATION_COUNTS = {}
+
+#spline collection name -> ( digest of the inputs, camera locations, camera rotations ) of the last bake
+BAKE_CACHE = {}
+
+#drawn DOLLY and LOOKAT paths of one spline: the node locations they were sampled from and the
+#sequence numbers of the nodes moved since, per curve
+class SplinePathState:
+    def __init__( self, pathObject, positions, lookats ):
+        self.pathObject = None if pathObject is None else pathObject.name
+        self.points = [ positions, lookats ]
+        self.moved  = [ set(), set() ]
+        self.rebuild = False
+
+#one curve object per spline with a DOLLY and a LOOKAT polyline sampled from the Catmull-Rom path.
+#Moving a node only re-samples the few segments that depend on it and rewrites just those points
+class PathDisplay:
+    def __init__( self ):
+        self.states = {}
+        self.fullRebuilds = 0
+        self.partialUpdates = 0
+
+    def invalidate( self ):
+        self.states.clear()
+
+    def create_path_object( self, splineItem ):
+        curveData = bpy.data.curves.new( "path." + splineItem.splineTree.name, "CURVE" )
+        curveData.dimensions = "3D"
+        pathObject = bpy.data.objects.new( curveData.name, curveData )
+        pathObject.hide_select = True
+        pathObject.hide_render = True
+        splineItem.splineTree.objects.link( pathObject )
+        splineItem.pathObject = pathObject
+        return pathObject
+
+    #sample and write both polylines of a spline from scratch
+    def rebuild( self, scene, splineItem ):
+        try:
+            ( positions, lookats ) = read_spline_points( splineItem, scene.export_world_space, minimumNodes=2 )
+        except ExportError:
+            #nothing to draw until its nodes change
+            self.remove( splineItem )
+            self.states[ splineItem.splineTree.name ] = SplinePathState( None, None, None )
+            return
+        pathObject = splineItem.pathObject
+        if pathObject is None:
+            pathObject = self.create_path_object( splineItem )
+        curveData = pathObject.data
+        curveData.splines.clear()
+        for points in ( positions, lookats ):
+            samples = sample_segments( points, PATH_SAMPLES_PER_SEGMENT, scene.curve_type )
+            coordinates = np.ones( ( len( samples ), 4 ), dtype=np.float32 )
+            coordinates[ :, :3 ] = samples
+            polyline = curveData.splines.new( "POLY" )
+            polyline.points.add( len( samples ) - 1 )
+            polyline.points.foreach_set( "co", coordinates.reshape( -1 ) )
+        self.states[ splineItem.splineTree.name ] = SplinePathState( pathObject, positions, lookats )
+        self.fullRebuilds += 1
+
+    def rebuild_all( self, scene ):
+        self.states.clear()
+        for splineItem in scene.splineList:
+            if splineItem.splineTree is not None:
+                self.rebuild( scene, splineItem )
+
+    def remove( self, splineItem ):
+        pathObject = splineItem.pathObject
+        if splineItem.splineTree is not None:
+            self.states.pop( splineItem.splineTree.name, None )
+        if pathObject is not None:
+            curveData = pathObject.data
+            bpy.data.objects.remove( pathObject )
+            if curveData is not None and curveData.users == 0:
+                bpy.data.curves.remove( curveData )
+
+    def remove_all( self, scene ):
+        for splineItem in scene.splineList:
+            self.remove( splineItem )
+        self.states.clear()
+
+    def node_moved( self, splineName, curveIndex, sequence ):
+        state = self.states.get( splineName )
+        if state is not None:
+            state.moved[ curveIndex ].add( sequence )
+
+    def node_set_changed( self, splineName ):
+        state = self.states.get( splineName )
+        if state is not None:
+            state.rebuild = True
+
+    #re-sample the segments around the moved nodes of each spline and write only the affected points
+    def flush( self, scene ):
+        for splineItem in scene.splineList:
+            if splineItem.splineTree is None:
+                continue
+            state = self.states.get( splineItem.splineTree.name )
+            if state is None or state.rebuild:
+                self.rebuild( scene, splineItem )
+                continue
+            if state.pathObject is None or not ( state.moved[0] or state.moved[1] ):
+                continue
+            pathObject = bpy.data.objects.get( state.pathObject )
+            if pathObject is None:
+                self.rebuild( scene, splineItem )
+                continue
+            for curveIndex in range( 0, 2, 1 ):
+                if state.moved[ curveIndex ]:
+                    self.update_curve( scene, splineItem, state, pathObject.data, curveIndex )
+            
+    def update_curve( self, scene, splineItem, state, curveData, curveIndex ):
+        nodeCollection = get_child_of_splinetree( splineItem.splineTree, "DOLLY" if curveIndex == 0 else "LOOKAT" )
+        points = state.points[ curveIndex ]
+        moved  = state.moved[ curveIndex ]
+        state.moved[ curveIndex ] = set()
+        if nodeCollection is None or len( nodeCollection.objects ) != len( points ):
+            self.rebuild( scene, splineItem )
+            return
+        
+        order = get_node_order( nodeCollection )
+        nodeObjects = nodeCollection.objects
+        for sequence in moved:
+            nodeObject = nodeObjects[ int( order[ sequence ] ) ]
+            points[ sequence ] = nodeObject.matrix_world.translation if scene.export_world_space else nodeObject.location
+        
+        #segment j depends on the nodes j-1 to j+2
+        segmentCount = len( points ) - 1
+        first = max( 0, min( moved ) - 2 )
+        last  = min( segmentCount, max( moved ) + 2 )
+        samples = sample_segments( points, PATH_SAMPLES_PER_SEGMENT, scene.curve_type, first, last )
+        polylinePoints = curveData.splines[ curveIndex ].points
+        start = first * PATH_SAMPLES_PER_SEGMENT
+        if len( samples ) * 4 > len( polylinePoints ):
+            coordinates = np.empty( len( polylinePoints ) * 4, dtype=np.float32 )
+            polylinePoints.foreach_get( "co", coordinates )
+            coordinates = coordinates.reshape( -1, 4 )
+            coordinates[ start:start + len( samples ), :3 ] = samples
+            polylinePoints.foreach_set( "co", coordinates.reshape( -1 ) )
+        else:
+            for ( offset, sample ) in enumerate( samples.tolist() ):
+                polylinePoints[ start + offset ].co = ( sample[0], sample[1], sample[2], 1.0 )
+        self.partialUpdates += 1
+
+PATH_DISPLAY = PathDisplay()
+
+#export order of one DOLLY or LOOKAT collection: order[ sequence ] is the index of the node in
+#collection.objects and sequences maps a node name to its sequence number
+class NodeOrder:
+    def __init__( self, nodeCollection ):
+        names = nodeCollection.objects.keys()
+        self.collectionNames = names
+        self.order = np.array( sorted( range( len( names ) ), key=lambda index: natural_sort_key( names[ index ] ) ), dtype=np.int64 )
+        self.names = [ names[ index ] for index in self.order ]
+        #kept here only, writing them onto the nodes would dirty the file and update the depsgraph again
+        self.sequences = { name: sequence for ( sequence, name ) in enumerate( self.names ) }
+
+    def __len__( self ):
+        return len( self.names )
+
+#node orders per collection name, rebuilt only after the depsgraph handler saw a membership change or rename
+class NodeOrderIndex:
+    def __init__( self ):
+        self.orders = {}
+        self.nodeCollections = {}
+        self.rebuilds = 0
+
+    def invalidate( self, collectionName=None ):
+        if collectionName is None:
+            self.orders.clear()
+            self.nodeCollections.clear()
+        else:
+            self.orders.pop( collectionName, None )
+
+    def rebuild( self, nodeCollection ):
+        with PROFILER.span( "sort nodes" ):
+            nodeOrder = NodeOrder( nodeCollection )
+        self.orders[ nodeCollection.name ] = nodeOrder
+        for name in nodeOrder.names:
+            self.nodeCollections[ name ] = nodeCollection.name
+        self.rebuilds += 1
+        return nodeOrder
+
+    #validate also compares all names, for callers that read every node anyway
+    def get( self, nodeCollection, validate=False ):
+        nodeOrder = self.orders.get( nodeCollection.name )
+        if nodeOrder is None or len( nodeOrder ) != len( nodeCollection.objects ):
+            nodeOrder = self.rebuild( nodeCollection )
+        elif validate and nodeOrder.collectionNames != nodeCollection.objects.keys():
+            nodeOrder = self.rebuild( nodeCollection )
+        return nodeOrder
+
+    #sequence number of a node within its collection, or None if it is not part of it
+    def get_sequence( self, nodeCollection, nodeObject ):
+        sequence = self.get( nodeCollection ).sequences.get( nodeObject.name )
+        if sequence is None:
+            sequence = self.rebuild( nodeCollection ).sequences.get( nodeObject.name )
+        return sequence
+
+    #an updated object whose name is unknown was renamed or newly linked, its collections need new orders
+    def update_object( self, nodeObject ):
+        if nodeObject.name not in self.nodeCollections:
+            for collection in nodeObject.users_collection:
+                self.invalidate( collection.name )
+
+NODE_ORDER_INDEX = NodeOrderIndex()
+
+#one node of the spatial index: vertex nodes of a point mesh share the mesh's object name
+class SpatialNode:
+    __slots__ = ( "splineName", "curveIndex", "sequence", "objectName", "isPoint" )
+
+    def __init__( self, splineName, curveIndex, sequence, objectName, isPoint ):
+        self.splineName = splineName
+        self.curveIndex = curveIndex
+        self.sequence = sequence
+        self.objectName = objectName
+        self.isPoint = isPoint
+
+#k-d tree over the world space locations of the nodes of every listed spline, each tagged with its spline, curve
+#and sequence number. A balanced tree cannot be changed, so nodes moved since it was built are kept in an overlay
+#that every query checks as well; the tree is only rebuilt once the overlay outgrows SPATIAL_OVERLAY_LIMIT, the
+#nodes of a spline change or the spline list does
+class NodeSpatialIndex:
+    def __init__( self ):
+        self.tree = None
+        self.nodes = []
+        self.indices = {}
+        self.moved = {}
+        self.signature = None
+        self.valid = False
+        self.rebuilds = 0
+
+    def invalidate( self ):
+        self.valid = False
+
+    def spline_signature( self, scene ):
+        return ( scene.name, tuple( splineItem.splineTree.name for splineItem in scene.splineList if splineItem.splineTree is not None ) )
+
+    def rebuild( self, scene ):
+        self.nodes = []
+        self.indices = {}
+        self.moved = {}
+        locationBlocks = []
+        for splineItem in scene.splineList:
+            if splineItem.splineTree is not None:
+                splineName = splineItem.splineTree.name
+                for ( curveIndex, childType ) in enumerate( ( "DOLLY", "LOOKAT" ) ):
+                    nodeCollection = get_child_of_splinetree( splineItem.splineTree, childType )
+                    pointMesh = None if nodeCollection is None else get_point_mesh( nodeCollection )
+                    if pointMesh is not None:
+                        locationBlocks.append( read_point_mesh_locations( pointMesh, True ) )
+                        self.nodes.extend( SpatialNode( splineName, curveIndex, sequence, pointMesh.name, True ) for sequence in range( len( locationBlocks[ -1 ] ) ) )
+                    elif nodeCollection is not None and len( nodeCollection.objects ) > 0:
+                        nodeOrder = NODE_ORDER_INDEX.get( nodeCollection, True )
+                        locationBlocks.append( read_node_locations( nodeCollection, nodeOrder.order, True ) )
+                        for ( sequence, name ) in enumerate( nodeOrder.names ):
+                            self.indices[ name ] = len( self.nodes )
+                            self.nodes.append( SpatialNode( splineName, curveIndex, sequence, name, False ) )
+        with PROFILER.span( "build k-d tree" ):
+            self.tree = KDTree( len( self.nodes ) )
+            for ( index, location ) in enumerate( np.concatenate( locationBlocks ).tolist() if locationBlocks else () ):
+                self.tree.insert( location, index )
+            self.tree.balance()
+        self.signature = self.spline_signature( scene )
+        self.valid = True
+        self.rebuilds += 1
+
+    def ensure( self, scene ):
+        if not self.valid or self.signature != self.spline_signature( scene ):
+            self.rebuild( scene )
+
+    #a moved node object is looked up at its new location through the overlay until the next rebuild
+    def node_moved( self, nodeObject ):
+        index = self.indices.get( nodeObject.name )
+        if self.valid and index is not None:
+            if len( self.moved ) >= SPATIAL_OVERLAY_LIMIT and index not in self.moved:
+                self.valid = False
+            else:
+                self.moved[ index ] = nodeObject.matrix_world.translation.copy()
+
+    #( location, index, distance ) of the nodes within radius, or of the nearest node when radius is None
+    def query( self, location, radius ):
+        location = Vector( location )
+        if radius is None:
+            #every moved node may be a stale tree entry, so enough are requested to leave one current entry
+            found = self.tree.find_n( location, len( self.moved ) + 1 )
+        else:
+            found = self.tree.find_range( location, radius )
+        found = [ entry for entry in found if entry[1] not in self.moved ]
+        for ( index, movedLocation ) in self.moved.items():
+            distance = ( movedLocation - location ).length
+            if radius is None or distance <= radius:
+                found.append( ( movedLocation, index, distance ) )
+        if radius is None:
+            return [ min( found, key=lambda entry: entry[2] ) ] if found else []
+        return found
+
+    #query the current nodes; a node deleted or renamed since the last rebuild forces one
+    def find( self, scene, location, radius=None ):
+        self.ensure( scene )
+        found = self.query( location, radius )
+        if any( bpy.data.objects.get( self.nodes[ entry[1] ].objectName ) is None for entry in found ):
+            self.rebuild( scene )
+            found = self.query( location, radius )
+        return found
+
+NODE_SPATIAL_INDEX = NodeSpatialIndex()
+
+#BVH tree over the world space triangles of the venue meshes, reused until the depsgraph handler sees a mesh
+#outside of the splines change or move, or the set of venue objects changes
+class OcclusionTreeCache:
+    def __init__( self ):
+        self.tree = None
+        self.objectNames = None
+        self.triangleCount = 0
+        self.valid = False
+        self.rebuilds = 0
+
+    def invalidate( self ):
+        self.valid = False
+
+    def rebuild( self, depsgraph, venueObjects ):
+        vertexBlocks = []
+        triangleBlocks = []
+        vertexCount = 0
+        with PROFILER.span( "build BVH" ):
+            for venueObject in venueObjects:
+                evaluatedObject = venueObject.evaluated_get( depsgraph )
+                mesh = evaluatedObject.to_mesh()
+                try:
+                    mesh.calc_loop_triangles()
+                    coordinates = np.empty( len( mesh.vertices ) * 3, dtype=np.float32 )
+                    mesh.vertices.foreach_get( "co", coordinates )
+                    triangles = np.empty( len( mesh.loop_triangles ) * 3, dtype=np.int32 )
+                    mesh.loop_triangles.foreach_get( "vertices", triangles )
+                finally:
+                    evaluatedObject.to_mesh_clear()
+                matrix = np.array( evaluatedObject.matrix_world, dtype=np.float64 )
+                vertexBlocks.append( coordinates.reshape( -1, 3 ).astype( np.float64 ) @ matrix[ :3, :3 ].T + matrix[ :3, 3 ] )
+                triangleBlocks.append( triangles.reshape( -1, 3 ) + vertexCount )
+                vertexCount += len( vertexBlocks[ -1 ] )
+            vertices  = np.concatenate( vertexBlocks ) if vertexBlocks else np.empty( ( 0, 3 ) )
+            triangles = np.concatenate( triangleBlocks ) if triangleBlocks else np.empty( ( 0, 3 ), dtype=np.int32 )
+            self.tree = BVHTree.FromPolygons( vertices.tolist(), triangles.tolist(), all_triangles=True )
+        self.triangleCount = len( triangles )
+        self.objectNames = tuple( venueObject.name for venueObject in venueObjects )
+        self.valid = True
+        self.rebuilds += 1
+
+    def get( self, depsgraph, venueObjects ):
+        if not self.valid or self.objectNames != tuple( venueObject.name for venueObject in venueObjects ):
+            self.rebuild( depsgraph, venueObjects )
+        return self.tree
+
+OCCLUSION_TREE = OcclusionTreeCache()
+
+#spline collection or packed name -> ( blocked segments, nodes with a blocked sightline, blocked sightline samples,
+#blocked path steps, segment count ) of the last occlusion check, shown in the Viewer panel
+OCCLUSION_RESULTS = {}
+
+#venue key of the thumbnail cache, dropped by the depsgraph handler on edits of the venue, its lights, materials
+#and world and computed again on the next contact sheet. Kept out of the file so it never edits the scene
+VENUE_STATE = { "key": None }
+
+#thumbnails shown in the Contact Sheet panel, keyed by their cache keys; created by register()
+CONTACT_SHEET_PREVIEWS = None
+
+#spline, label and per node cache keys of the contact sheet shown
+CONTACT_SHEET = {}
+
+#runs contact sheet jobs, which in turn wait for their background Blender processes
+CONTACT_SHEET_WORKER = ThreadPoolExecutor( max_workers=1, thread_name_prefix="oncyber-contact-sheet" )
+
+#keep the caches in step with edits: collection updates re-index just that collection
+@persistent
+def on_depsgraph_update_post( scene, depsgraph ):
+    if depsgraph.id_type_updated( "COLLECTION" ):
+        LAYER_COLLECTION_INDEX.invalidate()
+    showPaths = scene.show_paths
+    worldSpace = scene.export_world_space
+    venueChanged = any( depsgraph.id_type_updated( idType ) for idType in ( "MATERIAL", "WORLD", "LIGHT", "COLLECTION" ) )
+    splineNames = None
+    for update in depsgraph.updates:
+        if isinstance( update.id, bpy.types.Collection ):
+            collection = update.id.original
+            SPLINE_TREE_INDEX.update_collection( collection )
+            NODE_ORDER_INDEX.invalidate( collection.name )
+            NODE_SPATIAL_INDEX.invalidate()
+            EXPORT_CACHE.mark_dirty( collection.name )
+            EXPORT_CACHE.mark_dirty( SPLINE_TREE_INDEX.parents.get( collection.name ) )
+            if showPaths:
+                PATH_DISPLAY.node_set_changed( SPLINE_TREE_INDEX.parents.get( collection.name ) )
+        elif isinstance( update.id, bpy.types.Object ):
+            nodeObject = update.id.original
+            if nodeObject.get( POINTS_PROPERTY ):
+                #any update of a point mesh may have moved its vertices
+                for collection in nodeObject.users_collection:
+                    splineName = SPLINE_TREE_INDEX.parents.get( collection.name )
+                    EXPORT_CACHE.mark_dirty( splineName )
+                    if showPaths:
+                        PATH_DISPLAY.node_set_changed( splineName )
+                NODE_SPATIAL_INDEX.invalidate()
+            collectionName = NODE_ORDER_INDEX.nodeCollections.get( nodeObject.name )
+            if collectionName is None:
+                #renamed or newly linked, every spline it is a node of is dirty
+                for collection in nodeObject.users_collection:
+                    splineName = SPLINE_TREE_INDEX.parents.get( collection.name )
+                    EXPORT_CACHE.mark_dirty( splineName )
+                    if splineName is not None and collection.name.startswith( ( "dolly", "lookat" ) ):
+                        NODE_SPATIAL_INDEX.invalidate()
+            elif update.is_updated_transform:
+                EXPORT_CACHE.mark_dirty( SPLINE_TREE_INDEX.parents.get( collectionName ) )
+                NODE_SPATIAL_INDEX.node_moved( nodeObject )
+            if worldSpace and update.is_updated_transform and collectionName is None:
+                #a moved parent or constraint target can move the world position of any node
+                EXPORT_CACHE.invalidate()
+            NODE_ORDER_INDEX.update_object( nodeObject )
+            #nodes missing from the order index after a load, undo, insert or rename are still not venue geometry
+            if nodeObject.type == "MESH" and collectionName is None and ( update.is_updated_geometry or update.is_updated_transform ):
+                if splineNames is None:
+                    splineNames = listed_spline_names( scene )
+                if not is_spline_object( scene, nodeObject, splineNames ):
+                    OCCLUSION_TREE.invalidate()
+            if nodeObject.type in ( "MESH", "LIGHT" ) and collectionName is None and not venueChanged and ( update.is_updated_geometry or update.is_updated_transform ):
+                if splineNames is None:
+                    splineNames = listed_spline_names( scene )
+                venueChanged = not is_spline_object( scene, nodeObject, splineNames )
+            if showPaths and update.is_updated_transform:
+                #only nodes of already ordered collections can have a drawn path
+                nodeOrder = NODE_ORDER_INDEX.orders.get( collectionName )
+                if nodeOrder is not None and nodeObject.name in nodeOrder.sequences:
+                    PATH_DISPLAY.node_moved( SPLINE_TREE_INDEX.parents.get( collectionName ), 0 if collectionName.startswith( "dolly" ) else 1, nodeOrder.sequences[ nodeObject.name ] )
+    if showPaths:
+        PATH_DISPLAY.flush( scene )
+    if venueChanged:
+        VENUE_STATE[ "key" ] = None
+
+#undo, redo and file loads replace the data wholesale, drop everything
+@persistent
+def on_data_replaced( *args ):
+    SPLINE_TREE_INDEX.invalidate()
+    LAYER_COLLECTION_INDEX.invalidate()
+    NODE_ORDER_INDEX.invalidate()
+    NODE_SPATIAL_INDEX.invalidate()
+    OCCLUSION_TREE.invalidate()
+    PATH_DISPLAY.invalidate()
+    EXPORT_CACHE.invalidate()
+    #the venue may be back to an earlier state or another file's
+    VENUE_STATE[ "key" ] = None
+
+#path, modification time and size the file watcher saw last, and whether a change waits to settle
+SYNC_WATCH = { "path": None, "stamp": None, "pending": False }
+
+#timer polling the source file while Watch is on; a change is synced once the file stopped changing for
+#one interval, so a file still being written is not read half way. Returns None to stop when Watch is off
+def watch_source_file():
+    context = bpy.context
+    scene = context.scene
+    if scene is None or not scene.sync_watch:
+        SYNC_WATCH.update( path=None, stamp=None, pending=False )
+        return None
+    path = bpy.path.abspath( scene.source_file )
+    try:
+        fileStat = os.stat( path )
+        stamp = ( fileStat.st_mtime_ns, fileStat.st_size )
+    except OSError:
+        stamp = None
+    if SYNC_WATCH[ "path" ] != path:
+        SYNC_WATCH.update( path=path, stamp=stamp, pending=False )
+    elif SYNC_WATCH[ "stamp" ] != stamp:
+        SYNC_WATCH.update( stamp=stamp, pending=stamp is not None )
+    elif SYNC_WATCH[ "pending" ] and context.mode == "OBJECT" and GenerateOperator.job is None:
+        SYNC_WATCH[ "pending" ] = False
+        collector = ReportCollector()
+        sync_from_file( context, collector, ( path ) )
+        if collector.errors:
+            setattr( bpy.types.Scene, "status_message", "Sync failed: " + collector.errors[0] )
+        tag_view3d_redraw( context )
+    return SYNC_WATCH_INTERVAL
+
+def start_sync_watch():
+    if not bpy.app.timers.is_registered( watch_source_file ):
+        bpy.app.timers.register( watch_source_file, first_interval=SYNC_WATCH_INTERVAL, persistent=True )
+
+#a file saved with Watch on goes on watching its source file
+@persistent
+def resume_sync_watch( *args ):
+    if bpy.context.scene is not None and bpy.context.scene.sync_watch:
+        start_sync_watch()
+
+HANDLERS = [
+    ( bpy.app.handlers.depsgraph_update_post, on_depsgraph_update_post ),
+    ( bpy.app.handlers.undo_post,             on_data_replaced ),
+    ( bpy.app.handlers.redo_post,             on_data_replaced ),
+    ( bpy.app.handlers.load_post,             on_data_replaced ),
+    ( bpy.app.handlers.load_post,             resume_sync_watch )
+]
+
+# PROFILING -------------------------------------------------------------------------------
+#timing spans and counters of one operator run
+class ProfileRun:
+    def __init__( self, name ):
+        self.name = name
+        self.startedAt = datetime.now()
+        self.seconds = 0.0
+        self.spans = {}
+        self.counters = {}
+        self.profileFile = None
+        #open while the operator runs: its cProfile session, those of worker threads, and where to write them
+        self.profile = None
+        self.threadProfiles = []
+        self.startTime = time.perf_counter()
+        self.closed = False
+
+class ProfileSpan:
+    __slots__ = ( "spans", "name", "startTime" )
+
+    def __init__( self, spans, name ):
+        self.spans = spans
+        self.name = name
+
+    def __enter__( self ):
+        self.startTime = time.perf_counter()
+
+    def __exit__( self, *args ):
+        self.spans[ self.name ] = self.spans.get( self.name, 0.0 ) + time.perf_counter() - self.startTime
+        return False
+
+#records the last runs of the operators while profiling is enabled in the sidebar; span() and count()
+#return immediately when no run is recorded, so instrumented code costs nothing with profiling off.
+#a run stays open across the modal ticks of its operator; the current run is per thread, code on a
+#worker thread records into an open run by resuming it
+class Profiler:
+    def __init__( self ):
+        self.runs = deque( maxlen=PROFILE_HISTORY )
+        self.local = threading.local()
+
+    @property
+    def current( self ):
+        return getattr( self.local, "current", None )
+
+    @current.setter
+    def current( self, run ):
+        self.local.current = run
+
+    def span( self, name ):
+        if self.current is None:
+            return NULL_SPAN
+        return ProfileSpan( self.current.spans, name )
+
+    def count( self, name, amount=1 ):
+        current = self.current
+        if current is not None:
+            current.counters[ name ] = current.counters.get( name, 0 ) + amount
+
+    #a new open run, None when profiling is off or another run is current: operators started by
+    #another operator are part of its run
+    def start( self, name, context ):
+        scene = context.scene
+        if self.current is not None or not ( scene.profile_enabled or scene.profile_capture ):
+            return None
+        run = ProfileRun( name )
+        if scene.profile_capture:
+            run.profile = cProfile.Profile()
+            run.profileFile = profile_file_name( scene, name, run.startedAt )
+        return run
 
-        if lookatObject is not None:
-            cinematicCamera.constraints.new( "TRACK_TO" )
-            cinematicCamera.constraints[ "Track To" ].target = lookatObject
-            cinematicCamera.constraints[ "Track To" ].track_axis = "TRACK_NEGATIVE_Z"
+    #record into an open run; the main thread profiles into the run's cProfile session, every worker
+    #thread into a session of its own which is merged when the run is stopped
+    @contextlib.contextmanager
+    def resume( self, run ):
+        if run is None or run.closed or self.current is not None:
+            yield
+            return
+        profile = run.profile
+        if profile is not None and threading.current_thread() is not threading.main_thread():
+            profile = cProfile.Profile()
+            run.threadProfiles.append( profile )
+        self.current = run
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            self.current = None
 
-        context.region_data.view_perspective = "CAMERA"
-        
-        show_hide_splines( context, True )
-        
-        operator.report( {"INFO"}, "Preview active" )
-    else:
-        operator.report( {"ERROR"}, "Please select a camera" )
+    def stop( self, run ):
+        if run is None or run.closed:
+            return
+        run.closed = True
+        run.seconds = time.perf_counter() - run.startTime
+        if run.profile is not None:
+            try:
+                stats = pstats.Stats( run.profile )
+                for threadProfile in run.threadProfiles:
+                    stats.add( threadProfile )
+                stats.dump_stats( run.profileFile )
+            except ( OSError, TypeError ):
+                run.profileFile = None
+            run.profile = None
+            run.threadProfiles = []
+        self.runs.appendleft( run )
 
-def show_hide_splines( context, hideInViewport ):
-    for index in range( 0, len( context.scene.splineList ), 1 ):
-        splineTree = context.scene.splineList[ index ].splineTree
-        if splineTree is not None:
-            splineTree.hide_viewport = hideInViewport
+    def clear( self ):
+        self.runs.clear()
 
-def cancel_preview( context, operator, params ):
-    context.region_data.view_perspective = "PERSP"
-    show_hide_splines( context, False )
-    cinematicCamera = get_camera()
-    if cinematicCamera is not None:
-        for cns in cinematicCamera.constraints:
-            cinematicCamera.constraints.remove( cns )
+PROFILER = Profiler()
+NULL_SPAN = contextlib.nullcontext()
+
+#cProfile stats are written next to the target file, or to the temporary directory without one
+def profile_file_name( scene, name, startedAt ):
+    targetFile = bpy.path.abspath( scene.target_file ) if scene.target_file else ""
+    directory = os.path.dirname( targetFile ) if targetFile else tempfile.gettempdir()
+    return os.path.join( directory, "oncyber." + name.split( "." )[ -1 ].replace( "object_", "" ) + "." + startedAt.strftime( "%Y%m%d-%H%M%S" ) + ".prof" )
+
+#wraps an operator's execute or invoke into a profiler run named after the operator; when invoke starts a
+#modal operator the run stays open on the operator until its modal or cancel, see profiled_modal, ends it
+def profiled( method ):
+    @functools.wraps( method )
+    def profiled_method( self, context, *args ):
+        run = PROFILER.start( self.bl_idname, context )
+        result = None
+        try:
+            with PROFILER.resume( run ):
+                result = method( self, context, *args )
+        finally:
+            if run is not None and result is not None and "RUNNING_MODAL" in result:
+                self.profileRun = run
+            else:
+                PROFILER.stop( run )
+        return result
+    return profiled_method
+
+#the modal ticks and cancel of an operator record into the run of its invoke, which ends with the operator
+def profiled_modal( method ):
+    @functools.wraps( method )
+    def profiled_method( self, context, *args ):
+        run = getattr( self, "profileRun", None )
+        result = None
+        try:
+            with PROFILER.resume( run ):
+                result = method( self, context, *args )
+        finally:
+            if run is not None and ( result is None or not ( "RUNNING_MODAL" in result or "PASS_THROUGH" in result ) ):
+                PROFILER.stop( run )
+                self.profileRun = None
+        return result
+    return profiled_method
 
 # OPERATORS -------------------------------------------------------------------------------
 class GenerateOperator( bpy.types.Operator ):
@@ -357,18 +3507,106 @@ class GenerateOperator( bpy.types.Operator ):
     bl_label = "Generate Output"
     bl_description = "Export to file"
     
+    #export job of the running modal export, a new export supersedes it
+    job = None
+    
+    #F3 and scripts export without the modal loop, but a pending modal export is superseded all the same. The
+    #files are written on the export worker too, which runs one export at a time, so this one only starts
+    #writing once the superseded one has stopped
+    @profiled
     def execute( self, context ):
+        sync_edit_mode( context )
+        params = (
+            context.scene.target_file
+        )
+        exportJob = start_export( context, self, params )
+        if exportJob is None:
+            return { "CANCELLED" }
+        cls = type( self )
+        if cls.job is not None:
+            cls.job.cancelEvent.set()
+            cls.job = None
+        complete_export( exportJob, self, EXPORT_WORKER.submit( exportJob.run ) )
+        return { "FINISHED" }
+    
+    #from the panel the splines are only read here, the files are written on the export worker
+    #while the modal loop reports the progress
+    @profiled
+    def invoke( self, context, event ):
+        sync_edit_mode( context )
         params = (
             context.scene.target_file
         )
-        generate_output( context, self, params )
+        self.exportJob = start_export( context, self, params )
+        if self.exportJob is None:
+            return { "CANCELLED" }
+        cls = type( self )
+        if cls.job is not None:
+            cls.job.cancelEvent.set()
+        cls.job = self.exportJob
+        self.future = EXPORT_WORKER.submit( self.exportJob.run )
+        self.timer = context.window_manager.event_timer_add( 0.1, window=context.window )
+        context.window_manager.modal_handler_add( self )
+        return { "RUNNING_MODAL" }
+    
+    @profiled_modal
+    def modal( self, context, event ):
+        if event.type == "TIMER":
+            if self.future.done():
+                return self.finish( context )
+            if type( self ).job is self.exportJob and not self.exportJob.cancelEvent.is_set():
+                setattr( bpy.types.Scene, "status_message", "Exporting... %.0f%%" % ( 100.0 * self.exportJob.progress() ) )
+                tag_view3d_redraw( context )
+        return { "PASS_THROUGH" }
+    
+    def finish( self, context ):
+        context.window_manager.event_timer_remove( self.timer )
+        cls = type( self )
+        #a superseded export leaves the status line to the export which replaced it
+        if cls.job is self.exportJob:
+            cls.job = None
+            complete_export( self.exportJob, self, self.future )
+            tag_view3d_redraw( context )
+        return { "FINISHED" }
+    
+    #called when Blender ends the operator itself, e.g. when a file is loaded
+    @profiled_modal
+    def cancel( self, context ):
+        context.window_manager.event_timer_remove( self.timer )
+        self.exportJob.cancelEvent.set()
+        if type( self ).job is self.exportJob:
+            type( self ).job = None
+
+class CancelExportOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_cancelexport"
+    bl_label = "Cancel Export"
+    bl_description = "Cancel the running export, the target file is left untouched"
+    
+    def execute( self, context ):
+        if GenerateOperator.job is not None:
+            GenerateOperator.job.cancelEvent.set()
+            setattr( bpy.types.Scene, "status_message", "Export cancelled" )
         return { "FINISHED" }
     
+class ConvertFileOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_convertfile"
+    bl_label = "Convert File"
+    bl_description = "Convert the source file between JSON and the binary format, written next to it"
+    
+    @profiled
+    def execute( self, context ):
+        params = (
+            context.scene.source_file
+        )
+        convert_cinematic_file( context, self, params )
+        return { "FINISHED" }
+
 class ImportOperator( bpy.types.Operator ):
     bl_idname = "opr.object_import"
     bl_label = "Import File"
-    bl_description = "Import the file"
+    bl_description = "Import the file, press Esc to cancel"
     
+    @profiled
     def execute( self, context ):
         params = (
             context.scene.source_file
@@ -377,11 +3615,91 @@ class ImportOperator( bpy.types.Operator ):
         #create_default_nodes()
         return { "FINISHED" }
     
+    #from the panel the nodes are built a batch per timer tick, with a batch size adjusted to the time it took
+    @profiled
+    def invoke( self, context, event ):
+        params = (
+            context.scene.source_file
+        )
+        self.job = start_import( context, self, params )
+        if self.job is None:
+            return { "CANCELLED" }
+        self.budget = IMPORT_FIRST_BUDGET
+        self.area = context.area
+        self.timer = context.window_manager.event_timer_add( 0.01, window=context.window )
+        context.window_manager.progress_begin( 0, 100 )
+        context.window_manager.modal_handler_add( self )
+        return { "RUNNING_MODAL" }
+    
+    @profiled_modal
+    def modal( self, context, event ):
+        if event.type == "ESC":
+            self.end( context )
+            self.job.rollback( context )
+            setattr( bpy.types.Scene, "status_message", "Import cancelled" )
+            tag_view3d_redraw( context )
+            self.report( {"INFO"}, "Import cancelled" )
+            return { "CANCELLED" }
+        elif event.type == "TIMER":
+            startTime = time.perf_counter()
+            try:
+                self.job.step( self.budget )
+            except ( ImportFileError, OSError ) as error:
+                report_import_error( self, self.job.inputFile, error )
+                return self.finish( context )
+            if self.job.done:
+                return self.finish( context )
+            #scale the budget towards the tick time, by at most a factor of two per tick
+            elapsed = time.perf_counter() - startTime
+            self.budget = max( 16, int( self.budget * min( 2.0, max( 0.5, IMPORT_TICK_SECONDS / max( elapsed, 0.000001 ) ) ) ) )
+            ( splineProgress, overallProgress ) = self.job.progress()
+            context.window_manager.progress_update( int( overallProgress * 100 ) )
+            progressMessage = "Importing spline " + str( len( self.job.built ) ) + ": %.0f%%, overall %.0f%%" % ( splineProgress * 100, overallProgress * 100 )
+            setattr( bpy.types.Scene, "status_message", progressMessage )
+            if self.area is not None:
+                self.area.header_text_set( progressMessage + " (Esc to cancel)" )
+            tag_view3d_redraw( context )
+            return { "RUNNING_MODAL" }
+        elif event.type in VIEW_NAVIGATION_EVENTS:
+            return { "PASS_THROUGH" }
+        return { "RUNNING_MODAL" }
+    
+    def end( self, context ):
+        context.window_manager.event_timer_remove( self.timer )
+        context.window_manager.progress_end()
+        if self.area is not None:
+            self.area.header_text_set( None )
+    
+    def finish( self, context ):
+        self.end( context )
+        complete_import( context, self, self.job )
+        tag_view3d_redraw( context )
+        return { "FINISHED" }
+    
+    #called when Blender ends the operator itself, e.g. when a file is loaded and the import's data is gone
+    @profiled_modal
+    def cancel( self, context ):
+        self.end( context )
+    
+class SyncFileOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_syncfile"
+    bl_label = "Sync from File"
+    bl_description = "Update the listed splines from the source file, moving existing nodes instead of importing again"
+    
+    @profiled
+    def execute( self, context ):
+        params = (
+            context.scene.source_file
+        )
+        sync_from_file( context, self, params )
+        return { "FINISHED" }
+    
 class AddSplineOperator( bpy.types.Operator ):
     bl_idname = "opr.object_addspline"
     bl_label = "Add New Spline"
     bl_description = "Create and add a new spline collection"    
     
+    @profiled
     def execute( self, context ):
         add_spline( context, self, addNodes=False )
         return { "FINISHED" }
@@ -391,6 +3709,7 @@ class AddSplineAndNodesOperator(bpy.types.Operator):
     bl_label = "Add New Spline and Nodes"
     bl_description = "Create and add a new spline collection with DOLLY and LOOKAT nodes"    
     
+    @profiled
     def execute( self, context ):
         add_spline( context, self, addNodes=True )
         return { "FINISHED" }
@@ -404,12 +3723,14 @@ class RemoveSplineOperator( bpy.types.Operator ):
     def poll( cls, context ):
         return context.scene.splineList
 
+    @profiled
     def execute( self, context ):
         splineList = context.scene.splineList
         index = context.scene.list_index
 
+        PATH_DISPLAY.remove( splineList[ index ] )
         splineList.remove( index )
-        context.scene.list_index = min( max(0, index - 1), len(splineList) - 1 )
+        set_list_index( context.scene, min( max(0, index - 1), len(splineList) - 1 ) )
 
         return{"FINISHED"}   
  
@@ -422,6 +3743,7 @@ class ClearListOperator( bpy.types.Operator ):
     def poll( cls, context ):
         return context.scene.splineList
 
+    @profiled
     def execute( self, context ):
         clear_spline_list(context)
         return{ "FINISHED" }   
@@ -434,6 +3756,7 @@ class HideSplineOperator( bpy.types.Operator ):
     
     index: bpy.props.IntProperty()
     
+    @profiled
     def execute( self, context ):
         splineList = context.scene.splineList
         splineIndex = self.index #context.scene.list_index
@@ -450,6 +3773,7 @@ class AddCameraOperator( bpy.types.Operator ):
     bl_label = "Add Camera"
     bl_description = "Add the default Cinematic camera to the scene"        
     
+    @profiled
     def execute( self, context ):
         params = (
         )
@@ -461,22 +3785,308 @@ class PreviewNodeOperator( bpy.types.Operator ):
     bl_label = "Preview Node"
     bl_description = "Enter Camera View using the chosen camera and the selected DOLLY object"        
     
+    @profiled
     def execute( self, context ):
+        sync_edit_mode( context )
         params = (
         )
         preview_node( context, self, params )
         return { "FINISHED" }
 
+class BakePreviewOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_bakepreview"
+    bl_label = "Bake Preview"
+    bl_description = "Key the camera along the splines so the fly-through can be played and scrubbed on the timeline"
+    
+    selectedOnly: bpy.props.BoolProperty( name="Selected Only", default=False )
+    
+    @profiled
+    def execute( self, context ):
+        sync_edit_mode( context )
+        params = (
+            self.selectedOnly
+        )
+        bake_preview( context, self, params )
+        return { "FINISHED" }
+
+class ClearBakePreviewOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_clearbakepreview"
+    bl_label = "Clear Baked Preview"
+    bl_description = "Remove the baked fly-through keys from the camera"
+    
+    @profiled
+    def execute( self, context ):
+        params = ()
+        clear_bake_preview( context, self, params )
+        return { "FINISHED" }
+
+class ConvertSplineOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_convertspline"
+    bl_label = "Convert Spline Nodes"
+    bl_description = "Switch the nodes of the selected spline (or all splines) between one object per node and a single point mesh"
+    
+    toPointMesh: bpy.props.BoolProperty( default=True )
+    allSplines: bpy.props.BoolProperty( default=False )
+    
+    @profiled
+    def execute( self, context ):
+        params = ( self.toPointMesh, self.allSplines )
+        convert_splines( context, self, params )
+        return { "FINISHED" }
+
+#samples the view on a timer into a preallocated ring buffer while the user flies through the scene,
+#the nodes are only created once recording stops; pressing the button again stops the recording
+class RecordFlythroughOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_recordflythrough"
+    bl_label = "Record Flythrough"
+    bl_description = "Record the viewport view as a new spline while flying through the scene, click again to stop"
+    
+    recording = False
+    stopRequested = False
+    
+    @profiled
+    def invoke( self, context, event ):
+        cls = type( self )
+        if cls.recording:
+            cls.stopRequested = True
+            return { "FINISHED" }
+        if context.area is None or context.area.type != "VIEW_3D" or context.space_data.region_3d is None:
+            self.report( {"ERROR"}, "Start the recording from a 3D Viewport" )
+            return { "CANCELLED" }
+        
+        self.area = context.area
+        self.region3d = context.space_data.region_3d
+        self.distance = context.scene.record_distance
+        self.samples = np.empty( ( context.scene.record_capacity, 2, 3 ), dtype=np.float64 )
+        self.current = np.empty( ( 2, 3 ), dtype=np.float64 )
+        self.sampleCount = 0
+        self.timer = context.window_manager.event_timer_add( context.scene.record_interval, window=context.window )
+        context.window_manager.modal_handler_add( self )
+        cls.recording = True
+        cls.stopRequested = False
+        return { "RUNNING_MODAL" }
+    
+    @profiled_modal
+    def modal( self, context, event ):
+        if type( self ).stopRequested:
+            return self.finish( context )
+        if event.type == "TIMER":
+            viewMatrix = self.region3d.view_matrix.inverted()
+            self.current[0] = viewMatrix.translation
+            self.current[1] = viewMatrix.translation - viewMatrix.col[2].xyz * self.distance
+            capacity = len( self.samples )
+            #a view that did not move adds no node
+            if self.sampleCount == 0 or not np.array_equal( self.current, self.samples[ ( self.sampleCount - 1 ) % capacity ] ):
+                self.samples[ self.sampleCount % capacity ] = self.current
+                self.sampleCount += 1
+                self.area.header_text_set( "Recording flythrough: " + str( min( self.sampleCount, capacity ) ) + " samples" )
+        return { "PASS_THROUGH" }
+    
+    def finish( self, context ):
+        context.window_manager.event_timer_remove( self.timer )
+        self.area.header_text_set( None )
+        type( self ).recording = False
+        #oldest sample first once the ring buffer has wrapped around
+        capacity = len( self.samples )
+        samples = np.roll( self.samples, -( self.sampleCount % capacity ), axis=0 ) if self.sampleCount > capacity else self.samples[ :self.sampleCount ]
+        if self.sampleCount > capacity:
+            self.report( {"WARNING"}, "Kept the last " + str( capacity ) + " of " + str( self.sampleCount ) + " samples" )
+        params = (
+            samples[ :, 0 ], samples[ :, 1 ]
+        )
+        add_recorded_spline( context, self, params )
+        return { "FINISHED" }
+    
+    #called when Blender ends the operator itself, e.g. when a file is loaded, the samples are dropped
+    @profiled_modal
+    def cancel( self, context ):
+        context.window_manager.event_timer_remove( self.timer )
+        type( self ).recording = False
+
+class CheckOcclusionOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_checkocclusion"
+    bl_label = "Check Occlusion"
+    bl_description = "Check the sightlines and camera paths of all splines against the venue meshes and select the DOLLY nodes of blocked segments"
+    
+    @profiled
+    def execute( self, context ):
+        params = (
+            context.scene.occlusion_samples
+        )
+        check_occlusion( context, self, params )
+        return { "FINISHED" }
+
+class ContactSheetOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_contactsheet"
+    bl_label = "Render Contact Sheet"
+    bl_description = "Render a thumbnail of the camera view at every node of the selected spline, only changed nodes are rendered again"
+    
+    #job of the running contact sheet, a new one cancels it
+    job = None
+    
+    @profiled
+    def execute( self, context ):
+        job = start_contact_sheet( context, self, () )
+        if job is not None:
+            #the job from the panel is superseded, the cache is pruned without its thumbnails
+            cls = type( self )
+            if cls.job is not None:
+                cls.job.cancelEvent.set()
+                cls.job = None
+            complete_contact_sheet( job, self )
+        return { "FINISHED" }
+    
+    #from the panel the background processes are waited for on a worker thread while the modal loop reports the progress
+    @profiled
+    def invoke( self, context, event ):
+        self.sheetJob = start_contact_sheet( context, self, () )
+        if self.sheetJob is None:
+            return { "CANCELLED" }
+        cls = type( self )
+        if cls.job is not None:
+            cls.job.cancelEvent.set()
+        cls.job = self.sheetJob
+        self.future = CONTACT_SHEET_WORKER.submit( self.sheetJob.run ) if len( self.sheetJob.tasks ) > 0 else None
+        self.timer = context.window_manager.event_timer_add( 0.25, window=context.window )
+        context.window_manager.modal_handler_add( self )
+        return { "RUNNING_MODAL" }
+    
+    @profiled_modal
+    def modal( self, context, event ):
+        if event.type == "TIMER":
+            if self.future is None or self.future.done():
+                return self.finish( context )
+            if type( self ).job is self.sheetJob and not self.sheetJob.cancelEvent.is_set():
+                setattr( bpy.types.Scene, "status_message", "Rendering contact sheet... %.0f%%" % ( 100.0 * self.sheetJob.progress() ) )
+                tag_view3d_redraw( context )
+        return { "PASS_THROUGH" }
+    
+    def finish( self, context ):
+        context.window_manager.event_timer_remove( self.timer )
+        cls = type( self )
+        if cls.job is self.sheetJob:
+            cls.job = None
+            complete_contact_sheet( self.sheetJob, self, self.future )
+            tag_view3d_redraw( context )
+        return { "FINISHED" }
+    
+    @profiled_modal
+    def cancel( self, context ):
+        context.window_manager.event_timer_remove( self.timer )
+        self.sheetJob.cancelEvent.set()
+        if type( self ).job is self.sheetJob:
+            type( self ).job = None
+
+class CancelContactSheetOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_cancelcontactsheet"
+    bl_label = "Cancel Contact Sheet"
+    bl_description = "Stop the background renders, thumbnails already rendered stay cached"
+    
+    def execute( self, context ):
+        if ContactSheetOperator.job is not None:
+            ContactSheetOperator.job.cancelEvent.set()
+            setattr( bpy.types.Scene, "status_message", "Contact sheet cancelled" )
+        return { "FINISHED" }
+
+class ContactNodeOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_contactnode"
+    bl_label = "Select Node"
+    bl_description = "Select the DOLLY node of this thumbnail"
+    
+    sequence: bpy.props.IntProperty( min=0 )
+    
+    @profiled
+    def execute( self, context ):
+        params = (
+            self.sequence
+        )
+        select_contact_node( context, self, params )
+        return { "FINISHED" }
+
+class NearestNodeOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_nearestnode"
+    bl_label = "Nearest Node"
+    bl_description = "Select the spline node nearest to the 3D cursor and center the view on it"
+    
+    @profiled
+    def execute( self, context ):
+        params = (
+            context.scene.cursor.location
+        )
+        select_nearest_node( context, self, params )
+        return { "FINISHED" }
+
+class InsertNodeOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_insertnode"
+    bl_label = "Insert at Cursor"
+    bl_description = "Insert a DOLLY and LOOKAT node pair at the 3D cursor, between the nearest node and its closer neighbour"
+    
+    @profiled
+    def execute( self, context ):
+        params = (
+            context.scene.cursor.location
+        )
+        insert_node_at_cursor( context, self, params )
+        return { "FINISHED" }
+
+class SelectRadiusOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_selectradius"
+    bl_label = "Select in Radius"
+    bl_description = "Select all spline nodes within the radius around the 3D cursor"
+    
+    @profiled
+    def execute( self, context ):
+        params = (
+            context.scene.cursor.location, context.scene.node_radius
+        )
+        select_nodes_in_radius( context, self, params )
+        return { "FINISHED" }
+
+class PackSplineOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_packspline"
+    bl_label = "Pack Spline"
+    bl_description = "Store the nodes of the selected spline (or all splines) on the spline list and delete their objects"
+    
+    allSplines: bpy.props.BoolProperty( default=False )
+    
+    @profiled
+    def execute( self, context ):
+        params = ( self.allSplines )
+        pack_splines( context, self, params )
+        return { "FINISHED" }
+
+class UnpackSplineOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_unpackspline"
+    bl_label = "Unpack Spline"
+    bl_description = "Create the nodes of the selected packed spline for editing"
+    
+    @profiled
+    def execute( self, context ):
+        splineList = context.scene.splineList
+        if len( splineList ) > 0 and splineList[ context.scene.list_index ].packed:
+            unpack_spline( context, splineList[ context.scene.list_index ] )
+        return { "FINISHED" }
+
 class CancelPreviewOperator( bpy.types.Operator ):
     bl_idname = "opr.object_cancelpreview"
     bl_label = "Cancel Preview"
     bl_description = "Cancel preview"
     
+    @profiled
     def execute( self, context ):
         params = ()
         cancel_preview( context, self, params )
         return { "FINISHED" }
 
+class ClearProfileOperator( bpy.types.Operator ):
+    bl_idname = "opr.object_clearprofile"
+    bl_label = "Clear Profile"
+    bl_description = "Forget the recorded profiling runs"
+
+    def execute( self, context ):
+        PROFILER.clear()
+        return { "FINISHED" }
+
 class MoveListItemOperator( bpy.types.Operator ):
     bl_idname = "opr.object_moveitem"
     bl_label = "Move an item in the list"
@@ -493,8 +4103,9 @@ class MoveListItemOperator( bpy.types.Operator ):
         list_length = len( bpy.context.scene.splineList ) - 1 
         new_index = index + (-1 if self.direction == "UP" else 1)
 
-        bpy.context.scene.list_index = max( 0, min(new_index, list_length) )
+        set_list_index( bpy.context.scene, max( 0, min(new_index, list_length) ) )
 
+    @profiled
     def execute(self, context):
         splineList = context.scene.splineList
         index = context.scene.list_index
@@ -529,6 +4140,9 @@ class SPLINE_UL_List( UIList ):
                     else: iconName = "HIDE_ON"
                 hideBtnOp = layout.operator( "opr.object_hidespline", text="", icon=iconName )
                 hideBtnOp.index = index
+            elif item.packed:
+                layout.label( text="( packed )" )
+                layout.label( text="", icon="PACKAGE" )
             else:
                 layout.label( text="" )
                 
@@ -566,6 +4180,35 @@ class SplineListItem( PropertyGroup ):
         name="Target spline collection",
         description="Target spline collection containing DOLLY and LOOKAT nodes"
     )
+
+    pathObject: bpy.props.PointerProperty(
+        type=bpy.types.Object,
+        name="Path",
+        description="Generated curve object drawing this spline's DOLLY and LOOKAT paths"
+    )
+
+    duration: bpy.props.FloatProperty(
+        name="Duration",
+        description="Time in seconds the camera takes to travel this spline",
+        default=10.0,
+        min=0.1
+    )
+
+    packed: bpy.props.BoolProperty(
+        name="Packed",
+        description="The nodes of this spline are stored on the list item instead of as objects",
+        default=False
+    )
+
+    packedPositions: StringProperty(
+        name="Packed DOLLY locations",
+        description="Base64 encoded float64 DOLLY locations of a packed spline"
+    )
+
+    packedLookats: StringProperty(
+        name="Packed LOOKAT locations",
+        description="Base64 encoded float64 LOOKAT locations of a packed spline"
+    )
     
 # PANELS ----------------------------------------------------------------------------------
 class CinematicMainPanel( bpy.types.Panel ):
@@ -592,8 +4235,16 @@ class ImportPanel( bpy.types.Panel ):
         scene = context.scene
         row = layout.row()
         row.prop( context.scene, "source_file" )
+        row = layout.row()
+        row.prop( context.scene, "import_bulk" )
+        row.prop( context.scene, "import_packed" )
+        row.prop( context.scene, "import_point_mesh" )
         row = layout.row()    
         row.operator( "opr.object_import", text="Import File", icon="IMPORT" )
+        row.operator( "opr.object_convertfile", text="Convert", icon="FILE_REFRESH" )
+        row = layout.row()
+        row.operator( "opr.object_syncfile", text="Sync from File", icon="FILE_REFRESH" )
+        row.prop( context.scene, "sync_watch" )
 
 class SplinesPanel( bpy.types.Panel ):
     bl_idname = "VIEW3D_PT_object_splinespanel"
@@ -625,6 +4276,10 @@ class SplinesPanel( bpy.types.Panel ):
         col.separator()
         col.operator( "opr.object_clearlist", icon="X", text="" )
 
+        row = layout.row()
+        row.alignment = "RIGHT"
+        row.label( text="Layer map rebuilds: " + str( LAYER_COLLECTION_INDEX.rebuilds ) )
+
         index = bpy.context.scene.list_index
         splineList = bpy.context.scene.splineList
         if splineList is not None and len( splineList ) > 0 and bpy.context.scene.splineList[ index ] is not None:
@@ -632,8 +4287,27 @@ class SplinesPanel( bpy.types.Panel ):
             col = flow.column( align=True )
             col.alignment = "RIGHT"
             col.prop( splineList[ index ], "name", text="Name" )
-            col.prop( splineList[ index ], "splineTree", text="Target" )
+            if splineList[ index ].packed:
+                col.operator( "opr.object_unpackspline", text="Unpack for Editing", icon="UGLYPACKAGE" )
+            else:
+                col.prop( splineList[ index ], "splineTree", text="Target" )
+            col.prop( splineList[ index ], "duration", text="Duration" )
+            row = col.row( align=True )
+            row.operator( "opr.object_packspline", text="Pack", icon="PACKAGE" ).allSplines = False
+            row.operator( "opr.object_packspline", text="Pack All" ).allSplines = True
+            row = col.row( align=True )
+            convertOp = row.operator( "opr.object_convertspline", text="To Point Mesh", icon="VERTEXSEL" )
+            convertOp.toPointMesh = True
+            convertOp = row.operator( "opr.object_convertspline", text="To Objects", icon="OBJECT_DATAMODE" )
+            convertOp.toPointMesh = False
             col.separator()
+        
+        row = layout.row( align=True )
+        row.operator( "opr.object_nearestnode", text="Nearest Node", icon="PIVOT_CURSOR" )
+        row.operator( "opr.object_insertnode", text="Insert at Cursor", icon="ADD" )
+        row = layout.row( align=True )
+        row.operator( "opr.object_selectradius", text="Select in Radius", icon="SELECT_SET" )
+        row.prop( context.scene, "node_radius" )
              
 class ViewerPanel( bpy.types.Panel ):
     bl_idname = "VIEW3D_PT_object_viewerpanel"
@@ -655,9 +4329,74 @@ class ViewerPanel( bpy.types.Panel ):
         row = layout.row()
         row.operator( "opr.object_previewnode", text="Preview Node", icon="VIEW_ZOOM" )
         row.operator( "opr.object_cancelpreview", text="Cancel Preview", icon="CANCEL" )
+        row = layout.row()
+        row.prop( context.scene, "curve_type" )
+        row.prop( context.scene, "show_paths" )
+        row = layout.row( align=True )
+        row.operator( "opr.object_bakepreview", text="Bake Preview", icon="RENDER_ANIMATION" ).selectedOnly = False
+        row.operator( "opr.object_bakepreview", text="Selected", icon="RESTRICT_SELECT_OFF" ).selectedOnly = True
+        row.operator( "opr.object_clearbakepreview", text="", icon="X" )
+        row = layout.row( align=True )
+        if RecordFlythroughOperator.recording:
+            row.operator( "opr.object_recordflythrough", text="Stop Recording", icon="PAUSE" )
+        else:
+            row.operator( "opr.object_recordflythrough", text="Record Flythrough", icon="REC" )
+        row.prop( context.scene, "record_interval" )
+        row.prop( context.scene, "record_distance" )
+        row = layout.row()
+        row.prop( context.scene, "occlusion_collection" )
+        row = layout.row( align=True )
+        row.operator( "opr.object_checkocclusion", text="Check Occlusion", icon="HIDE_OFF" )
+        row.prop( context.scene, "occlusion_samples" )
+        if OCCLUSION_RESULTS:
+            box = layout.box()
+            for splineItem in context.scene.splineList:
+                if splineItem.packed or splineItem.splineTree is not None:
+                    result = OCCLUSION_RESULTS.get( spline_cache_name( splineItem ) )
+                    if result is not None and len( result[0] ) > 0:
+                        box.label( text=splineItem.name + ": " + str( len( result[0] ) ) + " of " + str( result[4] ) + " segments blocked (" + str( len( result[1] ) ) + " nodes, " + str( result[2] ) + " sightlines, " + str( result[3] ) + " path steps)", icon="ERROR" )
+                    elif result is not None:
+                        box.label( text=splineItem.name + ": clear", icon="CHECKMARK" )
 
         layout.row().separator()
 
+class ContactSheetPanel( bpy.types.Panel ):
+    bl_idname = "VIEW3D_PT_object_contactsheetpanel"
+    bl_parent_id = "VIEW3D_PT_object_viewerpanel"
+    bl_label = "Contact Sheet"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Oncyber"
+    bl_options = { "DEFAULT_CLOSED" }
+
+    def draw( self, context ):
+        layout = self.layout
+        scene = context.scene
+        row = layout.row()
+        row.prop( scene, "contact_sheet_dir" )
+        row = layout.row()
+        row.prop( scene, "contact_sheet_size" )
+        row.prop( scene, "contact_sheet_workers" )
+        row = layout.row()
+        if ContactSheetOperator.job is not None:
+            row.operator( "opr.object_cancelcontactsheet", text="Cancel Rendering", icon="CANCEL" )
+        else:
+            row.operator( "opr.object_contactsheet", text="Render Contact Sheet", icon="RENDER_STILL" )
+        if CONTACT_SHEET and CONTACT_SHEET_PREVIEWS is not None:
+            row = layout.row()
+            row.label( text=CONTACT_SHEET[ "label" ] + ": " + str( len( CONTACT_SHEET[ "keys" ] ) ) + " nodes" )
+            row.prop( scene, "contact_sheet_columns" )
+            row.prop( scene, "contact_sheet_scale" )
+            grid = layout.grid_flow( row_major=True, columns=scene.contact_sheet_columns, even_columns=True, even_rows=True, align=True )
+            for ( sequence, key ) in enumerate( CONTACT_SHEET[ "keys" ] ):
+                cell = grid.column( align=True )
+                preview = CONTACT_SHEET_PREVIEWS.get( key )
+                if preview is None:
+                    cell.label( text="Not rendered", icon="ERROR" )
+                else:
+                    cell.template_icon( icon_value=preview.icon_id, scale=scene.contact_sheet_scale )
+                cell.operator( "opr.object_contactnode", text=str( sequence ) ).sequence = sequence
+
 class GeneratorPanel( bpy.types.Panel ):
     bl_idname = "VIEW3D_PT_object_generatorpanel"
     bl_parent_id = "VIEW3D_PT_object_mainpanel"
@@ -671,31 +4410,107 @@ class GeneratorPanel( bpy.types.Panel ):
         scene = context.scene
         row = layout.row()
         row.prop( context.scene, "target_file" )
+        row = layout.row()
+        row.prop( context.scene, "export_compact" )
+        row.prop( context.scene, "export_precision" )
+        row = layout.row()
+        row.prop( context.scene, "axis_conversion" )
+        row.prop( context.scene, "export_world_space" )
+        row = layout.row()
+        row.prop( context.scene, "decimate_enabled" )
+        subrow = row.row( align=True )
+        subrow.enabled = context.scene.decimate_enabled
+        subrow.prop( context.scene, "decimate_distance" )
+        subrow.prop( context.scene, "decimate_angle" )
+        if context.scene.decimate_enabled:
+            box = layout.box()
+            for splineItem in context.scene.splineList:
+                if splineItem.packed or splineItem.splineTree is not None:
+                    counts = DECIMATION_COUNTS.get( spline_cache_name( splineItem ) )
+                    if counts is not None:
+                        box.label( text=splineItem.name + ": " + str( counts[0] ) + " -> " + str( counts[1] ) + " nodes (" + "%.0f" % ( 100.0 * ( 1.0 - counts[1] / counts[0] ) ) + "% fewer)" )
+        row = layout.row()
+        row.prop( context.scene, "export_binary" )
+        row.prop( context.scene, "binary_value_type", text="" )
         row = layout.row()    
         row.operator( "opr.object_generate", text="Export to File", icon="EXPORT" )
+        if GenerateOperator.job is not None:
+            row.operator( "opr.object_cancelexport", text="", icon="CANCEL" )
         row = layout.row()
         row.alignment = "CENTER"        
         row.label( text=context.scene.status_message )
+
+class ProfilingPanel( bpy.types.Panel ):
+    bl_idname = "VIEW3D_PT_object_profilingpanel"
+    bl_parent_id = "VIEW3D_PT_object_mainpanel"
+    bl_label = "Profiling"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Oncyber"
+    bl_options = { "DEFAULT_CLOSED" }
+
+    def draw( self, context ):
+        layout = self.layout
+        row = layout.row()
+        row.prop( context.scene, "profile_enabled" )
+        row.prop( context.scene, "profile_capture" )
+        row.operator( "opr.object_clearprofile", text="", icon="TRASH" )
+        for ( index, run ) in enumerate( PROFILER.runs ):
+            box = layout.box()
+            row = box.row()
+            row.label( text=run.startedAt.strftime( "%H:%M:%S" ) + "  " + run.name.replace( "opr.object_", "" ) )
+            row.label( text="%.1f ms" % ( run.seconds * 1000.0 ) )
+            #only the latest run is expanded
+            if index == 0:
+                for ( name, seconds ) in sorted( run.spans.items(), key=lambda span: -span[1] ):
+                    row = box.row()
+                    row.label( text="    " + name )
+                    row.label( text="%.1f ms" % ( seconds * 1000.0 ) )
+                for ( name, amount ) in sorted( run.counters.items() ):
+                    row = box.row()
+                    row.label( text="    " + name )
+                    row.label( text=str( amount ) )
+                if run.profileFile:
+                    box.label( text=os.path.basename( run.profileFile ), icon="FILE" )
    
 CLASSES = [
     CinematicMainPanel,
     ImportPanel,
     SplinesPanel,
     ViewerPanel,
+    ContactSheetPanel,
     GeneratorPanel,
+    ProfilingPanel,
     GenerateOperator,
+    CancelExportOperator,
     AddSplineOperator,
     AddSplineAndNodesOperator,
     RemoveSplineOperator,
     AddCameraOperator,
     PreviewNodeOperator,
     CancelPreviewOperator,
+    ClearProfileOperator,
+    BakePreviewOperator,
+    ClearBakePreviewOperator,
+    RecordFlythroughOperator,
+    PackSplineOperator,
+    UnpackSplineOperator,
+    ConvertSplineOperator,
+    CheckOcclusionOperator,
+    ContactSheetOperator,
+    CancelContactSheetOperator,
+    ContactNodeOperator,
+    NearestNodeOperator,
+    InsertNodeOperator,
+    SelectRadiusOperator,
     SplineListItem,
     SPLINE_UL_List,
     HideSplineOperator,
     MoveListItemOperator,
     ClearListOperator,
-    ImportOperator
+    ImportOperator,
+    SyncFileOperator,
+    ConvertFileOperator
     
 ]
 
@@ -707,9 +4522,33 @@ def register():
         bpy.utils.register_class( cls )
         
     bpy.types.Scene.splineList = CollectionProperty( type = SplineListItem )
-    bpy.types.Scene.list_index = IntProperty(name="", description="", default = 0)
+    bpy.types.Scene.list_index = IntProperty(name="", description="", default = 0, update=unpack_selected_spline)
+
+    for ( handlerList, handler ) in HANDLERS:
+        if handler not in handlerList:
+            handlerList.append( handler )
+
+    global CONTACT_SHEET_PREVIEWS
+    CONTACT_SHEET_PREVIEWS = bpy.utils.previews.new()
 
 def unregister():
+    if GenerateOperator.job is not None:
+        GenerateOperator.job.cancelEvent.set()
+    if bpy.app.timers.is_registered( watch_source_file ):
+        bpy.app.timers.unregister( watch_source_file )
+    if ContactSheetOperator.job is not None:
+        ContactSheetOperator.job.cancelEvent.set()
+
+    global CONTACT_SHEET_PREVIEWS
+    if CONTACT_SHEET_PREVIEWS is not None:
+        bpy.utils.previews.remove( CONTACT_SHEET_PREVIEWS )
+        CONTACT_SHEET_PREVIEWS = None
+    CONTACT_SHEET.clear()
+
+    for ( handlerList, handler ) in HANDLERS:
+        if handler in handlerList:
+            handlerList.remove( handler )
+
     del bpy.types.Scene.splineList
     del bpy.types.Scene.list_index
     
@@ -718,9 +4557,339 @@ def unregister():
 
     for cls in CLASSES:
         bpy.utils.unregister_class( cls )
-        
+
+# COMMAND LINE ----------------------------------------------------------------------------
+#   blender --background --python oncyber-cinematic-addon.py -- batch-export venues/ --workers 8
+#   blender --background --factory-startup --python oncyber-cinematic-addon.py -- benchmark --baseline bench.json
+ADDON_FILE = os.path.abspath( __file__ )
+WORKER_RESULT_SUFFIX = ".result.json"
+
+#stands in for the operator when functions run without a UI, collecting what they report
+class ReportCollector:
+    def __init__( self ):
+        self.messages = []
+
+    def report( self, reportType, message ):
+        for level in reportType:
+            self.messages.append( ( level, message ) )
+        print( "[" + ",".join( sorted( reportType ) ) + "] " + message )
+
+    @property
+    def errors( self ):
+        return [ message for ( level, message ) in self.messages if level == "ERROR" ]
+
+#minimal context for running the exporter against a scene other than the active one
+class SceneContext:
+    def __init__( self, scene ):
+        self.scene = scene
+        self.view_layer = scene.view_layers[0] if len( scene.view_layers ) > 0 else None
+
+def collect_blend_files( paths, recursive=False ):
+    blendFiles = []
+    for path in paths:
+        path = os.path.abspath( path )
+        if os.path.isdir( path ):
+            if recursive:
+                for ( dirPath, dirNames, fileNames ) in os.walk( path ):
+                    dirNames.sort()
+                    blendFiles.extend( os.path.join( dirPath, name ) for name in sorted( fileNames ) if name.endswith( ".blend" ) )
+            else:
+                blendFiles.extend( os.path.join( path, name ) for name in sorted( os.listdir( path ) ) if name.endswith( ".blend" ) )
+        else:
+            blendFiles.append( path )
+    return list( dict.fromkeys( blendFiles ) )
+
+#export every spline list of every scene of the currently loaded .blend file
+def export_loaded_blend( outputDir ):
+    blendPath = bpy.data.filepath
+    stem = os.path.splitext( os.path.basename( blendPath ) )[0] or "untitled"
+    if outputDir is None:
+        outputDir = os.path.dirname( blendPath ) or os.getcwd()
+    os.makedirs( outputDir, exist_ok=True )
+
+    result = { "file": blendPath, "scenes": [], "errors": [] }
+    for scene in bpy.data.scenes:
+        if len( scene.splineList ) < 1:
+            continue
+        outputFile = os.path.join( outputDir, stem + "." + bpy.path.clean_name( scene.name ) + ".json" )
+        collector = ReportCollector()
+        startTime = time.perf_counter()
+        generate_output( SceneContext( scene ), collector, ( outputFile ) )
+        result[ "scenes" ].append( {
+            "scene": scene.name,
+            "output": outputFile,
+            "splines": len( scene.splineList ),
+            "seconds": time.perf_counter() - startTime,
+            "errors": collector.errors
+        } )
+        result[ "errors" ].extend( scene.name + ": " + message for message in collector.errors )
+    if len( result[ "scenes" ] ) < 1:
+        result[ "errors" ].append( "No scene with splines to export" )
+    return result
+
+#run one .blend file through a background Blender process and gather its result
+def run_export_worker( blendFile, outputDir ):
+    resultFile = tempfile.NamedTemporaryFile( prefix="oncyber.", suffix=WORKER_RESULT_SUFFIX, delete=False )
+    resultFile.close()
+    command = [ bpy.app.binary_path, "--background", "--factory-startup", blendFile, "--python", ADDON_FILE, "--", "export-worker", "--result", resultFile.name ]
+    if outputDir is not None:
+        command += [ "--output-dir", outputDir ]
+
+    startTime = time.perf_counter()
+    try:
+        process = subprocess.run( command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True )
+        try:
+            with open( resultFile.name, "r" ) as jsonFile:
+                result = json.load( jsonFile )
+        except ( OSError, ValueError ):
+            outputTail = process.stdout.strip().splitlines()[-5:]
+            result = { "file": blendFile, "scenes": [], "errors": [ "Worker exited with code " + str( process.returncode ) ] + outputTail }
+        result[ "returncode" ] = process.returncode
+    finally:
+        os.remove( resultFile.name )
+    result[ "seconds" ] = time.perf_counter() - startTime
+    result[ "ok" ] = len( result[ "errors" ] ) == 0
+    return result
+
+def batch_export( blendFiles, outputDir=None, workers=None ):
+    workers = max( 1, min( workers or os.cpu_count() or 1, len( blendFiles ) or 1 ) )
+    startTime = time.perf_counter()
+    with ThreadPoolExecutor( max_workers=workers ) as pool:
+        results = list( pool.map( lambda blendFile: run_export_worker( blendFile, outputDir ), blendFiles ) )
+    return {
+        "workers": workers,
+        "seconds": time.perf_counter() - startTime,
+        "failed": sum( 1 for result in results if not result[ "ok" ] ),
+        "files": results
+    }
+
+#render the contact sheet tasks of a ContactSheetJob in the loaded copy of the file: the nodes and paths are
+#hidden, a camera with the viewer camera's settings is moved to every node pair and each thumbnail written
+#under a temporary name first, so a killed worker never leaves a partial thumbnail in the cache
+def render_contact_sheet( taskFile ):
+    with open( taskFile, "r" ) as jsonFile:
+        job = json.load( jsonFile )
+    settings = job[ "settings" ]
+    scene = bpy.data.scenes[ settings[ "scene" ] ]
+    for splineItem in scene.splineList:
+        if splineItem.splineTree is not None:
+            for nodeObject in splineItem.splineTree.all_objects:
+                nodeObject.hide_render = True
+        if splineItem.pathObject is not None:
+            splineItem.pathObject.hide_render = True
+    for defaultNode in ( scene.defaultDollyNode, scene.defaultLookatNode ):
+        if defaultNode is not None:
+            defaultNode.hide_render = True
+
+    cameraData = bpy.data.cameras.new( "OncyberContactSheet" )
+    cameraData.lens = settings[ "lens" ]
+    cameraData.sensor_width = settings[ "sensorWidth" ]
+    cameraData.sensor_height = settings[ "sensorHeight" ]
+    cameraData.sensor_fit = settings[ "sensorFit" ]
+    cameraData.clip_start = settings[ "clipStart" ]
+    cameraData.clip_end = settings[ "clipEnd" ]
+    cameraObject = bpy.data.objects.new( "OncyberContactSheet", cameraData )
+    scene.collection.objects.link( cameraObject )
+    scene.camera = cameraObject
+
+    render = scene.render
+    render.engine = "CYCLES"
+    scene.cycles.device = "CPU"
+    scene.cycles.samples = settings[ "samples" ]
+    scene.cycles.use_denoising = False
+    render.resolution_x = settings[ "width" ]
+    render.resolution_y = settings[ "height" ]
+    render.resolution_percentage = 100
+    render.pixel_aspect_x = 1.0
+    render.pixel_aspect_y = 1.0
+    render.threads_mode = "FIXED"
+    render.threads = job[ "threads" ]
+    render.use_compositing = False
+    render.use_sequencer = False
+    render.use_file_extension = False
+    render.image_settings.file_format = "PNG"
+    for task in job[ "tasks" ]:
+        cameraObject.location = task[ "location" ]
+        cameraObject.rotation_euler = task[ "rotation" ]
+        partFile = task[ "file" ] + ".part"
+        render.filepath = partFile
+        bpy.ops.render.render( write_still=True, scene=scene.name )
+        os.replace( partFile, task[ "file" ] )
+
+#ignores everything the panels draw, for timing draw code without a UI
+class NullLayout:
+    def __getattr__( self, name ):
+        return self
+
+    def __call__( self, *args, **kwargs ):
+        return self
+
+    def __setattr__( self, name, value ):
+        pass
+
+#cinematic JSON with splineCount random walks of nodeCount nodes each
+def write_synthetic_cinematic( outputFile, splineCount, nodeCount, seed=0 ):
+    generator = np.random.default_rng( seed )
+    splines = ( {
+        "duration": 10,
+        "position": np.cumsum( generator.normal( 0.0, 1.0, ( nodeCount, 3 ) ), axis=0 ),
+        "lookat":   np.cumsum( generator.normal( 0.0, 1.0, ( nodeCount, 3 ) ), axis=0 )
+    } for index in range( 0, splineCount, 1 ) )
+    write_file_atomic( outputFile, lambda jsonFile: write_cinematic_json( jsonFile, ( format_spline_json( spline ) for spline in splines ) ) )
+
+#collectionCount unrelated collections, nested ten deep, like the object hierarchy of a large venue
+def add_synthetic_collections( scene, collectionCount ):
+    parentCollection = scene.collection
+    for index in range( 0, collectionCount, 1 ):
+        collection = bpy.data.collections.new( "venue.%05d" % index )
+        parentCollection.children.link( collection )
+        parentCollection = scene.collection if index % 10 == 9 else collection
+
+#run a function repeat times, returning the seconds of every run
+def time_runs( function, repeat, setup=None ):
+    runs = []
+    for index in range( 0, repeat, 1 ):
+        if setup is not None:
+            setup()
+        startTime = time.perf_counter()
+        function()
+        runs.append( time.perf_counter() - startTime )
+    return runs
+
+#time the hot paths of the add-on against a synthetic scene in the current (empty) file
+def run_benchmark( splineCount, nodeCount, collectionCount, repeat ):
+    context = bpy.context
+    scene = context.scene
+    collector = ReportCollector()
+    workDir = tempfile.mkdtemp( prefix="oncyber.benchmark." )
+    sourceFile = os.path.join( workDir, "source.json" )
+    targetFile = os.path.join( workDir, "target.json" )
+    write_synthetic_cinematic( sourceFile, splineCount, nodeCount )
+    add_synthetic_collections( scene, collectionCount )
+    timings = {}
+
+    def remove_import():
+        importCollection = scene.rootCollection
+        if importCollection is not None:
+            collections = [ importCollection ]
+            for collection in collections:
+                collections.extend( collection.children )
+            bpy.data.batch_remove( list( importCollection.all_objects ) + collections )
+        clear_spline_list( context )
+    for ( name, packed ) in ( ( "import_file", False ), ( "import_file_packed", True ) ):
+        scene.import_packed = packed
+        timings[ name ] = time_runs( lambda: import_file( context, collector, ( sourceFile ) ), repeat, remove_import )
+    remove_import()
+    scene.import_packed = False
+    import_file( context, collector, ( sourceFile ) )
+    context.view_layer.update()
+
+    timings[ "generate_output_cold" ] = time_runs( lambda: generate_output( context, collector, ( targetFile ) ), repeat, EXPORT_CACHE.invalidate )
+    timings[ "generate_output_warm" ] = time_runs( lambda: generate_output( context, collector, ( targetFile ) ), repeat )
+
+    splineTrees = [ splineItem.splineTree for splineItem in scene.splineList ]
+    nodeCollections = [ get_child_of_splinetree( splineTree, childType ) for splineTree in splineTrees for childType in ( "DOLLY", "LOOKAT" ) ]
+    timings[ "get_parent_splinetree_cold" ] = time_runs( lambda: [ get_parent_splinetree( collection ) for collection in nodeCollections ], repeat, SPLINE_TREE_INDEX.invalidate )
+    timings[ "get_parent_splinetree_warm" ] = time_runs( lambda: [ get_parent_splinetree( collection ) for collection in nodeCollections ], repeat )
+    timings[ "get_spline_collection_viewlayer_cold" ] = time_runs( lambda: [ get_spline_collection_viewlayer( splineTree.name ) for splineTree in splineTrees ], repeat, LAYER_COLLECTION_INDEX.invalidate )
+    timings[ "get_spline_collection_viewlayer_warm" ] = time_runs( lambda: [ get_spline_collection_viewlayer( splineTree.name ) for splineTree in splineTrees ], repeat )
+
+    #draw_item as the sidebar calls it for every row of the spline list
+    listStub = type( "SplineListStub", (), { "layout_type": "DEFAULT", "use_filter_show": False } )()
+    timings[ "spline_list_draw_item" ] = time_runs( lambda: [ SPLINE_UL_List.draw_item( listStub, context, NullLayout(), scene, splineItem, 0, scene, "list_index", index )
+                                                               for ( index, splineItem ) in enumerate( scene.splineList ) ], repeat )
+
+    cameraObject = bpy.data.objects.new( "OncyberBenchmarkCamera", bpy.data.cameras.new( "OncyberBenchmarkCamera" ) )
+    scene.collection.objects.link( cameraObject )
+    scene.viewerCamera = cameraObject
+    dollyObjects = get_child_of_splinetree( splineTrees[0], "DOLLY" ).objects
+    def select_dolly():
+        context.view_layer.objects.active = dollyObjects[ len( dollyObjects ) // 2 ]
+    timings[ "preview_node" ]   = time_runs( lambda: preview_node( context, collector, () ), repeat, select_dolly )
+    timings[ "cancel_preview" ] = time_runs( lambda: cancel_preview( context, collector, () ), repeat )
+
+    for fileName in os.listdir( workDir ):
+        os.remove( os.path.join( workDir, fileName ) )
+    os.rmdir( workDir )
+    return {
+        "blender": bpy.app.version_string,
+        "parameters": { "splines": splineCount, "nodes": nodeCount, "collections": collectionCount, "repeat": repeat },
+        "timings": { name: { "median": statistics.median( runs ), "min": min( runs ), "runs": runs } for ( name, runs ) in timings.items() },
+        "errors": collector.errors
+    }
+
+#timings whose median grew by more than tolerance (a fraction) and minimumSeconds against the baseline
+def compare_benchmark( result, baseline, tolerance, minimumSeconds=0.001 ):
+    regressions = {}
+    for ( name, timing ) in result[ "timings" ].items():
+        baselineTiming = baseline.get( "timings", {} ).get( name )
+        if baselineTiming is not None:
+            ratio = timing[ "median" ] / max( baselineTiming[ "median" ], 1e-9 )
+            if ratio > 1.0 + tolerance and timing[ "median" ] - baselineTiming[ "median" ] > minimumSeconds:
+                regressions[ name ] = { "baseline": baselineTiming[ "median" ], "current": timing[ "median" ], "ratio": ratio }
+    return regressions
+
+def run_command_line( argv ):
+    parser = argparse.ArgumentParser( prog="blender --background --python " + os.path.basename( ADDON_FILE ) + " --" )
+    commands = parser.add_subparsers( dest="command" )
+
+    batchParser = commands.add_parser( "batch-export", help="Export every spline list of every scene in the given .blend files" )
+    batchParser.add_argument( "paths", nargs="+", help=".blend files or directories containing them" )
+    batchParser.add_argument( "--recursive", action="store_true", help="Search directories recursively" )
+    batchParser.add_argument( "--output-dir", default=None, help="Directory for the exported files (default: next to each .blend)" )
+    batchParser.add_argument( "--workers", type=int, default=None, help="Number of background Blender processes (default: CPU count)" )
+    batchParser.add_argument( "--report", default=None, help="Also write the JSON report to this file" )
+
+    benchmarkParser = commands.add_parser( "benchmark", help="Time import, export, preview, lookups and list drawing on a synthetic scene" )
+    benchmarkParser.add_argument( "--splines", type=int, default=20, help="Number of splines (default: 20)" )
+    benchmarkParser.add_argument( "--nodes", type=int, default=500, help="DOLLY and LOOKAT nodes per spline (default: 500)" )
+    benchmarkParser.add_argument( "--collections", type=int, default=1000, help="Unrelated collections added to the scene (default: 1000)" )
+    benchmarkParser.add_argument( "--repeat", type=int, default=5, help="Runs per timing, the median is compared (default: 5)" )
+    benchmarkParser.add_argument( "--output", default=None, help="Write the JSON results to this file" )
+    benchmarkParser.add_argument( "--baseline", default=None, help="Earlier results to compare against, regressions give exit code 1" )
+    benchmarkParser.add_argument( "--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline as a fraction (default: 0.25)" )
+
+    workerParser = commands.add_parser( "export-worker", help=argparse.SUPPRESS )
+    workerParser.add_argument( "--output-dir", default=None )
+    workerParser.add_argument( "--result", required=True )
+
+    renderParser = commands.add_parser( "render-worker", help=argparse.SUPPRESS )
+    renderParser.add_argument( "--tasks", required=True )
+
+    args = parser.parse_args( argv )
+    if args.command == "batch-export":
+        blendFiles = collect_blend_files( args.paths, args.recursive )
+        outputDir = os.path.abspath( args.output_dir ) if args.output_dir else None
+        report = batch_export( blendFiles, outputDir, args.workers )
+        reportText = json.dumps( report, indent=4 )
+        if args.report:
+            with open( args.report, "w" ) as reportFile:
+                reportFile.write( reportText )
+        print( reportText )
+        sys.exit( 1 if report[ "failed" ] else 0 )
+    elif args.command == "benchmark":
+        result = run_benchmark( args.splines, max( 4, args.nodes ), args.collections, max( 1, args.repeat ) )
+        if args.baseline:
+            with open( args.baseline, "r" ) as baselineFile:
+                result[ "regressions" ] = compare_benchmark( result, json.load( baselineFile ), args.tolerance )
+        resultText = json.dumps( result, indent=4 )
+        if args.output:
+            with open( args.output, "w" ) as outputFile:
+                outputFile.write( resultText )
+        print( resultText )
+        sys.exit( 1 if result[ "errors" ] or result.get( "regressions" ) else 0 )
+    elif args.command == "export-worker":
+        result = export_loaded_blend( args.output_dir )
+        with open( args.result, "w" ) as resultFile:
+            json.dump( result, resultFile )
+    elif args.command == "render-worker":
+        render_contact_sheet( args.tasks )
+    else:
+        parser.print_help()
 
 if __name__ == "__main__":
     register()
-    
+    if "--" in sys.argv:
+        run_command_line( sys.argv[ sys.argv.index( "--" ) + 1: ] )
+
     
@@ -0,0 +1,183 @@
+#tests of the spline math of the add-on, run without Blender: python -m pytest tests
+import os
+import sys
+import types
+import importlib.util
+import numpy as np
+import pytest
+from unittest import mock
+
+ADDON_FILE = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), "oncyber-cinematic-addon.py" )
+
+#the add-on imports Blender's modules when it loads; stand-ins for them are enough for the functions tested here,
+#which only use numpy
+def load_addon():
+    bpy = mock.MagicMock()
+    bpy.types = types.SimpleNamespace( **{ name: type( name, (), {} ) for name in ( "Operator", "Panel", "PropertyGroup", "UIList", "Object", "Collection", "Scene" ) } )
+    bpy.app.handlers.persistent = lambda function: function
+    mathutils = mock.MagicMock()
+    modules = {
+        "bpy": bpy,
+        "bpy.props": bpy.props,
+        "bpy.types": bpy.types,
+        "bpy.app": bpy.app,
+        "bpy.app.handlers": bpy.app.handlers,
+        "bpy.utils": bpy.utils,
+        "bpy.utils.previews": bpy.utils.previews,
+        "mathutils": mathutils,
+        "mathutils.kdtree": mathutils.kdtree,
+        "mathutils.bvhtree": mathutils.bvhtree,
+    }
+    with mock.patch.dict( sys.modules, modules ):
+        spec = importlib.util.spec_from_file_location( "oncyber_cinematic_addon", ADDON_FILE )
+        addon = importlib.util.module_from_spec( spec )
+        spec.loader.exec_module( addon )
+    return addon
+
+ADDON = load_addon()
+catmull_rom_coefficients = ADDON.catmull_rom_coefficients
+sample_segments = ADDON.sample_segments
+CatmullRomCurve = ADDON.CatmullRomCurve
+CinematicPath = ADDON.CinematicPath
+decimate_spline = ADDON.decimate_spline
+
+POINTS = np.array( [ [ 0.0, 0.0, 0.0 ], [ 1.0, 2.0, 0.0 ], [ 3.0, 2.5, 1.0 ], [ 4.0, 0.0, 2.0 ], [ 6.0, -1.0, 2.0 ] ] )
+
+#three.js CatmullRomCurve3.getPoint for an open curve, written out point by point
+def three_js_point( points, t, curveType, tension=0.5 ):
+    count = len( points )
+    p = ( count - 1 ) * t
+    intPoint = int( np.floor( p ) )
+    weight = p - intPoint
+    if weight == 0 and intPoint == count - 1:
+        intPoint = count - 2
+        weight = 1.0
+    p0 = points[ intPoint - 1 ] if intPoint > 0 else 2.0 * points[0] - points[1]
+    p1 = points[ intPoint ]
+    p2 = points[ intPoint + 1 ]
+    p3 = points[ intPoint + 2 ] if intPoint + 2 < count else 2.0 * points[ count - 1 ] - points[ count - 2 ]
+    if curveType == "catmullrom":
+        t1 = tension * ( p2 - p0 )
+        t2 = tension * ( p3 - p1 )
+    else:
+        power = 0.5 if curveType == "chordal" else 0.25
+        dt0 = np.sum( ( p1 - p0 ) ** 2 ) ** power
+        dt1 = np.sum( ( p2 - p1 ) ** 2 ) ** power
+        dt2 = np.sum( ( p3 - p2 ) ** 2 ) ** power
+        if dt1 < 1e-4: dt1 = 1.0
+        if dt0 < 1e-4: dt0 = dt1
+        if dt2 < 1e-4: dt2 = dt1
+        t1 = ( ( p1 - p0 ) / dt0 - ( p2 - p0 ) / ( dt0 + dt1 ) + ( p2 - p1 ) / dt1 ) * dt1
+        t2 = ( ( p2 - p1 ) / dt1 - ( p3 - p1 ) / ( dt1 + dt2 ) + ( p3 - p2 ) / dt2 ) * dt1
+    c0 = p1
+    c1 = t1
+    c2 = -3.0 * p1 + 3.0 * p2 - 2.0 * t1 - t2
+    c3 = 2.0 * p1 - 2.0 * p2 + t1 + t2
+    return c0 + weight * ( c1 + weight * ( c2 + weight * c3 ) )
+
+@pytest.mark.parametrize( "curveType", [ "centripetal", "chordal", "catmullrom" ] )
+def test_curve_matches_three_js( curveType ):
+    curve = CatmullRomCurve( POINTS, curveType )
+    t = np.linspace( 0.0, 1.0, 41 )
+    expected = np.array( [ three_js_point( POINTS, value, curveType ) for value in t ] )
+    assert np.allclose( curve.evaluate( t ), expected )
+
+def test_curve_passes_through_points():
+    curve = CatmullRomCurve( POINTS )
+    assert np.allclose( curve.evaluate( np.linspace( 0.0, 1.0, len( POINTS ) ) ), POINTS )
+
+def test_repeated_points_stay_finite():
+    points = np.array( [ [ 0.0, 0.0, 0.0 ], [ 0.0, 0.0, 0.0 ], [ 1.0, 0.0, 0.0 ], [ 1.0, 0.0, 0.0 ] ] )
+    assert np.all( np.isfinite( CatmullRomCurve( points ).evaluate( np.linspace( 0.0, 1.0, 17 ) ) ) )
+
+def test_curve_needs_two_points():
+    with pytest.raises( ValueError ):
+        CatmullRomCurve( POINTS[ :1 ] )
+
+def test_arc_length_of_a_straight_line():
+    #uneven spacing along a line: the curve stays on the line and its length is the distance between the ends
+    points = np.array( [ [ 0.0, 0.0, 0.0 ], [ 1.0, 0.0, 0.0 ], [ 5.0, 0.0, 0.0 ], [ 6.0, 0.0, 0.0 ] ] )
+    curve = CatmullRomCurve( points, arcLengthDivisions=2000 )
+    assert curve.length == pytest.approx( 6.0, rel=1e-4 )
+    #by fraction of the length the camera moves at constant speed, by parameter it does not
+    assert np.allclose( curve.evaluate_at( np.linspace( 0.0, 1.0, 7 ) )[ :, 0 ], np.arange( 7.0 ), atol=1e-2 )
+    assert not np.allclose( curve.evaluate( np.linspace( 0.0, 1.0, 7 ) )[ :, 0 ], np.arange( 7.0 ), atol=1e-2 )
+
+def test_sample_segments_layout():
+    samplesPerSegment = 4
+    samples = sample_segments( POINTS, samplesPerSegment )
+    assert samples.shape == ( ( len( POINTS ) - 1 ) * samplesPerSegment + 1, 3 )
+    assert np.allclose( samples[ ::samplesPerSegment ], POINTS )
+    curve = CatmullRomCurve( POINTS )
+    assert np.allclose( samples, curve.evaluate( np.linspace( 0.0, 1.0, len( samples ) ) ) )
+
+def test_sample_segments_of_a_range_match_the_whole_curve():
+    whole = sample_segments( POINTS, 5 )
+    part = sample_segments( POINTS, 5, first=1, last=3 )
+    assert np.allclose( part, whole[ 5:15 ] )
+    assert np.allclose( catmull_rom_coefficients( POINTS, first=1, last=3 ), catmull_rom_coefficients( POINTS )[ 1:3 ] )
+
+def test_path_by_time_and_distance():
+    path = CinematicPath( POINTS, POINTS + [ 0.0, 0.0, 1.0 ], duration=4.0 )
+    ( positions, lookats ) = path.evaluate_at_time( [ 0.0, 2.0, 4.0 ] )
+    assert np.allclose( positions[ [ 0, 2 ] ], POINTS[ [ 0, -1 ] ] )
+    assert np.allclose( lookats - positions, [ 0.0, 0.0, 1.0 ] )
+    ( halfway, _ ) = path.evaluate_at_distance( path.length / 2.0 )
+    assert np.allclose( halfway, positions[1] )
+    assert len( path.sample( 10 )[0] ) == 10
+
+def test_decimate_drops_collinear_nodes():
+    positions = np.column_stack( ( np.arange( 10.0 ), np.zeros( 10 ), np.zeros( 10 ) ) )
+    lookats = positions + [ 0.0, 1.0, 0.0 ]
+    assert decimate_spline( positions, lookats, 0.01, 0.01, minimumNodes=2 ).tolist() == [ 0, 9 ]
+    assert len( decimate_spline( positions, lookats, 0.01, 0.01, minimumNodes=4 ) ) == 4
+
+def test_decimate_keeps_corners_and_turns():
+    #the curve through the ends alone cuts the corner, and through the corner alone it swings out beside it
+    positions = np.array( [ [ 0.0, 0.0, 0.0 ], [ 1.0, 0.0, 0.0 ], [ 2.0, 0.0, 0.0 ], [ 2.0, 1.0, 0.0 ], [ 2.0, 2.0, 0.0 ] ] )
+    lookats = positions + [ 0.0, 0.0, 1.0 ]
+    assert decimate_spline( positions, lookats, 0.01, 0.01, minimumNodes=2 ).tolist() == [ 0, 1, 2, 3, 4 ]
+    assert 2 in decimate_spline( positions, lookats, 0.2, 0.01, minimumNodes=2 ).tolist()
+    #a straight dolly whose view turns half way keeps the node where it turns
+    straight = np.column_stack( ( np.arange( 5.0 ), np.zeros( 5 ), np.zeros( 5 ) ) )
+    turning = straight + [ [ 0.0, 1.0, 0.0 ], [ 0.0, 1.0, 0.0 ], [ 0.0, 1.0, 0.0 ], [ 0.0, 0.0, 1.0 ], [ 0.0, 0.0, 1.0 ] ]
+    kept = decimate_spline( straight, turning, 1.0, 0.05, minimumNodes=2 ).tolist()
+    assert 2 in kept or 3 in kept
+
+def test_decimate_short_splines_are_kept():
+    assert decimate_spline( POINTS[ :2 ], POINTS[ :2 ] + 1.0, 1.0, 1.0 ).tolist() == [ 0, 1 ]
+
+#largest distance of the points to the curve through the kept points, sampled finely; each point is measured
+#against the segment of the span it falls in
+def curve_deviation( points, kept, samplesPerSegment=64 ):
+    spans = np.minimum( np.searchsorted( kept, np.arange( len( points ) ), side="right" ) - 1, len( kept ) - 2 )
+    spanSamples = spans[ :, None ] * samplesPerSegment + np.arange( samplesPerSegment + 1 )
+    samples = sample_segments( points[ kept ], samplesPerSegment )
+    starts = samples[ spanSamples[ :, :-1 ] ]
+    steps = samples[ spanSamples[ :, 1: ] ] - starts
+    offsets = points[ :, None, : ] - starts
+    u = np.clip( np.sum( offsets * steps, axis=2 ) / np.maximum( np.sum( steps * steps, axis=2 ), 1e-24 ), 0.0, 1.0 )
+    return np.min( np.linalg.norm( offsets - u[ :, :, None ] * steps, axis=2 ), axis=1 ).max()
+
+#a densely captured helix with a little jitter, as from a recorded flythrough
+def helix_spline():
+    rng = np.random.default_rng( 7 )
+    t = np.linspace( 0.0, 4.0 * np.pi, 2000 )
+    positions = np.column_stack( ( 10.0 * np.cos( t ), 10.0 * np.sin( t ), t ) ) + rng.normal( 0.0, 0.001, ( len( t ), 3 ) )
+    return ( positions, positions + np.column_stack( ( -np.sin( t ), np.cos( t ), np.zeros( len( t ) ) ) ) )
+
+#straight runs densified between sharp corners; the chords through the corners alone would fit every node, the
+#curve through them swings far out
+def corner_spline():
+    corners = np.array( [ [ 0.0, 0.0, 0.0 ], [ 10.0, 0.0, 0.0 ], [ 10.0, 10.0, 0.0 ], [ 0.0, 10.0, 2.0 ], [ 0.0, 0.0, 4.0 ] ] )
+    positions = np.concatenate( [ np.linspace( corners[ index ], corners[ index + 1 ], 200, endpoint=False ) for index in range( 4 ) ] + [ corners[ -1: ] ] )
+    return ( positions, positions + [ 0.0, 0.0, 1.0 ] )
+
+@pytest.mark.parametrize( "spline", [ helix_spline, corner_spline ] )
+def test_decimated_curve_stays_within_tolerance( spline ):
+    ( positions, lookats ) = spline()
+    tolerance = 0.01
+    kept = decimate_spline( positions, lookats, tolerance, 0.05 )
+    assert len( kept ) < len( positions ) / 4
+    assert curve_deviation( positions, kept ) <= tolerance * 1.01
+    assert curve_deviation( lookats, kept ) <= tolerance * 1.01